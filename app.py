@@ -1,17 +1,51 @@
+import sys
+
 import streamlit as st
 
-from sections import inicio, asignacion1, asignacion2, asignacion3
+import sections
+from utils import trazas
+from utils.tema import aplicar_tema
 
 st.set_page_config(page_title="Proyecto final", page_icon="🏴‍☠️", layout="wide")
+aplicar_tema()
 
 st.sidebar.title("Navegación")
-opcion = st.sidebar.radio("Ir a:", ["Inicio", "Asignación 1", "Asignación 2", "Asignación 3"])
-
-if opcion == "Inicio":
-    inicio()
-elif opcion == "Asignación 1":
-    asignacion1()
-elif opcion == "Asignación 2":
-    asignacion2()
-elif opcion == "Asignación 3":
-    asignacion3()
\ No newline at end of file
+opcion = st.sidebar.radio("Ir a:", list(sections.PAGINAS))
+st.sidebar.radio("Gráficos", ["matplotlib", "vega"], key="renderer",
+                 format_func={"matplotlib": "Imagen (servidor)", "vega": "Vectorial (navegador)"}.get)
+
+# Los tramos de esta sesión (también los de sus hilos de fondo) se anotan en la página abierta
+st.session_state["_pagina"] = opcion
+trazas.registrar_pagina(lambda: st.session_state.get("_pagina", "-"))
+
+# La página (y lo que importa) se carga recién al abrirla
+with trazas.tramo("pagina"):
+    getattr(sections, sections.PAGINAS[opcion])()
+
+with st.sidebar.expander("Caché de resultados"):
+    # Si ninguna página la importó todavía la caché está vacía y no hace falta cargarla
+    modulo_cache = sys.modules.get("utils.cache")
+    if modulo_cache is None:
+        st.caption("Vacía: todavía no se abrió ninguna simulación.")
+    else:
+        stats = modulo_cache.cache.stats()
+        st.caption(f"Aciertos: {stats['hits']} (disco: {stats['hits_disco']}) · Fallos: {stats['misses']}")
+        st.caption(f"Entradas: {stats['entradas']} · Memoria: {stats['bytes'] / 2**20:.1f} / {stats['max_bytes'] / 2**20:.0f} MB")
+
+# Panel de depuración: sólo con SIR_TRAZAS definida al arrancar
+if trazas.PANEL:
+    with st.sidebar.expander("Trazas"):
+        # Las trazas son del proceso: el interruptor las prende o apaga para todas las sesiones
+        st.toggle("Medir", value=trazas.ACTIVAS, key="_trazas_medir",
+                  on_change=lambda: trazas.activar(st.session_state["_trazas_medir"]))
+        filas = trazas.resumen(opcion)
+        if filas:
+            st.dataframe([{k: v for k, v in f.items() if k != "pagina"} for f in filas], hide_index=True)
+        else:
+            st.caption("Sin tramos medidos en esta página.")
+        col1, col2 = st.columns(2)
+        if col1.button("Reiniciar"):
+            trazas.reiniciar()
+        if trazas.ARCHIVO and col2.button("Exportar"):
+            trazas.exportar(forzar=True)
+    trazas.exportar()
@@ -0,0 +1,68 @@
+"""Arranque en frío: tiempo de importación y del primer render de cada página.
+
+Cada medición corre en un proceso nuevo, como un worker recién levantado:
+    importar  `import sections` + la página (sin Streamlit, que ya está cargado en el servidor)
+    render    primer run de app.py que abre esa página, con el cálculo de
+              fondo incluido (AppTest, sin servidor)
+También se listan los módulos pesados que quedaron cargados después del render.
+
+Uso: python benchmarks/bench_arranque.py [--repeticiones 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+from sections import PAGINAS
+
+PESADOS = ("matplotlib", "matplotlib.pyplot", "scipy.integrate", "PIL.Image", "altair", "pyarrow")
+
+MEDIR = """
+import json, sys, time
+import streamlit
+t = time.perf_counter()
+import sections
+getattr(sections, {modulo!r})
+importar = time.perf_counter() - t
+
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=120)
+at.session_state["renderer"] = "matplotlib"
+t = time.perf_counter()
+at.run()
+if {opcion!r} != "Inicio":
+    # Se descuenta el primer run con Inicio: se mide sólo el que abre la página
+    t = time.perf_counter()
+    at.sidebar.radio[0].set_value({opcion!r}).run()
+render = time.perf_counter() - t
+print(json.dumps({{"importar": importar, "render": render, "error": bool(at.exception),
+                  "pesados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+def medir(opcion, modulo):
+    codigo = MEDIR.format(opcion=opcion, modulo=modulo, pesados=PESADOS)
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True,
+                            env={**os.environ, "PYTHONPATH": RAIZ})
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'página':<14}{'importar (s)':>14}{'1.er render (s)':>17}  cargados")
+    for opcion, modulo in PAGINAS.items():
+        medidas = [medir(opcion, modulo) for _ in range(args.repeticiones)]
+        importar = min(m["importar"] for m in medidas)
+        render = min(m["render"] for m in medidas)
+        error = " ERROR" if any(m["error"] for m in medidas) else ""
+        print(f"{opcion:<14}{importar:>14.3f}{render:>17.3f}  {', '.join(medidas[0]['pesados']) or '-'}{error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Latencia por llamada de method="fast" frente a solve_ivp (RK45), y pasos y
+evaluaciones del lado derecho de RK45, "auto" (RK45 o LSODA) y "fast".
+
+Uso: python benchmarks/bench_fast.py
+"""
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.sir_model import solve_sir, solve_sir_extended
+
+TOLERANCIA = 1e-5  # diferencia máxima permitida, relativa a N
+
+
+def latencia(fn, repeticiones=200):
+    fn()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        fn()
+    return (time.perf_counter() - inicio) / repeticiones * 1e3
+
+
+def diferencia_maxima():
+    peor = 0.0
+    for N, beta, k in itertools.product([100, 7138, 20000], [1e-6, 1.4e-4, 5e-4], [0.1, 0.4, 1.0]):
+        ref = np.array(solve_sir(N, 1, 0, beta, k, 40, method="RK45")[:3])
+        rap = np.array(solve_sir(N, 1, 0, beta, k, 40, method="fast")[:3])
+        peor = max(peor, np.abs(ref - rap).max() / N)
+    for N, beta, gamma, alpha, t_max in itertools.product([1000, 7138, 20000], [1e-5, 1.4e-4, 1e-3],
+                                                          [0.1, 0.4, 1.0], [0.0, 0.05, 0.2], [30, 365]):
+        ref = np.array(solve_sir_extended(N, 10, 0, beta, gamma, alpha, t_max, method="RK45")[:3])
+        rap = np.array(solve_sir_extended(N, 10, 0, beta, gamma, alpha, t_max, method="fast")[:3])
+        peor = max(peor, np.abs(ref - rap).max() / N)
+    return peor
+
+
+if __name__ == "__main__":
+    casos = {
+        "solve_sir (asignación 1)": lambda m: solve_sir(7138, 1, 0, 0.00014, 0.40, 40, method=m),
+        "solve_sir_extended 40 días": lambda m: solve_sir_extended(7138, 10, 0, 0.00014, 0.40, 0.05, 40, method=m),
+        "solve_sir_extended 365 días": lambda m: solve_sir_extended(7138, 10, 0, 0.00014, 0.40, 0.05, 365, method=m),
+    }
+    print(f"{'caso':32s} {'RK45 (ms)':>10s} {'fast (ms)':>10s} {'ganancia':>9s}")
+    for nombre, fn in casos.items():
+        lento = latencia(lambda: fn("RK45"))
+        rapido = latencia(lambda: fn("fast"))
+        print(f"{nombre:32s} {lento:10.3f} {rapido:10.3f} {lento / rapido:8.1f}x")
+
+    costos = {
+        "solve_sir (asignación 1)": (solve_sir, (7138, 1, 0, 0.00014, 0.40, 40)),
+        "solve_sir_extended 365 días": (solve_sir_extended, (7138, 10, 0, 0.00014, 0.40, 0.05, 365)),
+        "β chico, γ = 1, 365 días": (solve_sir_extended, (1000, 10, 0, 1e-5, 1.0, 0.0, 365)),
+        "β = 0.001, N = 20000, 365 días": (solve_sir_extended, (20000, 10, 0, 1e-3, 0.1, 0.2, 365)),
+    }
+    print(f"\n{'caso':32s} {'RK45 pasos/nfev':>16s} {'auto pasos/nfev':>22s} {'fast pasos/nfev':>16s}")
+    for nombre, (solver, args) in costos.items():
+        celdas = []
+        for metodo in ("RK45", "auto", "fast"):
+            e = solver(*args, method=metodo, full_output=True)[4]["estadisticas"]
+            eleccion = f"({e['metodo']}) " if metodo == "auto" else ""
+            celdas.append(f"{eleccion}{e['pasos']}/{e['nfev']}")
+        print(f"{nombre:32s} {celdas[0]:>16s} {celdas[1]:>22s} {celdas[2]:>16s}")
+
+    peor = diferencia_maxima()
+    print(f"\nDiferencia máxima |fast - RK45| / N: {peor:.2e} (tolerancia {TOLERANCIA:.0e})")
+    sys.exit(0 if peor < TOLERANCIA else 1)
@@ -0,0 +1,93 @@
+"""Memoria del proceso a lo largo de 1000 reruns de los tres gráficos.
+
+Simula lo que hacen las páginas en cada rerun (figura + PNG) con parámetros
+distintos en cada iteración. Cada 100 reruns anota los objetos de Python
+vivos (sys.getallocatedblocks, sin el costo de tracemalloc), el RSS después
+de gc.collect() y malloc_trim, y las figuras en el pool. Una sola lectura
+del RSS sube y baja decenas de MB según lo que el allocator devuelva al
+sistema, así que se informa pero no decide: la prueba pasa si la pendiente
+de los bloques, ajustada a todos los puntos, queda por debajo de lo que
+dejaría una figura retenida cada 1000 reruns y el pool no crece.
+
+Uso: python benchmarks/bench_memoria_figuras.py [--reruns 1000] [--cada 100] [--sin-pool]
+"""
+import argparse
+import ctypes
+import gc
+import os
+import resource
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.sir_model import solve_sir, solve_sir_extended
+from utils.plotter import figure_to_png, figuras_en_pool, plot_sir, plot_sir_comparison, plot_sir_profesional
+
+# Por cada 1000 reruns: una figura retenida con sus artistas son ~8000 bloques
+PENDIENTE_MAXIMA_BLOQUES = 8000
+
+
+def _malloc_trim():
+    """Devuelve al sistema la memoria libre de glibc; en otras libc no hace nada."""
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Sin /proc sólo está el pico (KB en Linux, bytes en macOS)
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / 2**20 if sys.platform == "darwin" else pico / 2**10
+
+
+def rerun(i, clave):
+    rng = np.random.default_rng(i)
+    beta, k = rng.uniform(5e-5, 5e-4), rng.uniform(0.1, 1.0)
+    figure_to_png(plot_sir(*solve_sir(7138, 1, 0, beta, k, 40, method="fast"), clave=clave))
+    S, I, R, t = solve_sir_extended(7138, 10, 0, beta, k, 0.05, 40, method="fast")
+    figure_to_png(plot_sir_profesional(S, I, R, t, clave=clave))
+    escenarios = [{"k": k / 20, "label": "actual"}, {"k": k / 10, "label": "doble"}]
+    figure_to_png(plot_sir_comparison(275, 1, 8, 0.004, escenarios, 15, clave=clave)[0])
+
+
+def medir():
+    """(bloques de Python vivos, RSS en MB), después de recolectar y devolver lo libre al sistema."""
+    gc.collect()
+    _malloc_trim()
+    return sys.getallocatedblocks(), rss_mb()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reruns", type=int, default=1000)
+    parser.add_argument("--cada", type=int, default=100, help="reruns entre mediciones")
+    parser.add_argument("--sin-pool", action="store_true", help="crear figuras nuevas en cada rerun")
+    args = parser.parse_args()
+    clave = None if args.sin_pool else "bench"
+
+    for i in range(20):
+        rerun(i, clave)
+    puntos = [(0, *medir(), figuras_en_pool())]
+    print(f"{'rerun':>6s} {'bloques':>9s} {'RSS (MB)':>9s} {'figuras':>8s}")
+    print(f"{0:6d} {puntos[0][1]:9d} {puntos[0][2]:9.1f} {puntos[0][3]:8d}")
+    for i in range(1, args.reruns + 1):
+        rerun(i, clave)
+        if i % args.cada == 0:
+            puntos.append((i, *medir(), figuras_en_pool()))
+            print(f"{i:6d} {puntos[-1][1]:9d} {puntos[-1][2]:9.1f} {puntos[-1][3]:8d}")
+    if len(puntos) < 4:
+        print("Hacen falta al menos tres mediciones después del inicio para estimar la pendiente")
+        sys.exit(1)
+
+    reruns, bloques, rss, figuras = (np.array(c, dtype=float) for c in zip(*puntos))
+    pendiente = np.polyfit(reruns, bloques, 1)[0] * 1000
+    pendiente_rss = np.polyfit(reruns, rss, 1)[0] * 1000
+    print(f"\nPendiente por 1000 reruns: {pendiente:+.0f} bloques (límite {PENDIENTE_MAXIMA_BLOQUES}), "
+          f"{pendiente_rss:+.1f} MB de RSS (sólo informativo) · figuras en el pool: {figuras.max():.0f}")
+    sys.exit(0 if pendiente < PENDIENTE_MAXIMA_BLOQUES and figuras.max() <= figuras[0] else 1)
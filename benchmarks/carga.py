@@ -0,0 +1,305 @@
+"""Prueba de carga: muchas sesiones simultáneas moviendo los widgets de cada página.
+
+Por página se levanta un servidor de Streamlit nuevo (`streamlit run
+app.py`, sin navegador), como un worker que atiende a toda una clase, y se
+le conectan --sesiones clientes por el mismo websocket que usa el navegador.
+Cada cliente abre "Inicio", navega a la página y hace --interacciones
+reruns: elige un widget de la página al azar y le manda un valor al azar
+(los deslizadores se arrastran unos pasos desde su valor actual). Los
+widgets dentro de un `st.fragment` piden el rerun del fragmento, como el
+navegador. Un rerun termina cuando el servidor avisa que el script
+terminó, es decir, con el resultado de los parámetros nuevos dibujado
+(el cálculo de fondo de utils/fondo.py incluido).
+
+Por página se informa la latencia p50/p95/p99 de los reruns (abrir la
+página va aparte), reruns por segundo, errores y la memoria residente del
+servidor al arrancar y su pico (VmHWM de /proc, sólo en Linux).
+
+AppTest no sirve para esto: cada run cambia un Runtime global del proceso,
+así que no admite sesiones concurrentes.
+
+Uso: python benchmarks/carga.py [--sesiones 20] [--interacciones 10] [--paginas asignacion1 ...]
+                                [--renderer matplotlib] [--pensar-ms 300] [--rampa-s 2] [--semilla 0]
+                                [--json resultados.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+from sections import PAGINAS
+
+SIMULACIONES = [opcion for opcion, modulo in PAGINAS.items() if modulo != "inicio"]
+RENDERERS = {"matplotlib": 0, "vega": 1}  # índice en el radio "Gráficos" de app.py
+ARRASTRE = 5  # pasos máximos que se mueve un deslizador por interacción
+TIMEOUT_S = 300
+WIDGETS = ("slider", "number_input", "selectbox", "radio", "checkbox")
+
+
+# ---------- SERVIDOR ----------
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _memoria_mb(pid, campo):
+    """VmRSS o VmHWM del proceso en MB; None fuera de Linux."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for linea in f:
+                if linea.startswith(campo + ":"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class Servidor:
+    """`streamlit run app.py` en un puerto libre, mientras dure el bloque `with`."""
+
+    def __init__(self):
+        self.puerto = _puerto_libre()
+        self.proceso = None
+
+    def __enter__(self):
+        self.proceso = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless", "true",
+             "--server.port", str(self.puerto), "--server.fileWatcherType", "none",
+             "--browser.gatherUsageStats", "false"],
+            cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        limite = time.monotonic() + 60
+        while time.monotonic() < limite:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.puerto}/_stcore/health", timeout=1):
+                    return self
+            except OSError:
+                if self.proceso.poll() is not None:
+                    break
+                time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError("el servidor de Streamlit no arrancó")
+
+    def __exit__(self, *exc):
+        self.proceso.terminate()
+        try:
+            self.proceso.wait(10)
+        except subprocess.TimeoutExpired:
+            self.proceso.kill()
+
+
+# ---------- SESIÓN ----------
+class Sesion:
+    """Un navegador simulado: guarda el estado de cada widget y lo manda en cada rerun."""
+
+    def __init__(self, url):
+        self.url = url
+        self.ws = None
+        self.estados = {}   # id → WidgetState con el valor actual
+        self.widgets = {}   # id → (tipo, proto, fragment_id) de los widgets del último run
+        self.errores = 0
+
+    async def conectar(self):
+        from tornado.httpclient import HTTPRequest
+        from tornado.websocket import websocket_connect
+
+        self.ws = await websocket_connect(HTTPRequest(self.url, headers={"Sec-WebSocket-Protocol": "streamlit"}),
+                                          max_message_size=256 * 2**20)
+
+    def cerrar(self):
+        if self.ws is not None:
+            self.ws.close()
+
+    async def correr(self, fragmento=""):
+        """Pide un rerun y espera a que el script termine; devuelve los segundos."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        mensaje = BackMsg()
+        mensaje.rerun_script.widget_states.widgets.extend(self.estados.values())
+        mensaje.rerun_script.fragment_id = fragmento
+        if not fragmento:
+            self.widgets = {}
+        inicio = time.perf_counter()
+        await self.ws.write_message(mensaje.SerializeToString(), binary=True)
+        while True:
+            crudo = await asyncio.wait_for(self.ws.read_message(), TIMEOUT_S)
+            if crudo is None:
+                raise ConnectionError("el servidor cerró la conexión")
+            recibido = ForwardMsg()
+            recibido.ParseFromString(crudo)
+            tipo = recibido.WhichOneof("type")
+            if tipo == "delta" and recibido.delta.WhichOneof("type") == "new_element":
+                self._elemento(recibido)
+            elif tipo == "script_finished":
+                estado = recibido.script_finished
+                if estado == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                self.errores += int(estado == ForwardMsg.FINISHED_WITH_COMPILE_ERROR)
+                return time.perf_counter() - inicio
+
+    def _elemento(self, recibido):
+        elemento = recibido.delta.new_element
+        tipo = elemento.WhichOneof("type")
+        if tipo == "exception":
+            self.errores += 1
+        if tipo not in WIDGETS:
+            return
+        proto = getattr(elemento, tipo)
+        raiz = "principal" if recibido.metadata.delta_path[0] == 0 else "lateral"
+        self.widgets[proto.id] = (tipo, proto, recibido.delta.fragment_id, raiz)
+        if proto.id not in self.estados:
+            self.estados[proto.id] = _estado_inicial(tipo, proto)
+
+    def buscar(self, etiqueta):
+        return next(i for i, (_, proto, _, _) in self.widgets.items() if proto.label == etiqueta)
+
+    async def elegir(self, etiqueta, indice):
+        """Elige la opción `indice` de un radio del app (navegación, renderer)."""
+        self.estados[self.buscar(etiqueta)].int_value = indice
+        return await self.correr()
+
+    async def interactuar(self, azar):
+        """Cambia un widget de la página elegido al azar y espera el rerun."""
+        ids = [i for i, (_, _, _, raiz) in self.widgets.items() if raiz == "principal"]
+        widget = azar.choice(ids)
+        tipo, proto, fragmento, _ = self.widgets[widget]
+        _mover(tipo, proto, self.estados[widget], azar)
+        return await self.correr(fragmento)
+
+
+def _estado_inicial(tipo, proto):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    estado = WidgetState(id=proto.id)
+    if tipo == "slider":
+        estado.double_array_value.data.extend(proto.default)
+    elif tipo == "number_input":
+        estado.double_value = proto.default
+    elif tipo == "selectbox":
+        estado.string_value = proto.options[proto.default] if proto.options else ""
+    elif tipo == "radio":
+        estado.int_value = proto.default
+    else:
+        estado.bool_value = proto.default
+    return estado
+
+
+def _en_rejilla(valor, minimo, maximo, paso):
+    valor = min(max(valor, minimo), maximo)
+    return round(minimo + round((valor - minimo) / paso) * paso, 10)
+
+
+def _mover(tipo, proto, estado, azar):
+    if tipo == "slider":
+        pasos = azar.choice([-1, 1]) * azar.randint(1, ARRASTRE)
+        actual = estado.double_array_value.data[0]
+        estado.double_array_value.data[:] = [_en_rejilla(actual + pasos * proto.step, proto.min, proto.max, proto.step)]
+    elif tipo == "number_input":
+        estado.double_value = _en_rejilla(azar.uniform(proto.min, proto.max), proto.min, proto.max, proto.step)
+    elif tipo == "selectbox":
+        estado.string_value = azar.choice(proto.options)
+    elif tipo == "radio":
+        estado.int_value = azar.randrange(len(proto.options))
+    else:
+        estado.bool_value = not estado.bool_value
+
+
+async def usuario(url, opcion, args, semilla, retraso, medidas):
+    azar = random.Random(semilla)
+    await asyncio.sleep(retraso)
+    sesion = Sesion(url)
+    try:
+        await sesion.conectar()
+        await sesion.correr()
+        await sesion.elegir("Gráficos", RENDERERS[args.renderer])
+        medidas["abrir"].append(await sesion.elegir("Ir a:", list(PAGINAS).index(opcion)))
+        for _ in range(args.interacciones):
+            if args.pensar_ms:
+                await asyncio.sleep(azar.expovariate(1000 / args.pensar_ms))
+            medidas["rerun"].append(await sesion.interactuar(azar))
+    except (OSError, asyncio.TimeoutError, StopIteration) as e:
+        medidas["caidas"].append(f"{type(e).__name__}: {e}")
+    finally:
+        sesion.cerrar()
+        medidas["errores"] += sesion.errores
+
+
+# ---------- REPORTE ----------
+def cargar_pagina(opcion, args):
+    """Todas las sesiones contra un servidor nuevo; devuelve las métricas de la página."""
+    with Servidor() as servidor:
+        pid, url = servidor.proceso.pid, f"ws://127.0.0.1:{servidor.puerto}/_stcore/stream"
+        rss_inicial = _memoria_mb(pid, "VmRSS")
+        medidas = {"abrir": [], "rerun": [], "errores": 0, "caidas": []}
+
+        async def todas():
+            await asyncio.gather(*(usuario(url, opcion, args, args.semilla * 10_000 + i,
+                                           args.rampa_s * i / args.sesiones, medidas)
+                                   for i in range(args.sesiones)))
+
+        inicio = time.perf_counter()
+        asyncio.run(todas())
+        duracion = time.perf_counter() - inicio
+        rss_pico = _memoria_mb(pid, "VmHWM")
+
+    rerun_ms = np.asarray(medidas["rerun"]) * 1e3
+    p50, p95, p99 = np.percentile(rerun_ms, [50, 95, 99]) if len(rerun_ms) else (float("nan"),) * 3
+    return {"pagina": opcion, "sesiones": args.sesiones, "reruns": len(rerun_ms),
+            "abrir_p50_ms": float(np.median(medidas["abrir"]) * 1e3) if medidas["abrir"] else float("nan"),
+            "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+            "reruns_por_s": (len(rerun_ms) + len(medidas["abrir"])) / duracion,
+            "errores": medidas["errores"] + len(medidas["caidas"]), "caidas": medidas["caidas"][:5],
+            "rss_inicial_mb": rss_inicial, "rss_pico_mb": rss_pico}
+
+
+def _mb(valor):
+    return f"{valor:8.0f}MB" if valor is not None else f"{'-':>10s}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sesiones", type=int, default=20, help="sesiones simultáneas por página")
+    parser.add_argument("--interacciones", type=int, default=10, help="reruns por sesión después de abrir la página")
+    parser.add_argument("--paginas", nargs="+", choices=list(PAGINAS.values()),
+                        default=[PAGINAS[opcion] for opcion in SIMULACIONES])
+    parser.add_argument("--renderer", choices=list(RENDERERS), default="matplotlib")
+    parser.add_argument("--pensar-ms", type=float, default=300,
+                        help="pausa media entre interacciones de una sesión (exponencial; 0 = sin pausa)")
+    parser.add_argument("--rampa-s", type=float, default=2, help="las sesiones se conectan repartidas en este lapso")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--json", help="además escribe los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    opciones = {modulo: opcion for opcion, modulo in PAGINAS.items()}
+    print(f"{args.sesiones} sesiones × {args.interacciones} interacciones, renderer {args.renderer}\n")
+    print(f"{'página':<14}{'abrir':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'reruns/s':>10}{'errores':>9}"
+          f"{'RSS inicial':>12}{'RSS pico':>10}", flush=True)
+    resultados = []
+    for modulo in args.paginas:
+        r = cargar_pagina(opciones[modulo], args)
+        resultados.append(r)
+        print(f"{r['pagina']:<14}{r['abrir_p50_ms']:>7.0f}ms{r['p50_ms']:>7.0f}ms{r['p95_ms']:>7.0f}ms"
+              f"{r['p99_ms']:>7.0f}ms{r['reruns_por_s']:>10.1f}{r['errores']:>9}"
+              f"  {_mb(r['rss_inicial_mb'])}{_mb(r['rss_pico_mb'])}", flush=True)
+        for caida in r["caidas"]:
+            print(f"    {caida}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=1, ensure_ascii=False)
+    return int(any(r["errores"] for r in resultados))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
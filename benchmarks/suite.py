@@ -0,0 +1,220 @@
+"""Suite de benchmarks: solvers, gráficos y páginas completas, con historial y umbral de regresión.
+
+Grupos de casos:
+    solver/   solve_sir y solve_sir_extended en valores típicos y en las esquinas de los deslizadores
+    grafico/  cada función de utils/plotter.py más su serialización (PNG o JSON de Vega-Lite), en el
+              camino de un rerun: la figura del pool ya existe y sólo cambian los datos
+    pagina/   show() de cada página con AppTest, sin servidor: el primer run de una sesión nueva
+              (con el proceso ya caliente) y los reruns siguientes de esa sesión
+
+De cada caso se guarda la mediana en ms. Cada corrida se agrega al
+historial JSON y se compara con la mediana de las últimas BASE corridas
+de la misma máquina; si algún caso empeora más que el umbral (y más que
+--minimo-ms en absoluto, para no fallar por ruido en casos de
+microsegundos) el proceso termina con código 1.
+
+Uso: python benchmarks/suite.py [--solo REGEX] [--umbral 0.25] [--minimo-ms 1]
+                                [--historial benchmarks/historial.json] [--repeticiones 5] [--no-guardar]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+from models.sir_estocastico import quantile_bands, simulate_sir_extended
+from models.sir_model import solve_rumor_batch, solve_sir, solve_sir_extended
+from sections import PAGINAS
+from utils import plotter
+
+BASE = 5
+UMBRAL = float(os.environ.get("SIR_BENCH_UMBRAL", 0.25))
+HISTORIAL = os.path.join(RAIZ, "benchmarks", "historial.json")
+
+# ---------- CASOS ----------
+# (N, I0, R0, β, k, t_max): los valores por defecto de la asignación 1 y las esquinas de sus deslizadores
+SOLVE_SIR = {
+    "tipico": (7138, 1, 0, 0.00014, 0.40, 40),
+    "beta_max_k_min": (20000, 100, 0, 0.0005, 0.1, 40),
+    "beta_min_k_max": (100, 1, 0, 0.000001, 1.0, 40),
+}
+# (N, I0, R0, β, γ, α, t_max): asignación 3
+SOLVE_SIR_EXTENDED = {
+    "tipico": (7138, 10, 0, 0.00014, 0.40, 0.05, 40),
+    "365_dias": (7138, 10, 0, 0.00014, 0.40, 0.05, 365),
+    "rigido": (1000, 10, 0, 0.00001, 1.0, 0.0, 365),
+    "beta_max_alpha_max": (20000, 100, 0, 0.001, 0.1, 0.2, 365),
+}
+
+
+def casos_solver():
+    casos = {}
+    for nombre, args in SOLVE_SIR.items():
+        casos[f"solver/solve_sir/{nombre}"] = lambda args=args: solve_sir(*args)
+    for nombre, args in SOLVE_SIR_EXTENDED.items():
+        casos[f"solver/solve_sir_extended/{nombre}"] = lambda args=args: solve_sir_extended(*args)
+    return casos
+
+
+def _serializar(grafico, renderer):
+    return grafico.to_json() if renderer == "vega" else plotter.figure_to_png(grafico)
+
+
+def casos_grafico():
+    """Cada llamada alterna entre dos juegos de datos, como un deslizador que se mueve."""
+    S, I, R, t = solve_sir(*SOLVE_SIR["tipico"])
+    S2, I2, R2, t2 = solve_sir(7138, 1, 0, 0.0002, 0.5, 40)
+    Se, Ie, Re, te = solve_sir_extended(*SOLVE_SIR_EXTENDED["tipico"])
+    Y, tb = simulate_sir_extended(*SOLVE_SIR_EXTENDED["tipico"], n_rep=200, n_t=201, seed=0)
+    bandas = quantile_bands(Y, tb)
+    escenarios = [{"k": 0.01, "label": "actual"}, {"k": 0.02, "label": "doble"}]
+    Yp, tp = solve_rumor_batch(275, 1, 8, 0.004, np.linspace(0.005, 0.05, 20), 15, n_t=200)
+    totales, curvas, nombres = Yp.sum(axis=0), Yp[:, 1], [f"parche {i}" for i in range(20)]
+    Z = np.random.default_rng(0).random((40, 40))
+    ejes = np.linspace(0, 1, 40)
+
+    def alternar(fn):
+        estado = {"i": 0}
+        def caso():
+            estado["i"] += 1
+            return fn(estado["i"] % 2)
+        return caso
+
+    casos = {}
+    for renderer in ("matplotlib", "vega"):
+        clave = f"bench/{renderer}"
+        casos[f"grafico/plot_sir/{renderer}"] = alternar(lambda i, r=renderer, c=clave: _serializar(
+            plotter.plot_sir(*((S, I, R, t) if i else (S2, I2, R2, t2)), clave=c, renderer=r), r))
+        casos[f"grafico/plot_sir_profesional/{renderer}"] = alternar(lambda i, r=renderer, c=clave: _serializar(
+            plotter.plot_sir_profesional(Se * (1 + 0.01 * i), Ie, Re, te, clave=c, renderer=r), r))
+        casos[f"grafico/plot_sir_profesional_bandas/{renderer}"] = alternar(lambda i, r=renderer, c=clave: _serializar(
+            plotter.plot_sir_profesional(Se, Ie * (1 + 0.01 * i), Re, te, clave=c, renderer=r, bandas=bandas), r))
+        casos[f"grafico/plot_sir_comparison/{renderer}"] = alternar(lambda i, r=renderer, c=clave: _serializar(
+            plotter.plot_sir_comparison(275, 1, 8, 0.004 + 0.001 * i, escenarios, 15, clave=c, renderer=r)[0], r))
+        casos[f"grafico/plot_patches/{renderer}"] = alternar(lambda i, r=renderer, c=clave: _serializar(
+            plotter.plot_patches(tp, totales * (1 + 0.01 * i), curvas, nombres, clave=c, renderer=r), r))
+    casos["grafico/plot_heatmap/matplotlib"] = alternar(lambda i: plotter.figure_to_png(
+        plotter.plot_heatmap(Z + i, ejes, ejes, "bench", "x", "y", "z", clave="bench/matplotlib")))
+    return casos
+
+
+def casos_pagina():
+    from streamlit.testing.v1 import AppTest
+
+    casos = {}
+    for opcion, modulo in PAGINAS.items():
+        estado = {}
+        def primer_run(modulo=modulo, estado=estado):
+            at = AppTest.from_string(f"from sections import {modulo}\n{modulo}()", default_timeout=120)
+            at.run()
+            if at.exception:
+                raise RuntimeError(f"{modulo}: {at.exception[0].message}")
+            estado["at"] = at
+        def rerun(modulo=modulo, estado=estado):
+            if "at" not in estado:
+                primer_run(modulo, estado)
+            estado["at"].run()
+        casos[f"pagina/{modulo}/primer_run"] = primer_run
+        casos[f"pagina/{modulo}/rerun"] = rerun
+    return casos
+
+# ---------- MEDICIÓN ----------
+def medir(fn, repeticiones, minimo_s=0.2):
+    """Mediana en ms de `repeticiones` tandas; cada tanda repite fn hasta durar `minimo_s`."""
+    fn()
+    inicio, vueltas = time.perf_counter(), 1
+    fn()
+    duracion = time.perf_counter() - inicio
+    vueltas = max(1, int(minimo_s / max(duracion, 1e-6)))
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(vueltas):
+            fn()
+        tiempos.append((time.perf_counter() - inicio) / vueltas * 1e3)
+    return statistics.median(tiempos)
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cargar_historial(ruta):
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def linea_base(historial, maquina, caso):
+    """Mediana del caso en las últimas BASE corridas de la misma máquina, o None si no hay."""
+    previos = [c["resultados"][caso] for c in historial if c.get("maquina") == maquina and caso in c["resultados"]]
+    return statistics.median(previos[-BASE:]) if previos else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--solo", help="expresión regular: sólo los casos cuyo nombre la contiene")
+    parser.add_argument("--umbral", type=float, default=UMBRAL,
+                        help="empeoramiento relativo que hace fallar la corrida (por defecto SIR_BENCH_UMBRAL o 0.25)")
+    parser.add_argument("--minimo-ms", type=float, default=1.0, help="empeoramiento absoluto mínimo para fallar")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--historial", default=HISTORIAL)
+    parser.add_argument("--no-guardar", action="store_true", help="compara pero no agrega la corrida al historial")
+    args = parser.parse_args(argv)
+
+    os.chdir(RAIZ)  # las páginas leen assets/ y style_navy.css con rutas relativas
+    casos = {**casos_solver(), **casos_grafico(), **casos_pagina()}
+    if args.solo:
+        casos = {nombre: fn for nombre, fn in casos.items() if re.search(args.solo, nombre)}
+
+    historial = cargar_historial(args.historial)
+    maquina = f"{platform.node()}/{platform.machine()}/py{platform.python_version()}"
+    resultados, regresiones = {}, []
+    print(f"{'caso':52s} {'ms':>10s} {'base':>10s} {'cambio':>8s}")
+    for nombre, fn in casos.items():
+        # Los primeros runs de página son caros y no se repiten en tandas
+        repeticiones = 1 if nombre.endswith("/primer_run") else args.repeticiones
+        ms = medir(fn, repeticiones, minimo_s=0 if repeticiones == 1 else 0.2)
+        resultados[nombre] = round(ms, 4)
+        base = linea_base(historial, maquina, nombre)
+        if base is None:
+            print(f"{nombre:52s} {ms:10.3f} {'-':>10s} {'':>8s}")
+            continue
+        cambio = ms / base - 1
+        marca = ""
+        if cambio > args.umbral and ms - base > args.minimo_ms:
+            regresiones.append((nombre, base, ms, cambio))
+            marca = "  REGRESIÓN"
+        print(f"{nombre:52s} {ms:10.3f} {base:10.3f} {cambio:+8.0%}{marca}")
+
+    if not args.no_guardar:
+        historial.append({"fecha": datetime.datetime.now().isoformat(timespec="seconds"), "commit": _commit(),
+                          "maquina": maquina, "resultados": resultados})
+        with open(args.historial, "w", encoding="utf-8") as f:
+            json.dump(historial, f, indent=1, ensure_ascii=False)
+
+    if regresiones:
+        print(f"\n{len(regresiones)} caso(s) empeoraron más de {args.umbral:.0%}:")
+        for nombre, base, ms, cambio in regresiones:
+            print(f"  {nombre}: {base:.3f} → {ms:.3f} ms ({cambio:+.0%})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
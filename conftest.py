@@ -0,0 +1 @@
+# En la raíz para que pytest agregue el proyecto a sys.path y los tests importen models/ y utils/
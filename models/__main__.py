@@ -0,0 +1,39 @@
+"""Resuelve escenarios sin abrir Streamlit: python -m models escenarios.csv -o trayectorias.parquet
+
+El archivo de escenarios (CSV, JSON o JSON Lines) tiene una fila por
+escenario con la columna "modelo" (sir, sir_extended, rumor, seir, sirs…),
+N, t_max, los parámetros del modelo y, si hacen falta, los iniciales como
+I0, R0 o E0. Las trayectorias y el resumen se escriben por bloques en
+Parquet o Arrow IPC, según la extensión de la salida.
+"""
+import argparse
+import sys
+import time
+
+from models.sir_lotes import read_scenarios, run_scenarios
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m models", description=__doc__.splitlines()[0])
+    parser.add_argument("escenarios", help="archivo .csv, .json o .jsonl con un escenario por fila")
+    parser.add_argument("-o", "--salida", required=True, help="trayectorias: .parquet, .arrow, .ipc o .feather")
+    parser.add_argument("--resumen", help="métricas por escenario (por defecto <salida>_resumen.<ext>)")
+    parser.add_argument("--workers", type=int, help="procesos (por defecto SIR_SWEEP_WORKERS; 1 = sin pool)")
+    parser.add_argument("--chunk", type=int, default=500, help="escenarios por integración y por row group")
+    parser.add_argument("--n-t", type=int, default=401, help="instantes por trayectoria")
+    parser.add_argument("--method", default="RK45", choices=["RK45", "BDF", "Radau"])
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    escenarios = read_scenarios(args.escenarios)
+
+    def progreso(hechos, total):
+        print(f"\r{hechos}/{total} escenarios", end="", file=sys.stderr, flush=True)
+
+    hechos = run_scenarios(escenarios, args.salida, args.resumen, args.workers, args.chunk, args.n_t,
+                           args.method, progreso)
+    print(f"\n{hechos} escenarios en {time.perf_counter() - inicio:.1f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
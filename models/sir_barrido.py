@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from models.sir_model import solve_sir_batch, solve_sir_extended_batch
+
+# ---------- BARRIDOS DE PARÁMETROS ----------
+# La malla se aplana y se corta en bloques de `chunk` combinaciones; cada
+# bloque es una sola integración en lote (solve_sir_batch) dentro de un
+# proceso del pool, que devuelve sólo las métricas y no las trayectorias.
+# El generador entrega los mapas parcialmente llenos (NaN = pendiente) a
+# medida que llegan los bloques, así que una página puede ir dibujándolos.
+#
+# Para el SIR clásico con horizonte infinito `sir_metrics` da lo mismo en
+# forma cerrada; el barrido mide en el horizonte t_max que muestra la página.
+METRICAS = ("pico", "dia_pico", "tamano_final", "R0")
+SWEEP_WORKERS = int(os.environ.get("SIR_SWEEP_WORKERS", os.cpu_count() or 1))
+_ejecutores = {}
+
+
+def _pool(workers):
+    """Un pool persistente por número de procesos: arrancarlos cuesta más que un bloque."""
+    if workers not in _ejecutores:
+        # spawn: el servidor de Streamlit tiene hilos y fork no es seguro ahí
+        _ejecutores[workers] = ProcessPoolExecutor(max_workers=workers,
+                                                   mp_context=multiprocessing.get_context("spawn"))
+    return _ejecutores[workers]
+
+
+def _bloque(modelo, N, I0, R0, parametros, t_max, n_t):
+    """Métricas de un bloque de combinaciones; corre en un proceso del pool."""
+    if modelo == "sir":
+        beta, k = parametros
+        Y, t = solve_sir_batch(N, I0, R0, beta, k, t_max, n_t=n_t)
+        salida = k
+    else:
+        beta, gamma, alpha = parametros
+        Y, t = solve_sir_extended_batch(N, I0, R0, beta, gamma, alpha, t_max, n_t=n_t)
+        salida = gamma + alpha
+    I = Y[:, 1]
+    pico_idx = np.argmax(I, axis=1)
+    return {
+        "pico": I[np.arange(len(I)), pico_idx],
+        "dia_pico": t[pico_idx],
+        "tamano_final": N - Y[:, 0, -1],
+        "R0": beta * N / salida,
+    }
+
+
+def _barrer(modelo, N, I0, R0, ejes, t_max, chunk, workers, n_t):
+    forma = tuple(len(v) for v in ejes if np.ndim(v))
+    malla = np.meshgrid(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in ejes), indexing="ij")
+    planos = [m.ravel() for m in malla]
+    total = planos[0].size
+    mapas = {nombre: np.full(total, np.nan) for nombre in METRICAS}
+    vistas = {nombre: plano.reshape(forma) for nombre, plano in mapas.items()}
+    bloques = [(i, min(i + chunk, total)) for i in range(0, total, chunk)]
+
+    if workers <= 1:
+        completados = 0
+        for ini, fin in bloques:
+            resultado = _bloque(modelo, N, I0, R0, [p[ini:fin] for p in planos], t_max, n_t)
+            for nombre in METRICAS:
+                mapas[nombre][ini:fin] = resultado[nombre]
+            completados += fin - ini
+            yield completados, total, vistas
+        return
+
+    ejecutor = _pool(workers)
+    futuros = {ejecutor.submit(_bloque, modelo, N, I0, R0, [p[ini:fin] for p in planos], t_max, n_t): (ini, fin)
+               for ini, fin in bloques}
+    try:
+        completados = 0
+        for futuro in as_completed(futuros):
+            ini, fin = futuros[futuro]
+            resultado = futuro.result()
+            for nombre in METRICAS:
+                mapas[nombre][ini:fin] = resultado[nombre]
+            completados += fin - ini
+            yield completados, total, vistas
+    finally:
+        # Si quien consume el generador lo abandona, los bloques pendientes no se calculan
+        for futuro in futuros:
+            futuro.cancel()
+
+
+def sweep_sir(N, I0, R0, beta, k, t_max, chunk=1000, workers=None, n_t=401):
+    """Barre la malla β × k del SIR clásico.
+
+    `beta` y `k` son ejes 1-D (o escalares, que quedan fijos). Es un
+    generador de (completados, total, mapas): `mapas` tiene "pico",
+    "dia_pico", "tamano_final" (N - S en t_max) y "R0" con la forma de la
+    malla y NaN donde aún no llegó el resultado; se actualiza en el lugar.
+    `workers` procesos (por defecto SIR_SWEEP_WORKERS); con 1 corre aquí mismo.
+    """
+    workers = SWEEP_WORKERS if workers is None else workers
+    return _barrer("sir", N, I0, R0, (beta, k), t_max, chunk, workers, n_t)
+
+
+def sweep_sir_extended(N, I0, R0, beta, gamma, alpha, t_max, chunk=1000, workers=None, n_t=401):
+    """Barre la malla β × γ × α del SIR extendido; mismas opciones y salida que sweep_sir.
+
+    Los ejes escalares quedan fijos, así que por ejemplo alpha=0.05 da un mapa β × γ.
+    """
+    workers = SWEEP_WORKERS if workers is None else workers
+    return _barrer("sir_extended", N, I0, R0, (beta, gamma, alpha), t_max, chunk, workers, n_t)
@@ -0,0 +1,402 @@
+import csv
+import io
+
+import numpy as np
+
+from models.sir_barrido import _pool
+from models.sir_registro import _integrar_lote, get_model
+
+# ---------- CALIBRACIÓN CONTRA CASOS OBSERVADOS ----------
+# Se ajustan los parámetros de un modelo registrado (sir_registro) a una
+# serie diaria por mínimos cuadrados ponderados: el residuo del día d es
+# (modelo - observado) / sqrt(max(observado, 1)), como en Poisson.
+#
+# Gradientes exactos por ecuaciones de sensibilidad hacia adelante: junto con
+# el estado y se integra s_p = ∂y/∂log θ_p, que cumple
+#     s_p' = J(y)·s_p + ∂f/∂log θ_p,
+# y como cada tasa es un monomio en los parámetros, ∂tasa/∂log θ_p es la
+# tasa por cuántas veces aparece θ_p en ella. Con s el jacobiano de los
+# residuos sale de la misma integración, sin diferencias finitas.
+#
+# Multi-start en lote: todos los puntos de partida avanzan a la vez con
+# Levenberg–Marquardt (un amortiguamiento por inicio) y cada iteración es una
+# sola integración en lote de los inicios que no convergieron. Con
+# workers > 1 los inicios se reparten en el pool de procesos de sir_barrido.
+#
+# Los parámetros se ajustan en escala logarítmica (siempre positivos). Los
+# de tasas con dos compartimentos (acción de masas, β·S·I) se escalan por N
+# para que los límites y los inicios sean "por día" en cualquier población.
+#
+# I0 puede ajustarse como un parámetro más ("I0" en `ajustar`): el primer
+# conteo trae ruido de Poisson y tomarlo como exacto sesga β y deja errores
+# estándar demasiado chicos. Su sensibilidad no tiene término explícito,
+# sólo la condición inicial ∂(S, I)/∂log I0 = (-I0, I0).
+#
+# Todos los inicios se ajustan con la tolerancia RTOL_BUSQUEDA y sólo el
+# mejor se termina con RTOL: la búsqueda no necesita la precisión final.
+OBSERVABLES = ("I", "incidencia")
+LIMITES = (1e-3, 10.0)      # tasa por día (β·N para acción de masas)
+LIMITES_I0 = (0.1, 0.5)     # I0 entre 0.1 personas y la mitad de N
+RTOL_BUSQUEDA = 1e-4
+RTOL = 1e-6
+INICIOS = (0.02, 3.0)       # rango log-uniforme de los puntos de partida
+PASO_MAXIMO = 1.0           # un paso cambia cada parámetro como mucho en un factor e
+DESCARTE = 10.0             # desde la 5.ª iteración se abandona un inicio con costo > DESCARTE × el mejor
+FALTANTES = ("", "na", "nan", "n/a", "-")
+
+
+def read_counts(fuente):
+    """(dias, casos) de un CSV con una columna de casos y, opcionalmente, una de días.
+
+    `fuente` es una ruta, bytes o un archivo abierto (p. ej. el de
+    st.file_uploader). La columna de días es "dia", "día", "day" o "t"; la
+    de casos, "casos", "cases", "I" o la primera otra columna numérica. Sin
+    columna de días las filas son días consecutivos. Los días se corren para
+    que el primero sea 0. Las filas sin casos ("", "NA", "NaN", "-") se
+    saltan.
+    """
+    if isinstance(fuente, str):
+        with open(fuente, "rb") as f:
+            contenido = f.read()
+    elif isinstance(fuente, bytes):
+        contenido = fuente
+    else:
+        contenido = fuente.read()
+    if isinstance(contenido, bytes):
+        contenido = contenido.decode("utf-8-sig")
+    filas = list(csv.DictReader(io.StringIO(contenido), delimiter=_separador(contenido)))
+    if not filas:
+        raise ValueError("el archivo no tiene filas")
+    columnas = {c.strip().lower(): c for c in filas[0] if c is not None}
+    col_dia = next((columnas[c] for c in ("dia", "día", "day", "t") if c in columnas), None)
+    col_casos = next((columnas[c] for c in ("casos", "cases", "i") if c in columnas), None)
+    if col_casos is None:
+        col_casos = next((c for c in filas[0] if c != col_dia and _es_numero(filas[0][c])), None)
+    if col_casos is None:
+        raise ValueError(f"no hay una columna numérica de casos entre {list(filas[0])}")
+    filas = [f for f in filas if (f.get(col_casos) or "").strip().lower() not in FALTANTES]
+    if not filas:
+        raise ValueError(f"la columna {col_casos!r} no tiene casos")
+    malos = [f[col_casos] for f in filas if not _es_numero(f[col_casos])]
+    if malos:
+        raise ValueError(f"{col_casos}: {malos[0]!r} no es un número")
+    casos = np.array([float(f[col_casos]) for f in filas])
+    if col_dia is None:
+        dias = np.arange(len(casos))
+    else:
+        dias = np.array([float(f[col_dia]) for f in filas])
+        if np.any(dias != np.round(dias)):
+            raise ValueError("los días deben ser enteros")
+        dias = dias.astype(int) - int(dias.min())
+    if len(np.unique(dias)) != len(dias):
+        raise ValueError("hay días repetidos")
+    orden = np.argsort(dias)
+    return dias[orden], casos[orden]
+
+
+def _separador(texto):
+    primera = texto.splitlines()[0] if texto else ""
+    return ";" if primera.count(";") > primera.count(",") else ","
+
+
+def _es_numero(valor):
+    try:
+        float(valor)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+# ---------- SENSIBILIDADES ----------
+class _Sistema:
+    """Estado y sensibilidades de un modelo registrado para un lote de n juegos de parámetros.
+
+    El vector integrado tiene forma (1 + P, m', n): el estado y cada
+    sensibilidad ∂y/∂log θ_p. Con observable="incidencia" se agrega un
+    compartimento C que acumula los flujos que entran a I, así los casos
+    nuevos del día d son C(d) - C(d - 1). Si "I0" está entre los
+    ajustados, cada juego trae su I0 y el primer compartimento (S) pone lo
+    que falta para N.
+    """
+
+    def __init__(self, modelo, ajustados, observable):
+        self.modelo = modelo
+        self.ajustados = tuple(ajustados)
+        self.m = len(modelo.compartimentos) + (observable == "incidencia")
+        i = self.i = modelo.compartimentos.index("I")
+        self.salida = i if observable == "I" else self.m - 1
+        # (origen, destino, parámetros, factores, veces que aparece cada parámetro ajustado, acumula en C)
+        self.transiciones = [
+            (o, d, parametros, factores, np.array([parametros.count(p) for p in self.ajustados], dtype=float),
+             observable == "incidencia" and d == i)
+            for o, d, parametros, factores in modelo.transiciones]
+
+    def deriv(self, parametros, n):
+        P, m = len(self.ajustados), self.m
+        terminos = []
+        for o, d, nombres, factores, veces, acumula in self.transiciones:
+            c = np.ones(n)
+            for nombre in nombres:
+                c = c * parametros[nombre]
+            destinos = (d, m - 1) if acumula else (d,)
+            terminos.append((o, destinos, c, factores, veces[:, None], veces.any()))
+
+        def deriv(t, z):
+            z = z.reshape(1 + P, m, n)
+            y, s = z[0], z[1:]
+            dz = np.zeros_like(z)
+            for o, destinos, c, factores, veces, explicito in terminos:
+                # ∂tasa/∂y_f para cada factor (regla del producto) y la tasa misma
+                parciales = []
+                for a in range(len(factores)):
+                    parcial = c
+                    for b, g in enumerate(factores):
+                        if b != a:
+                            parcial = parcial * y[g]
+                    parciales.append(parcial)
+                tasa = parciales[0] * y[factores[0]] if factores else c
+                # Derivada de la tasa a lo largo de cada sensibilidad, más el término explícito
+                # del parámetro (en escala log, veces·tasa)
+                dtasa = veces * tasa if explicito else np.zeros((P, n))
+                for parcial, f in zip(parciales, factores):
+                    dtasa += parcial * s[:, f]
+                dz[:, o, :] -= np.concatenate([tasa[None], dtasa])
+                for destino in destinos:
+                    dz[0, destino] += tasa
+                    dz[1:, destino] += dtasa
+            return dz.reshape(-1)
+        return deriv
+
+    def integrar(self, y0, parametros, t_max, rtol=RTOL):
+        """(salida, sensibilidades) en los días 0..t_max: formas (n, t_max + 1) y (n, P, t_max + 1)."""
+        n = len(next(iter(parametros.values())))
+        z0 = np.zeros((1 + len(self.ajustados), self.m, n))
+        z0[0, :len(y0)] = np.asarray(y0, dtype=float)[:, None]
+        if "I0" in self.ajustados:
+            I0 = np.asarray(parametros["I0"], dtype=float)
+            j = 1 + self.ajustados.index("I0")
+            z0[0, 0] += z0[0, self.i] - I0
+            z0[0, self.i] = I0
+            z0[j, 0], z0[j, self.i] = -I0, I0
+        Z, _, _ = _integrar_lote(self.deriv(parametros, n), z0.reshape(-1, n), t_max, int(t_max) + 1,
+                                 rtol, rtol * z0[0].sum(axis=0).max())
+        Z = Z.reshape(n, 1 + len(self.ajustados), self.m, -1)
+        return Z[:, 0, self.salida], Z[:, 1:, self.salida]
+
+# ---------- LEVENBERG–MARQUARDT EN LOTE ----------
+def _escalas(modelo, ajustados, N):
+    """Factor por parámetro que lleva los límites "por día" a las unidades del modelo (1/N para β)."""
+    veces = {p: 0 for p in ajustados}
+    for _, _, parametros, factores in modelo.transiciones:
+        for p in parametros:
+            if p in veces:
+                veces[p] = max(veces[p], len(factores) - 1)
+    return np.array([float(N) ** -veces[p] for p in ajustados])
+
+
+def _residuos(sistema, y0, theta, fijos, dias, casos, pesos, observable, rtol):
+    parametros = dict(fijos)
+    parametros.update({p: np.exp(theta[:, j]) for j, p in enumerate(sistema.ajustados)})
+    n = len(theta)
+    parametros = {p: np.broadcast_to(np.asarray(v, dtype=float), (n,)) for p, v in parametros.items()}
+    salida, sens = sistema.integrar(y0, parametros, int(dias[-1]), rtol)
+    if observable == "incidencia":
+        modelo, jac = salida[:, dias] - salida[:, dias - 1], sens[:, :, dias] - sens[:, :, dias - 1]
+    else:
+        modelo, jac = salida[:, dias], sens[:, :, dias]
+    r = (modelo - casos) * pesos
+    return r, (jac * pesos).transpose(0, 2, 1)
+
+
+def _levenberg_marquardt(nombre, ajustados, observable, y0, theta, fijos, dias, casos, limites, max_iter, tol,
+                         rtol=RTOL):
+    """Ajusta todos los inicios de `theta` (n, P) a la vez; devuelve theta, costo, iteraciones y convergencia."""
+    sistema = _Sistema(get_model(nombre), ajustados, observable)
+    pesos = 1 / np.sqrt(np.maximum(casos, 1.0))
+    bajo, alto = limites
+    n, P = theta.shape
+    r, J = _residuos(sistema, y0, theta, fijos, dias, casos, pesos, observable, rtol)
+    costo = 0.5 * np.sum(r ** 2, axis=1)
+    lam = np.full(n, 1e-2)
+    iteraciones = np.zeros(n, dtype=int)
+    convergio = np.zeros(n, dtype=bool)
+    descartado = np.zeros(n, dtype=bool)
+    evaluaciones = 1
+    for iteracion in range(max_iter):
+        if iteracion >= 5:
+            # Un inicio que va a un mínimo local malo no va a ganar, y si cae en una zona rígida
+            # (tasas en el límite) haría que todo el lote avance con pasos diminutos
+            descartado |= ~convergio & (costo > DESCARTE * costo.min())
+        activos = np.flatnonzero(~convergio & ~descartado)
+        if not len(activos):
+            break
+        Ja, ra = J[activos], r[activos]
+        g = np.einsum("ntp,nt->np", Ja, ra)
+        H = np.einsum("ntp,ntq->npq", Ja, Ja)
+        diagonal = np.einsum("npp->np", H)
+        A = H + (lam[activos, None] * np.maximum(diagonal, 1e-12))[:, :, None] * np.eye(P)
+        paso = -np.linalg.solve(A, g[:, :, None])[:, :, 0]
+        # Región de confianza: un paso enorme lleva a tasas absurdas y un solo miembro
+        # rígido obliga a todo el lote a dar pasos diminutos
+        paso *= np.minimum(1.0, PASO_MAXIMO / np.maximum(np.max(np.abs(paso), axis=1), 1e-300))[:, None]
+        prueba = np.clip(theta[activos] + paso, bajo, alto)
+        r_p, J_p = _residuos(sistema, y0, prueba, fijos, dias, casos, pesos, observable, rtol)
+        evaluaciones += 1
+        costo_p = 0.5 * np.sum(r_p ** 2, axis=1)
+        mejora = costo_p < costo[activos]
+        aceptados = activos[mejora]
+        # Converge si el costo casi no baja o el paso es diminuto en escala log
+        relativo = (costo[activos] - costo_p) / np.maximum(costo[activos], 1e-300)
+        quieto = (mejora & (relativo < tol)) | (np.max(np.abs(prueba - theta[activos]), axis=1) < 1e-8)
+        theta[aceptados], r[aceptados], J[aceptados], costo[aceptados] = (
+            prueba[mejora], r_p[mejora], J_p[mejora], costo_p[mejora])
+        lam[aceptados] = np.maximum(lam[aceptados] / 3, 1e-9)
+        lam[activos[~mejora]] *= 4
+        iteraciones[activos] += 1
+        convergio[activos[quieto | (lam[activos] > 1e10)]] = True
+    return {"theta": theta, "costo": costo, "iteraciones": iteraciones, "convergio": convergio,
+            "descartado": descartado, "evaluaciones": evaluaciones, "jacobiano": J}
+
+
+def calibrate(modelo, dias, casos, N, I0=None, R0=0, observable="I", ajustar=None, fijos=None, n_inicios=16,
+              inicios=None, workers=1, seed=0, max_iter=60, tol=1e-7):
+    """Ajusta los parámetros de un modelo registrado a una serie de casos diarios.
+
+    `observable="I"` compara con I(d) (casos activos); `"incidencia"`, con
+    los casos nuevos de cada día (los que entran a I entre d - 1 y d; el día
+    0 no cuenta). `ajustar` elige los parámetros (por defecto todos los del
+    modelo, más "I0" si no se da `I0`); los demás van en `fijos`. Un `I0`
+    dado queda fijo salvo que "I0" esté en `ajustar`, y entonces es el punto
+    de partida; sin `I0` se parte del primer valor observado.
+
+    `n_inicios` puntos de partida log-uniformes (más los de `inicios`, una
+    lista de dicts con valores del modelo, p. ej. los deslizadores de la
+    página) se ajustan juntos; con `workers` > 1 se reparten en procesos.
+
+    Devuelve un dict con "parametros" (el mejor ajuste, con "I0" si se
+    ajustó), "error_estandar" (aproximación lineal, de la curvatura de
+    Gauss–Newton; si I0 queda fijo supone que es exacto), "costo", "t" y
+    "ajuste" (la curva del observable día a día), "inicios" (el resultado
+    de cada punto de partida, del mejor al peor) y "evaluaciones".
+    """
+    if observable not in OBSERVABLES:
+        raise ValueError(f"observable debe ser uno de {OBSERVABLES}")
+    definido = get_model(modelo)
+    if "I" not in definido.compartimentos:
+        raise ValueError(f"{modelo}: no tiene compartimento I para comparar con los casos")
+    dias, casos = np.asarray(dias, dtype=int), np.asarray(casos, dtype=float)
+    if len(dias) != len(casos):
+        raise ValueError("dias y casos deben tener el mismo largo")
+    fijos = dict(fijos or {})
+    ajustados = tuple(ajustar or [p for p in definido.parametros if p not in fijos] + (["I0"] if I0 is None else []))
+    faltan = set(definido.parametros) - set(ajustados) - set(fijos)
+    if faltan:
+        raise ValueError(f"{modelo}: faltan valores fijos para {sorted(faltan)}")
+    sobran = set(ajustados) - set(definido.parametros) - {"I0"}
+    if sobran:
+        raise ValueError(f"{modelo}: no tiene los parámetros {sorted(sobran)}")
+    if I0 is None:
+        I0 = max(float(casos[np.argmin(dias)]), 1.0)
+    if observable == "incidencia":
+        dias, casos = dias[dias > 0], casos[dias > 0]
+    if len(dias) <= len(ajustados):
+        raise ValueError(f"hacen falta más de {len(ajustados)} días observados")
+
+    y0 = np.zeros(len(definido.compartimentos))
+    y0[definido.compartimentos.index("I")] = I0
+    if "R" in definido.compartimentos:
+        y0[definido.compartimentos.index("R")] = R0
+    y0[0] = N - y0.sum()
+
+    escalas = _escalas(definido, ajustados, N)
+    limites = np.log(LIMITES[0] * escalas), np.log(LIMITES[1] * escalas)
+    azar = np.random.default_rng(seed)
+    theta = np.log(np.exp(azar.uniform(*np.log(INICIOS), size=(n_inicios, len(ajustados)))) * escalas)
+    if "I0" in ajustados:
+        # I0 no se sortea: todos los inicios parten del observado
+        j = ajustados.index("I0")
+        limites[0][j], limites[1][j] = np.log(LIMITES_I0[0]), np.log(LIMITES_I0[1] * N)
+        theta[:, j] = np.log(I0)
+    if inicios:
+        propios = np.log([[max(float(inicio.get("I0", I0) if p == "I0" else inicio[p]), 1e-300) for p in ajustados]
+                          for inicio in inicios])
+        theta = np.vstack([propios, theta])
+    theta = np.clip(theta, *limites)
+
+    argumentos = (modelo, ajustados, observable, y0, fijos, dias, casos, limites, max_iter, tol)
+    if workers <= 1:
+        partes = [_ajustar_bloque(theta, *argumentos, RTOL_BUSQUEDA)]
+    else:
+        bloques = [b for b in np.array_split(theta, workers) if len(b)]
+        partes = list(_pool(workers).map(_ajustar_bloque, bloques, *([a] * len(bloques) for a in argumentos),
+                                         [RTOL_BUSQUEDA] * len(bloques)))
+    resultado = {clave: np.concatenate([p[clave] for p in partes]) for clave in
+                 ("theta", "costo", "iteraciones", "convergio", "descartado", "jacobiano")}
+    # El mejor inicio se termina con la tolerancia fina; su costo y su jacobiano son los que se informan
+    mejor = np.argmin(resultado["costo"])
+    final = _ajustar_bloque(resultado["theta"][mejor:mejor + 1], *argumentos, RTOL)
+    partes.append(final)
+    for clave in ("theta", "costo", "jacobiano"):
+        resultado[clave][mejor] = final[clave][0]
+    resultado["iteraciones"][mejor] += final["iteraciones"][0]
+    resultado["convergio"][mejor] = final["convergio"][0]
+    orden = np.argsort(resultado["costo"])
+    mejor = orden[0]
+
+    valores = np.exp(resultado["theta"][mejor])
+    J = resultado["jacobiano"][mejor]
+    grados = max(len(casos) - len(ajustados), 1)
+    varianza = 2 * resultado["costo"][mejor] / grados
+    try:
+        covarianza = varianza * np.linalg.inv(J.T @ J)
+        error = valores * np.sqrt(np.maximum(np.diag(covarianza), 0))
+    except np.linalg.LinAlgError:
+        error = np.full(len(ajustados), np.nan)
+
+    parametros = {**fijos, **dict(zip(ajustados, valores.tolist()))}
+    if "I0" in parametros:
+        y0[0] += y0[definido.compartimentos.index("I")] - parametros["I0"]
+        y0[definido.compartimentos.index("I")] = parametros["I0"]
+    sistema = _Sistema(definido, ajustados, observable)
+    curva, _ = sistema.integrar(y0, {p: np.array([v]) for p, v in parametros.items()}, int(dias[-1]))
+    t = np.arange(int(dias[-1]) + 1)
+    curva = curva[0]
+    if observable == "incidencia":
+        curva = np.concatenate([[np.nan], np.diff(curva)])
+    return {
+        "modelo": modelo,
+        "observable": observable,
+        "parametros": parametros,
+        "error_estandar": dict(zip(ajustados, error.tolist())),
+        "costo": float(resultado["costo"][mejor]),
+        "y0": dict(zip(definido.compartimentos, y0.tolist())),
+        "t": t,
+        "ajuste": curva,
+        "inicios": [{"parametros": dict(zip(ajustados, np.exp(resultado["theta"][i]).tolist())),
+                     "costo": float(resultado["costo"][i]), "iteraciones": int(resultado["iteraciones"][i]),
+                     "convergio": bool(resultado["convergio"][i]),
+                     "descartado": bool(resultado["descartado"][i])} for i in orden],
+        "evaluaciones": int(sum(p["evaluaciones"] for p in partes)),
+    }
+
+
+def _ajustar_bloque(theta, modelo, ajustados, observable, y0, fijos, dias, casos, limites, max_iter, tol, rtol):
+    """Un bloque de inicios; corre en el proceso actual o en uno del pool."""
+    return _levenberg_marquardt(modelo, ajustados, observable, y0, np.array(theta, dtype=float), fijos, dias,
+                                casos, limites, max_iter, tol, rtol)
+
+
+def synthetic_counts(modelo, N, I0, t_max, observable="I", R0=0, seed=0, **parametros):
+    """(dias, casos) con ruido de Poisson alrededor de la solución del modelo, para probar el ajuste."""
+    definido = get_model(modelo)
+    sistema = _Sistema(definido, (), observable)
+    y0 = np.zeros(len(definido.compartimentos))
+    y0[definido.compartimentos.index("I")] = I0
+    if "R" in definido.compartimentos:
+        y0[definido.compartimentos.index("R")] = R0
+    y0[0] = N - y0.sum()
+    curva, _ = sistema.integrar(y0, {p: np.array([float(v)]) for p, v in parametros.items()}, int(t_max))
+    curva = curva[0]
+    if observable == "incidencia":
+        curva = np.concatenate([[0.0], np.diff(curva)])
+    casos = np.random.default_rng(seed).poisson(np.maximum(curva, 0)).astype(float)
+    return np.arange(int(t_max) + 1), casos
@@ -0,0 +1,177 @@
+import numpy as np
+
+# ---------- MODELOS COMO REACCIONES ----------
+# Cada reacción mueve a una persona de un compartimento a otro (0 = S,
+# 1 = I, 2 = R). Las propensiones reciben el estado (3, n_rep) y devuelven
+# (n_reacciones, n_rep); todas las réplicas avanzan juntas como arreglos.
+def _clasico(beta, k):
+    def propensiones(y):
+        S, I = y[0], y[1]
+        return np.stack([beta * S * I, k * I])
+    return propensiones, [(0, 1), (1, 2)]
+
+
+def _extendido(beta, gamma, alpha):
+    def propensiones(y):
+        S, I = y[0], y[1]
+        return np.stack([beta * S * I, gamma * I, alpha * S])
+    return propensiones, [(0, 1), (1, 2), (0, 2)]
+
+
+def _rumor(b, k):
+    def propensiones(y):
+        S, I, R = y
+        return np.stack([b * S * I, k * I * R])
+    return propensiones, [(0, 1), (1, 2)]
+
+
+def simulate_sir(N, I0, R0, beta, k, t_max, n_rep=1000, method="tau", n_t=201, tau=0.05, seed=None,
+                 full_output=False):
+    """Réplicas estocásticas del SIR clásico.
+
+    `method="ssa"` es el algoritmo exacto de Gillespie y `method="tau"`
+    tau-leaping con paso fijo `tau` (en días). Devuelve (Y, t) con Y de forma
+    (n_rep, 3, n_t), igual que solve_sir_batch; `seed` fija el generador.
+    Con `full_output=True` agrega un dict con "contagios", el total de
+    contagios (S → I) de cada réplica.
+    """
+    return _simular(_clasico(beta, k), N, I0, R0, t_max, n_rep, method, n_t, tau, seed, full_output)
+
+
+def simulate_sir_extended(N, I0, R0, beta, gamma, alpha, t_max, n_rep=1000, method="tau", n_t=201, tau=0.05,
+                          seed=None, full_output=False):
+    """Réplicas estocásticas del SIR extendido (con inmunización α); mismas opciones que simulate_sir."""
+    return _simular(_extendido(beta, gamma, alpha), N, I0, R0, t_max, n_rep, method, n_t, tau, seed, full_output)
+
+
+def simulate_rumor(N, I0, R0, b, k, t_max, n_rep=1000, method="tau", n_t=201, tau=0.05, seed=None,
+                   full_output=False):
+    """Réplicas estocásticas del modelo de rumor (dI/dt = bSI - kIR); mismas opciones que simulate_sir."""
+    return _simular(_rumor(b, k), N, I0, R0, t_max, n_rep, method, n_t, tau, seed, full_output)
+
+
+def _simular(modelo, N, I0, R0, t_max, n_rep, method, n_t, tau, seed, full_output):
+    rng = np.random.default_rng(seed)
+    y0 = np.array([N - I0 - R0, I0, R0], dtype=np.int64)
+    y = np.repeat(y0[:, None], n_rep, axis=1)
+    t_eval = np.linspace(0, t_max, n_t)
+    if method == "ssa":
+        Y, contagios = _ssa(modelo, y, t_eval, rng)
+    elif method == "tau":
+        Y, contagios = _tau_leaping(modelo, y, t_eval, tau, rng)
+    else:
+        raise ValueError(f"method debe ser 'ssa' o 'tau', no {method!r}")
+    if not full_output:
+        return Y, t_eval
+    return Y, t_eval, {"contagios": contagios}
+
+# ---------- ALGORITMO DE GILLESPIE ----------
+def _ssa(modelo, y, t_eval, rng):
+    """SSA exacto con todas las réplicas en paralelo.
+
+    En cada iteración cada réplica activa sortea su tiempo de espera y su
+    reacción; antes de saltar, los puntos de la malla que quedan atrás
+    reciben el estado actual. Una réplica sale del lote al pasar t_max o
+    cuando ya no hay reacciones posibles (propensión total 0).
+    """
+    propensiones, reacciones = modelo
+    cambios = np.zeros((3, len(reacciones)), dtype=np.int64)
+    for j, (origen, destino) in enumerate(reacciones):
+        cambios[origen, j], cambios[destino, j] = -1, 1
+
+    n_rep, n_t = y.shape[1], len(t_eval)
+    Y = np.empty((n_rep, 3, n_t))
+    t = np.zeros(n_rep)
+    contagios = np.zeros(n_rep, dtype=np.int64)
+    siguiente = np.zeros(n_rep, dtype=int)
+    activos = np.arange(n_rep)
+    while activos.size:
+        ya = y[:, activos]
+        a = propensiones(ya)
+        a0 = a.sum(axis=0)
+        with np.errstate(divide="ignore"):
+            t_nuevo = t[activos] + rng.exponential(size=activos.size) / a0
+
+        # Puntos de la malla anteriores al salto
+        hasta = np.searchsorted(t_eval, t_nuevo, side="left")
+        pendiente = siguiente[activos] < hasta
+        while pendiente.any():
+            r = activos[pendiente]
+            Y[r, :, siguiente[r]] = ya[:, pendiente].T
+            siguiente[r] += 1
+            pendiente = siguiente[activos] < hasta
+
+        # Reacción elegida con probabilidad a_j / a0
+        u = rng.random(activos.size) * a0
+        j = np.minimum((np.cumsum(a, axis=0) <= u).sum(axis=0), len(reacciones) - 1)
+        # Sólo cuentan los saltos que ocurren antes de t_max
+        valido = t_nuevo <= t_eval[-1]
+        y[:, activos] = ya + cambios[:, j] * valido
+        contagios[activos] += (j == 0) & valido
+        t[activos] = t_nuevo
+        activos = activos[valido & (a0 > 0)]
+    return Y, contagios
+
+# ---------- TAU-LEAPING ----------
+def _tau_leaping(modelo, y, t_eval, tau, rng):
+    """Tau-leaping con paso fijo ajustado para caer exactamente en la malla.
+
+    En cada salto el número de veces que ocurre cada reacción es
+    Poisson(a_j·τ). Para que ningún compartimento quede negativo, cada
+    reacción se limita a las personas que su compartimento de origen tenía
+    al inicio del salto menos las que ya tomaron las reacciones anteriores.
+    """
+    propensiones, reacciones = modelo
+    n_rep, n_t = y.shape[1], len(t_eval)
+    Y = np.empty((n_rep, 3, n_t))
+    Y[:, :, 0] = y.T
+    contagios = np.zeros(n_rep, dtype=np.int64)
+    for i in range(1, n_t):
+        dt = t_eval[i] - t_eval[i - 1]
+        pasos = max(int(np.ceil(dt / tau)), 1)
+        h = dt / pasos
+        for _ in range(pasos):
+            conteos = rng.poisson(propensiones(y) * h)
+            disponible = y.copy()
+            for j, (origen, destino) in enumerate(reacciones):
+                n = np.minimum(conteos[j], disponible[origen])
+                disponible[origen] -= n
+                y[origen] -= n
+                y[destino] += n
+                if j == 0:
+                    contagios += n
+        Y[:, :, i] = y.T
+    return Y, contagios
+
+# ---------- RESÚMENES ----------
+def quantile_bands(Y, t, niveles=(0.05, 0.95)):
+    """Bandas de cuantiles por punto de la malla, listas para plot_sir_profesional(bandas=...).
+
+    Devuelve un dict con "t", "inferior" y "superior" (cada uno (3, n_t) con
+    S, I, R) y "mediana".
+    """
+    inferior, mediana, superior = np.quantile(Y, [niveles[0], 0.5, niveles[1]], axis=0)
+    return {"t": t, "inferior": inferior, "superior": superior, "mediana": mediana}
+
+
+def stochastic_summary(Y, contagios, N, fraccion_menor=0.1):
+    """Probabilidad de extinción y dispersión del brote entre réplicas.
+
+    `contagios` es el de full_output=True. El tamaño del brote es I0 más los
+    contagios; una réplica cuenta como extinguida si al final ya no quedan I
+    y el brote no llegó a `fraccion_menor`·N (brote menor). Devuelve un dict
+    con "prob_extincion", la media y desviación estándar del tamaño del
+    brote y del pico, y el número de réplicas.
+    """
+    I = Y[:, 1]
+    tamano = I[:, 0] + contagios
+    pico = I.max(axis=1)
+    extinguida = (I[:, -1] == 0) & (tamano < fraccion_menor * N)
+    return {
+        "prob_extincion": float(extinguida.mean()),
+        "tamano_final_media": float(tamano.mean()),
+        "tamano_final_std": float(tamano.std()),
+        "pico_media": float(pico.mean()),
+        "pico_std": float(pico.std()),
+        "replicas": int(len(Y)),
+    }
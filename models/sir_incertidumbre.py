@@ -0,0 +1,147 @@
+import warnings
+
+import numpy as np
+from scipy.stats import qmc
+
+from models.sir_registro import get_model, solve_model_batch
+
+# ---------- INCERTIDUMBRE EN LOS PARÁMETROS ----------
+# Cada parámetro incierto tiene un prior uniforme (o log-uniforme) entre dos
+# valores. Las muestras salen de un hipercubo latino o de una sucesión de
+# Sobol, que cubren el rango con muchas menos muestras que el azar simple, y
+# se integran en lotes de `chunk` con solve_model_batch.
+#
+# El ensamble nunca se guarda: cada lote se vuelca en histogramas fijos
+# (uno por compartimento y punto de la malla, más los del día del pico, el
+# pico y el tamaño final) y se descarta. Los cuantiles salen de los
+# histogramas interpolando dentro de la clase: difieren del cuantil exacto
+# de las muestras en menos de un ancho de clase (N/CLASES personas,
+# t_max/CLASES días) más el hueco entre muestras vecinas, que es el propio
+# ruido del muestreo. La memoria es la de un lote más los histogramas, sin
+# importar cuántas muestras se pidan.
+METODOS = ("lhs", "sobol")
+CLASES = 1000
+
+
+def sample_priors(priors, n, metodo="lhs", seed=None):
+    """n muestras de los priors {nombre: (bajo, alto)} o (bajo, alto, "log"); devuelve {nombre: arreglo}.
+
+    `metodo="lhs"` es un hipercubo latino y `"sobol"` una sucesión de Sobol
+    aleatorizada (con n potencia de 2 queda balanceada).
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"metodo debe ser uno de {METODOS}, no {metodo!r}")
+    nombres = list(priors)
+    if metodo == "lhs":
+        U = qmc.LatinHypercube(d=len(nombres), seed=seed).random(n)
+    else:
+        with warnings.catch_warnings():
+            # Sobol avisa cuando n no es potencia de 2; las muestras siguen siendo válidas
+            warnings.simplefilter("ignore", UserWarning)
+            U = qmc.Sobol(d=len(nombres), scramble=True, seed=seed).random(n)
+    muestras = {}
+    for j, nombre in enumerate(nombres):
+        bajo, alto, *escala = priors[nombre]
+        if bajo > alto:
+            raise ValueError(f"{nombre}: el prior va de {bajo} a {alto}")
+        if escala == ["log"]:
+            muestras[nombre] = np.exp(np.log(bajo) + U[:, j] * (np.log(alto) - np.log(bajo)))
+        else:
+            muestras[nombre] = bajo + U[:, j] * (alto - bajo)
+    return muestras
+
+
+class Histogramas:
+    """Histogramas de clases fijas entre `bajo` y `alto` para cada celda de `forma`, llenados por lotes."""
+
+    def __init__(self, bajo, alto, forma=(), clases=CLASES):
+        self.bajo, self.alto, self.clases = float(bajo), float(alto), clases
+        self.forma = tuple(forma)
+        self.celdas = int(np.prod(self.forma))
+        self.conteos = np.zeros((self.celdas, clases), dtype=np.int64)
+        self.n = 0
+
+    def agregar(self, valores):
+        """`valores` tiene forma (n, *forma); los que caen fuera del rango van a la clase del borde."""
+        valores = np.asarray(valores, dtype=float).reshape(-1, self.celdas)
+        ancho = (self.alto - self.bajo) / self.clases or 1.0
+        clase = np.clip(((valores - self.bajo) / ancho).astype(np.int64), 0, self.clases - 1)
+        indice = (np.arange(self.celdas) * self.clases + clase).ravel()
+        self.conteos += np.bincount(indice, minlength=self.conteos.size).reshape(self.conteos.shape)
+        self.n += len(valores)
+
+    def cuantiles(self, qs):
+        """Arreglo (len(qs), *forma) con los cuantiles, interpolando linealmente dentro de cada clase."""
+        acumulado = np.cumsum(self.conteos, axis=1)
+        bordes = np.linspace(self.bajo, self.alto, self.clases + 1)
+        salida = np.empty((len(qs), self.celdas))
+        filas = np.arange(self.celdas)
+        for i, q in enumerate(qs):
+            objetivo = q * self.n
+            clase = np.minimum((acumulado < objetivo).sum(axis=1), self.clases - 1)
+            antes = np.where(clase > 0, acumulado[filas, clase - 1], 0)
+            en_clase = np.maximum(self.conteos[filas, clase], 1)
+            fraccion = np.clip((objetivo - antes) / en_clase, 0, 1)
+            salida[i] = bordes[clase] + fraccion * (bordes[clase + 1] - bordes[clase])
+        return salida.reshape((len(qs),) + self.forma)
+
+    def distribucion(self, clases=40):
+        """(conteos, bordes) en a lo sumo `clases` clases que cubren sólo el rango ocupado, para dibujarla."""
+        if self.forma:
+            raise ValueError("distribucion() es para histogramas escalares")
+        ocupadas = np.flatnonzero(self.conteos[0])
+        if len(ocupadas) == 0:
+            return np.zeros(0, dtype=np.int64), np.array([self.bajo])
+        primera, ultima = ocupadas[0], ocupadas[-1] + 1
+        paso = -(-(ultima - primera) // clases)
+        n_grupos = -(-(ultima - primera) // paso)
+        # Si el último grupo se sale del rango, se corre el tramo hacia atrás
+        ultima = min(primera + paso * n_grupos, self.clases)
+        primera = ultima - paso * n_grupos
+        grupos = self.conteos[0, primera:ultima].reshape(-1, paso).sum(axis=1)
+        ancho = (self.alto - self.bajo) / self.clases
+        return grupos, self.bajo + ancho * np.arange(primera, ultima + 1, paso)
+
+
+def propagate_uncertainty(modelo, N, I0, R0, priors, t_max, fijos=None, n_muestras=2000, metodo="lhs", chunk=500,
+                          n_t=201, niveles=(0.05, 0.95), seed=0, rtol=1e-3, atol=1e-6):
+    """Bandas de cuantiles de S, I, R y distribuciones del pico y del tamaño final bajo los priors.
+
+    `priors` es el de sample_priors para los parámetros inciertos del modelo
+    registrado; los demás van en `fijos`. Devuelve un dict con "t",
+    "inferior", "superior" y "mediana" (cada uno (3, n_t), listo para
+    plot_sir_profesional(bandas=...)), "dia_pico", "pico" y "tamano_final"
+    (cada uno con "cuantiles" en los niveles y la mediana, y
+    "distribucion" = (conteos, bordes)) y "muestras".
+    """
+    definido = get_model(modelo)
+    fijos = dict(fijos or {})
+    faltan = set(definido.parametros) - set(priors) - set(fijos)
+    if faltan:
+        raise ValueError(f"{modelo}: faltan priors o valores fijos para {sorted(faltan)}")
+    if len(definido.compartimentos) != 3:
+        raise ValueError(f"{modelo}: las bandas son para modelos S, I, R")
+    muestras = sample_priors(priors, n_muestras, metodo, seed)
+    y0 = (N - I0 - R0, I0, R0)
+    curvas = Histogramas(0, N, (3, n_t))
+    dia_pico, pico, tamano_final = Histogramas(0, t_max), Histogramas(0, N), Histogramas(0, N)
+    for inicio in range(0, n_muestras, chunk):
+        lote = {nombre: valores[inicio:inicio + chunk] for nombre, valores in muestras.items()}
+        Y, t = solve_model_batch(modelo, y0, t_max, n_t, rtol, atol, **fijos, **lote)
+        curvas.agregar(Y)
+        I = Y[:, 1]
+        indice = np.argmax(I, axis=1)
+        dia_pico.agregar(t[indice])
+        pico.agregar(I[np.arange(len(I)), indice])
+        tamano_final.agregar(N - Y[:, 0, -1])
+
+    qs = (niveles[0], 0.5, niveles[1])
+    inferior, mediana, superior = curvas.cuantiles(qs)
+
+    def resumen(histograma):
+        return {"cuantiles": dict(zip(qs, histograma.cuantiles(qs).tolist())),
+                "distribucion": histograma.distribucion()}
+
+    return {"t": np.linspace(0, t_max, n_t), "inferior": inferior, "superior": superior, "mediana": mediana,
+            "dia_pico": resumen(dia_pico), "pico": resumen(pico), "tamano_final": resumen(tamano_final),
+            "muestras": n_muestras, "metodo": metodo}
@@ -0,0 +1,202 @@
+import csv
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from models.sir_barrido import SWEEP_WORKERS, _pool
+from models.sir_registro import get_model, solve_model_batch
+
+# ---------- ESCENARIOS SIN STREAMLIT ----------
+# Cada escenario es una fila: el modelo registrado, N, t_max, los parámetros
+# del modelo por nombre y, opcionalmente, los valores iniciales de los
+# compartimentos como <C>0 (I0, R0, E0…; el primero se completa con N). Las
+# filas del mismo modelo y horizonte se cortan en bloques de `chunk`, cada
+# bloque es una sola integración en lote en un proceso del pool de
+# sir_barrido y su salida se escribe como un row group (Parquet) o un record
+# batch (Arrow IPC) apenas llega. Como mucho hay 2·workers bloques en vuelo,
+# así que la memoria es la de unos pocos bloques y no la de todo el archivo.
+#
+# Este módulo y los que importa no cargan streamlit ni matplotlib.
+COLUMNAS_FIJAS = ("escenario", "modelo", "N", "t_max")
+METRICAS = ("pico", "dia_pico", "tamano_final")
+
+
+def read_scenarios(ruta):
+    """Lee escenarios de un CSV, un JSON (lista de objetos) o JSON Lines (.jsonl).
+
+    Devuelve una lista de dicts con "escenario" (la columna del mismo
+    nombre o el número de fila), "modelo" y los números como float. Las
+    celdas vacías se ignoran, así un mismo CSV puede mezclar modelos.
+    """
+    with open(ruta, encoding="utf-8") as f:
+        if ruta.endswith(".csv"):
+            filas = list(csv.DictReader(f))
+        elif ruta.endswith(".jsonl"):
+            filas = [json.loads(linea) for linea in f if linea.strip()]
+        else:
+            filas = json.load(f)
+    escenarios = []
+    for i, fila in enumerate(filas):
+        escenario = {"escenario": i, "modelo": "sir"}
+        for clave, valor in fila.items():
+            if valor is None or valor == "":
+                continue
+            escenario[clave] = valor if clave == "modelo" else _numero(valor, i, clave)
+        escenario["escenario"] = int(escenario["escenario"])
+        _validar(escenario, i)
+        escenarios.append(escenario)
+    return escenarios
+
+
+def _numero(valor, i, clave):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"fila {i}: {clave}={valor!r} no es un número") from None
+
+
+def _validar(escenario, i):
+    modelo = get_model(escenario["modelo"])
+    iniciales = [f"{c}0" for c in modelo.compartimentos[1:]]
+    faltan = [c for c in ("N", "t_max", *modelo.parametros) if c not in escenario]
+    if faltan:
+        raise ValueError(f"fila {i}: al modelo {modelo.nombre!r} le falta {', '.join(faltan)}")
+    sobran = set(escenario) - {*COLUMNAS_FIJAS, *modelo.parametros, *iniciales}
+    if sobran:
+        raise ValueError(f"fila {i}: columnas que el modelo {modelo.nombre!r} no usa: {', '.join(sorted(sobran))}")
+
+
+def _bloques(escenarios, chunk):
+    """Agrupa por (modelo, t_max), que comparten integración, y corta en bloques de `chunk`."""
+    grupos = {}
+    for escenario in escenarios:
+        grupos.setdefault((escenario["modelo"], escenario["t_max"]), []).append(escenario)
+    for (modelo, t_max), filas in grupos.items():
+        for ini in range(0, len(filas), chunk):
+            yield modelo, t_max, filas[ini:ini + chunk]
+
+
+def _resolver(nombre, t_max, filas, n_t, method):
+    """Trayectorias y métricas de un bloque; corre en un proceso del pool."""
+    modelo = get_model(nombre)
+    N = np.array([f["N"] for f in filas])
+    iniciales = np.array([[f.get(f"{c}0", 0.0) for f in filas] for c in modelo.compartimentos[1:]])
+    y0 = [N - iniciales.sum(axis=0), *iniciales]
+    parametros = {p: np.array([f[p] for f in filas]) for p in modelo.parametros}
+    Y, t, estadisticas = solve_model_batch(nombre, y0, t_max, n_t, method=method, full_output=True, **parametros)
+    # El pico se mide en I, o en el segundo compartimento si el modelo no tiene I
+    I = Y[:, modelo.compartimentos.index("I") if "I" in modelo.compartimentos else 1]
+    pico_idx = np.argmax(I, axis=1)
+    metricas = {
+        "pico": I[np.arange(len(I)), pico_idx],
+        "dia_pico": t[pico_idx],
+        "tamano_final": N - Y[:, 0, -1],
+    }
+    return Y, t, metricas, estadisticas
+
+
+class _Escritor:
+    """Escribe tablas por partes en Parquet (un row group cada una) o en Arrow IPC según la extensión."""
+
+    def __init__(self, ruta, schema):
+        if ruta.endswith(".parquet"):
+            # Diccionario sólo en las columnas que se repiten: en las trayectorias cuesta 7× más y no comprime
+            repetidas = [c for c in ("escenario", "t", "modelo", "metodo") if c in schema.names]
+            self._escritor = pq.ParquetWriter(ruta, schema, use_dictionary=repetidas)
+        elif ruta.endswith((".arrow", ".ipc", ".feather")):
+            self._sumidero = pa.OSFile(ruta, "wb")
+            self._escritor = ipc.new_file(self._sumidero, schema)
+        else:
+            raise ValueError(f"{ruta}: la salida debe ser .parquet, .arrow, .ipc o .feather")
+        self.schema = schema
+
+    def escribir(self, columnas):
+        self._escritor.write_table(pa.table(columnas, schema=self.schema))
+
+    def cerrar(self):
+        self._escritor.close()
+        if hasattr(self, "_sumidero"):
+            self._sumidero.close()
+
+
+def _ruta_resumen(salida):
+    raiz, extension = os.path.splitext(salida)
+    return f"{raiz}_resumen{extension}"
+
+
+def run_scenarios(escenarios, salida, resumen=None, workers=None, chunk=500, n_t=401, method="RK45",
+                  progreso=None):
+    """Resuelve los escenarios en paralelo y escribe trayectorias y métricas mientras llegan.
+
+    `salida` recibe una fila por escenario e instante (escenario, t y un
+    valor por compartimento, nulo si el modelo no lo tiene) y `resumen`
+    (por defecto "<salida>_resumen.<ext>") una fila por escenario con sus
+    parámetros, "pico", "dia_pico", "tamano_final" (N - S en t_max) y el
+    costo de la integración de su bloque. `workers` procesos (por defecto
+    SIR_SWEEP_WORKERS); con 1 corre aquí mismo. `progreso(hechos, total)`
+    se llama después de escribir cada bloque. Devuelve el número de
+    escenarios escritos.
+    """
+    workers = SWEEP_WORKERS if workers is None else workers
+    resumen = _ruta_resumen(salida) if resumen is None else resumen
+    modelos = [get_model(m) for m in dict.fromkeys(e["modelo"] for e in escenarios)]
+    compartimentos = list(dict.fromkeys(c for m in modelos for c in m.compartimentos))
+    entradas = list(dict.fromkeys(c for e in escenarios for c in e if c not in COLUMNAS_FIJAS))
+
+    trayectorias = _Escritor(salida, pa.schema(
+        [("escenario", pa.int64()), ("t", pa.float64())] + [(c, pa.float64()) for c in compartimentos]))
+    metricas = _Escritor(resumen, pa.schema(
+        [("escenario", pa.int64()), ("modelo", pa.string()), ("N", pa.float64()), ("t_max", pa.float64())]
+        + [(c, pa.float64()) for c in entradas] + [(c, pa.float64()) for c in METRICAS]
+        + [("metodo", pa.string()), ("pasos", pa.int64()), ("nfev", pa.int64())]))
+
+    def escribir(nombre, filas, Y, t, valores, estadisticas):
+        modelo, n = get_model(nombre), len(filas)
+        columnas = {"escenario": np.repeat([f["escenario"] for f in filas], t.size), "t": np.tile(t, n)}
+        for c in compartimentos:
+            columnas[c] = (Y[:, modelo.compartimentos.index(c)].ravel() if c in modelo.compartimentos
+                           else pa.nulls(n * t.size, pa.float64()))
+        trayectorias.escribir(columnas)
+        columnas = {c: [f.get(c) for f in filas] for c in ("escenario", "modelo", "N", "t_max", *entradas)}
+        columnas.update(valores)
+        columnas.update({c: [estadisticas[c]] * n for c in ("metodo", "pasos", "nfev")})
+        metricas.escribir(columnas)
+
+    total, hechos = len(escenarios), 0
+    pendientes = {}
+    try:
+        bloques = _bloques(escenarios, chunk)
+        if workers <= 1:
+            for nombre, t_max, filas in bloques:
+                escribir(nombre, filas, *_resolver(nombre, t_max, filas, n_t, method))
+                hechos += len(filas)
+                if progreso:
+                    progreso(hechos, total)
+            return hechos
+
+        ejecutor = _pool(workers)
+        while True:
+            # Sólo 2·workers bloques en vuelo: los resultados no se acumulan si escribir es más lento
+            for nombre, t_max, filas in bloques:
+                pendientes[ejecutor.submit(_resolver, nombre, t_max, filas, n_t, method)] = (nombre, filas)
+                if len(pendientes) >= 2 * workers:
+                    break
+            if not pendientes:
+                return hechos
+            listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                nombre, filas = pendientes.pop(futuro)
+                escribir(nombre, filas, *futuro.result())
+                hechos += len(filas)
+                if progreso:
+                    progreso(hechos, total)
+    finally:
+        for futuro in pendientes:
+            futuro.cancel()
+        trayectorias.cerrar()
+        metricas.cerrar()
@@ -0,0 +1,112 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import eigs
+
+from models.sir_registro import IMPLICITOS, _integrar_lote
+
+# ---------- SIR POR PARCHES ----------
+# La población se divide en P parches (p. ej. facultad × cohorte) y cada
+# uno se contagia de todos los demás según una matriz de contactos C:
+#     dS_i/dt = -β S_i Σ_j C_ij I_j,  dI_i/dt = β S_i Σ_j C_ij I_j - k I_i
+# Con C = 1 (todos con todos) es el SIR clásico de solve_sir sobre la suma
+# de los parches, y con un solo parche coincide con él exactamente. C se
+# guarda dispersa (CSR), así que el lado derecho es un producto matriz–vector
+# que cuesta lo que sus entradas no nulas y escala a miles de parches.
+def solve_sir_patches(N, I0, R0, beta, k, C, t_max, n_t=1000, rtol=1e-3, atol=1e-6, method="RK45",
+                      full_output=False):
+    """SIR metapoblacional: N, I0 y R0 tienen un valor por parche y C es P × P (densa o dispersa).
+
+    β y k pueden ser escalares o tener un valor por parche. Devuelve (Y, t)
+    con Y de forma (P, 3, n_t), como solve_sir_batch, y con
+    `full_output=True` también las estadísticas de la integración.
+    `method="BDF"` o `"Radau"` usa el jacobiano analítico disperso.
+    """
+    C = sparse.csr_matrix(C, dtype=float)
+    N, I0, R0 = (np.asarray(a, dtype=float) for a in np.broadcast_arrays(N, I0, R0))
+    P = N.size
+    if C.shape != (P, P):
+        raise ValueError(f"C debe ser {P} × {P} (un parche por fila), no {C.shape[0]} × {C.shape[1]}")
+    beta = np.broadcast_to(np.asarray(beta, dtype=float), (P,))
+    k = np.broadcast_to(np.asarray(k, dtype=float), (P,))
+    y0 = np.stack([N - I0 - R0, I0, R0])
+    contagio = np.empty(P)
+    recuperacion = np.empty(P)
+
+    def deriv(t, y):
+        S, I = y[:P], y[P:2 * P]
+        dy = np.empty((3, P))
+        np.multiply(beta, S, out=contagio)
+        np.multiply(contagio, C @ I, out=contagio)
+        np.multiply(k, I, out=recuperacion)
+        np.negative(contagio, out=dy[0])
+        np.subtract(contagio, recuperacion, out=dy[1])
+        dy[2] = recuperacion
+        return dy.ravel()
+
+    if method == "LSODA":
+        raise ValueError("LSODA sólo acepta jacobianos densos; use method='BDF' o 'Radau'")
+    jac = _jacobiano(beta, k, C) if method in IMPLICITOS else None
+    Y, t, estadisticas = _integrar_lote(deriv, y0, t_max, n_t, rtol, atol, method, jac)
+    if not full_output:
+        return Y, t
+    return Y, t, estadisticas
+
+
+def _jacobiano(beta, k, C):
+    """Jacobiano disperso 3P × 3P: los bloques de S e I heredan el patrón de C."""
+    P = C.shape[0]
+    K = sparse.diags(k)
+    def jac(t, y):
+        S, I = y[:P], y[P:2 * P]
+        fuerza = sparse.diags(beta * (C @ I))
+        contacto = sparse.diags(beta * S) @ C
+        return sparse.bmat([[-fuerza, -contacto, None],
+                            [fuerza, contacto - K, None],
+                            [None, K, sparse.csr_matrix((P, P))]], format="csc")
+    return jac
+
+# ---------- FACULTADES DE SAN MARCOS ----------
+# Las 20 facultades agrupadas en sus cinco áreas académicas. Los tamaños no
+# son la matrícula real: la página reparte la población en partes iguales.
+AREAS = {
+    "Ciencias de la Salud": ["Medicina", "Farmacia y Bioquímica", "Odontología", "Medicina Veterinaria",
+                             "Psicología"],
+    "Ciencias Básicas": ["Ciencias Biológicas", "Ciencias Físicas", "Ciencias Matemáticas",
+                         "Química e Ingeniería Química"],
+    "Ingenierías": ["Ingeniería Geológica, Minera, Metalúrgica y Geográfica", "Ingeniería Industrial",
+                    "Ingeniería Electrónica y Eléctrica", "Ingeniería de Sistemas e Informática"],
+    "Ciencias Económicas y de la Gestión": ["Ciencias Administrativas", "Ciencias Contables",
+                                            "Ciencias Económicas"],
+    "Humanidades y Ciencias Jurídicas y Sociales": ["Derecho y Ciencia Política", "Letras y Ciencias Humanas",
+                                                    "Educación", "Ciencias Sociales"],
+}
+FACULTADES = [facultad for facultades in AREAS.values() for facultad in facultades]
+
+
+def faculty_contact_matrix(cohortes, w_facultad, w_area, w_campus, areas=AREAS):
+    """Matriz de contactos de facultad × cohorte (parche f·cohortes + c) y las etiquetas de los parches.
+
+    Dentro de la misma cohorte de una facultad el peso es 1; con las otras
+    cohortes de la facultad, `w_facultad`; con la misma cohorte de otras
+    facultades del área, `w_area`, y del resto del campus, `w_campus`. Se arma
+    con productos de Kronecker, sin recorrer los P² pares.
+    """
+    area_de = np.repeat(np.arange(len(areas)), [len(f) for f in areas.values()])
+    entre_facultades = np.where(area_de[:, None] == area_de[None, :], w_area, w_campus)
+    np.fill_diagonal(entre_facultades, 0.0)
+    dentro = (1 - w_facultad) * np.eye(cohortes) + w_facultad * np.ones((cohortes, cohortes))
+    C = (sparse.kron(sparse.eye(area_de.size), dentro)
+         + sparse.kron(sparse.csr_matrix(entre_facultades), sparse.eye(cohortes))).tocsr()
+    C.eliminate_zeros()
+    etiquetas = [(facultad, c + 1) for facultades in areas.values() for facultad in facultades
+                 for c in range(cohortes)]
+    return C, etiquetas
+
+
+def patches_R0(N, beta, k, C):
+    """R₀ de la red: radio espectral de la matriz de próxima generación diag(β·N/k)·C."""
+    C = sparse.csr_matrix(C, dtype=float)
+    K = sparse.diags(np.broadcast_to(np.asarray(beta * np.asarray(N, dtype=float) / k), (C.shape[0],))) @ C
+    if K.shape[0] <= 200:
+        return float(np.abs(np.linalg.eigvals(K.toarray())).max())
+    return float(np.abs(eigs(K, k=1, which="LM", return_eigenvectors=False)).max())
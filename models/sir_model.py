@@ -1,26 +1,421 @@
 import numpy as np
 from scipy.integrate import solve_ivp
+from scipy.optimize import brentq
+from scipy.special import lambertw
+
+from models.sir_registro import IMPLICITOS, choose_method, get_model, solve_model_batch, statistics
 
 # ---------- MODELO SIR CLÁSICO ----------
-def solve_sir(N, I0, R0, beta, k, t_max):
-    S0 = N - I0 - R0
-    def deriv(t, y):
-        S, I, R = y
-        dSdt = -beta * S * I
-        dIdt = beta * S * I - k * I
-        dRdt = k * I
-        return [dSdt, dIdt, dRdt]
-    sol = solve_ivp(deriv, [0, t_max], [S0, I0, R0], t_eval=np.linspace(0, t_max, 1000))
-    return sol.y[0], sol.y[1], sol.y[2], sol.t
+def solve_sir(N, I0, R0, beta, k, t_max, method="auto", umbral=None, full_output=False, n_t=1000,
+              checkpoint=None):
+    """`method="fast"` usa el integrador especializado `_dopri_sir` (ver abajo).
+
+    `method="auto"` elige entre RK45 y LSODA con jacobiano analítico según la
+    cota de rigidez del modelo (ver sir_registro.choose_method); también se
+    puede pedir cualquier método de solve_ivp por nombre.
+
+    Con `umbral` la integración se detiene cuando I baja de ese valor y el
+    resto de la malla se completa analíticamente (ver `_cola`). Con
+    `full_output=True` devuelve además un dict con los eventos: el pico
+    exacto (dI/dt = 0, que equivale a S = k/β) y el día en que se cruzó el
+    umbral, un `checkpoint` con el estado al final del horizonte y
+    "estadisticas" (método usado, pasos aceptados y evaluaciones del lado
+    derecho y del jacobiano) para comparar el costo de cada método.
+
+    Pasando ese `checkpoint` la simulación continúa desde su t hasta t_max
+    en lugar de empezar de nuevo en t = 0 (N, I0 y R0 se ignoran): la malla
+    de salida va de checkpoint["t"] a t_max y el costo depende sólo de los
+    días agregados. Los eventos ya encontrados se conservan.
+    """
+    t0, y0 = _inicio(N, I0, R0, t_max, checkpoint)
+    if checkpoint is not None and checkpoint["t_fin"] < t0:
+        return _solo_cola(checkpoint, beta, k, 0.0, t_max, n_t, full_output)
+    if method == "fast":
+        return _dopri_sir(*y0, beta, k, 0.0, t_max, n_t=n_t, umbral=umbral, full_output=full_output,
+                          t0=t0, checkpoint=checkpoint)
+    return _solve_ivp_sir("sir", {"beta": beta, "k": k}, y0, beta, k, 0.0, t0, t_max, n_t, method, umbral,
+                          full_output, checkpoint)
 
 # ---------- MODELO SIR EXTENDIDO----------
-def solve_sir_extended(N, I0, R0, beta, gamma, alpha, t_max):
+def solve_sir_extended(N, I0, R0, beta, gamma, alpha, t_max, method="auto", umbral=None, full_output=False,
+                       n_t=1000, checkpoint=None):
+    """Mismas opciones que `solve_sir`; el pico ocurre cuando S = γ/β."""
+    t0, y0 = _inicio(N, I0, R0, t_max, checkpoint)
+    if checkpoint is not None and checkpoint["t_fin"] < t0:
+        return _solo_cola(checkpoint, beta, gamma, alpha, t_max, n_t, full_output)
+    if method == "fast":
+        return _dopri_sir(*y0, beta, gamma, alpha, t_max, n_t=n_t, umbral=umbral, full_output=full_output,
+                          t0=t0, checkpoint=checkpoint)
+    return _solve_ivp_sir("sir_extended", {"beta": beta, "gamma": gamma, "alpha": alpha}, y0, beta, gamma, alpha,
+                          t0, t_max, n_t, method, umbral, full_output, checkpoint)
+
+# ---------- CONTINUACIÓN DESDE UN CHECKPOINT ----------
+def _inicio(N, I0, R0, t_max, checkpoint):
+    """(t0, [S, I, R]) de partida: t = 0 con las condiciones iniciales o el checkpoint."""
+    if checkpoint is None:
+        return 0.0, [N - I0 - R0, I0, R0]
+    t0 = checkpoint["t"]
+    if t_max <= t0:
+        raise ValueError(f"t_max ({t_max}) debe ser mayor que el t del checkpoint ({t0}); "
+                         "para acortar basta con recortar la trayectoria")
+    return t0, list(checkpoint["y"])
+
+
+def _solo_cola(checkpoint, beta, gamma, alpha, t_max, n_t, full_output):
+    """Continuación de una simulación que ya se detuvo por el umbral: toda la malla es analítica."""
+    t_eval = np.linspace(checkpoint["t"], t_max, n_t)
+    eventos = checkpoint["eventos"]
+    return _salida(t_eval, np.empty((3, n_t)), checkpoint["t_fin"], np.array(checkpoint["y_fin"]),
+                   beta, gamma, alpha, eventos["pico"], eventos["umbral"], full_output, checkpoint["h"],
+                   statistics(None, 0, 0))
+
+# ---------- EVENTOS ----------
+def _cola(t, t_fin, y_fin, beta, gamma, alpha):
+    """Trayectoria después de la parada, sin más trabajo del solver.
+
+    Con I por debajo del umbral el contagio ya no mueve a S, que sólo decae
+    por inmunización (S·e^{-αΔt}); I decae con la tasa que tenía al parar,
+    γ - βS, y R cierra la población. Con α = 0 S y R quedan planos.
+    """
+    dt = t - t_fin
+    S = y_fin[0] * np.exp(-alpha * dt)
+    I = y_fin[1] * np.exp(-max(gamma - beta * y_fin[0], 0.0) * dt)
+    return S, I, sum(y_fin) - S - I
+
+
+def _salida(t_eval, y, t_fin, y_fin, beta, gamma, alpha, pico, t_umbral, full_output, h=None, estadisticas=None):
+    """Completa la malla después de t_fin y arma la tupla de salida.
+
+    El checkpoint guarda el estado en el último punto de la malla, el punto
+    de parada (si lo hubo), los eventos y el último tamaño de paso.
+    """
+    S, I, R = y
+    if t_fin < t_eval[-1]:
+        despues = t_eval > t_fin
+        S[despues], I[despues], R[despues] = _cola(t_eval[despues], t_fin, y_fin, beta, gamma, alpha)
+    if not full_output:
+        return S, I, R, t_eval
+    eventos = {
+        "pico": None if pico is None else (float(pico[0]), float(pico[1])),
+        "umbral": None if t_umbral is None else float(t_umbral),
+    }
+    checkpoint = {
+        "t": float(t_eval[-1]),
+        "y": (float(S[-1]), float(I[-1]), float(R[-1])),
+        "t_fin": float(t_fin),
+        "y_fin": tuple(float(v) for v in y_fin),
+        "h": None if h is None else float(h),
+        "eventos": eventos,
+    }
+    return S, I, R, t_eval, {"eventos": eventos, "t_fin": float(t_fin), "checkpoint": checkpoint,
+                             "estadisticas": estadisticas}
+
+
+def _solve_ivp_sir(nombre, parametros, y0, beta, gamma, alpha, t0, t_max, n_t, method, umbral, full_output,
+                   checkpoint=None):
+    modelo = get_model(nombre)
+    if method == "auto":
+        method = choose_method(nombre, sum(y0), t_max - t0, **parametros)
+    opciones = {}
+    if method in IMPLICITOS:
+        jac = modelo.jacobian(1, **parametros)
+        opciones["jac"] = lambda t, y: jac(t, y)[:, :, 0]
+
+    def pico(t, y):
+        return beta * y[0] - gamma
+    pico.direction = -1
+
+    def bajo_umbral(t, y):
+        return y[1] - umbral
+    bajo_umbral.terminal = True
+    bajo_umbral.direction = -1
+
+    eventos = [pico] + ([bajo_umbral] if umbral is not None else [])
+    t_eval = np.linspace(t0, t_max, n_t)
+    # Salida densa en lugar de t_eval: da los mismos puntos y además el número de pasos
+    sol = solve_ivp(modelo.rhs(1, **parametros), [t0, t_max], y0, method=method, events=eventos,
+                    dense_output=True, **opciones)
+
+    y = np.empty((3, len(t_eval)))
+    hasta = np.searchsorted(t_eval, sol.t[-1], side="right")
+    y[:, :hasta] = sol.sol(t_eval[:hasta])
+    t_fin, y_fin = t_max, sol.y[:, -1]
+    t_umbral = None
+    if umbral is not None and len(sol.t_events[1]):
+        t_fin = t_umbral = sol.t_events[1][0]
+        y_fin = sol.y_events[1][0]
+    if checkpoint is not None and checkpoint["eventos"]["pico"] is not None:
+        pico_evento = checkpoint["eventos"]["pico"]
+    elif len(sol.t_events[0]):
+        pico_evento = (sol.t_events[0][0], sol.y_events[0][0][1])
+    else:
+        pico_evento = (t0, y0[1]) if beta * y0[0] <= gamma else None
+    estadisticas = statistics(method, len(sol.t) - 1, sol.nfev, sol.njev, sol.nlu)
+    return _salida(t_eval, y, t_fin, y_fin, beta, gamma, alpha, pico_evento, t_umbral, full_output,
+                   estadisticas=estadisticas)
+
+# ---------- MÉTRICAS ANALÍTICAS DEL SIR CLÁSICO ----------
+# Nodos de Gauss–Legendre para la integral del día del pico
+_GL_X, _GL_W = np.polynomial.legendre.leggauss(48)
+
+
+def sir_metrics(N, I0, R0, beta, k):
+    """Pico, día del pico y tamaño final del SIR clásico sin integrar la EDO.
+
+    Usa el invariante S + I - ρ·ln S (ρ = k/β): el pico ocurre cuando S = ρ y
+    vale I0 + S0 - ρ - ρ·ln(S0/ρ); el valor final S∞ sale de la rama principal
+    de Lambert W. El día del pico es t = ∫ dS / (β S I(S)) entre ρ y S0,
+    evaluado con cuadratura de Gauss–Legendre tras el cambio de variable
+    S0 - S = I0·(e^v - 1), que suaviza el integrando cuando I0 es pequeño.
+
+    Acepta escalares o arreglos (se difunden entre sí) y devuelve un dict con
+    "pico", "dia_pico", "S_final", "total_infectados" (N - S∞) y "R0".
+    """
+    N, I0, R0, beta, k = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (N, I0, R0, beta, k)))
     S0 = N - I0 - R0
-    def deriv(t, y):
-        S, I, R = y
-        dSdt = -beta * S * I - alpha * S
-        dIdt = beta * S * I - gamma * I
-        dRdt = gamma * I + alpha * S
-        return [dSdt, dIdt, dRdt]
-    sol = solve_ivp(deriv, [0, t_max], [S0, I0, R0], t_eval=np.linspace(0, t_max, 1000))
-    return sol.y[0], sol.y[1], sol.y[2], sol.t
\ No newline at end of file
+    rho = k / beta
+    crece = S0 > rho
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _sir_metrics(N, I0, S0, beta, k, rho, crece)
+
+
+def _sir_metrics(N, I0, S0, beta, k, rho, crece):
+    # Pico por el invariante; si S0 <= ρ la epidemia decae desde el inicio
+    S_pico = np.where(crece, rho, S0)
+    pico = np.where(crece, I0 + S0 - rho - rho * np.log(S0 / rho), I0)
+
+    # Tamaño final: S∞ = -ρ·W0(-(S0/ρ)·exp(-(S0 + I0)/ρ))
+    arg = -np.exp(np.log(S0 / rho) - (S0 + I0) / rho)
+    S_final = -rho * lambertw(np.maximum(arg, -np.exp(-1)), 0).real
+
+    # Día del pico por cuadratura en v = ln(1 + (S0 - S)/I0)
+    v_max = np.log1p(np.maximum(S0 - S_pico, 0) / I0)
+    v = 0.5 * v_max[..., None] * (_GL_X + 1)
+    w = I0[..., None] * np.expm1(v)
+    S = S0[..., None] - w
+    I = I0[..., None] + w - rho[..., None] * np.log(S0[..., None] / S)
+    integrando = (w + I0[..., None]) / (beta[..., None] * S * I)
+    dia_pico = np.where(crece, 0.5 * v_max * (integrando @ _GL_W), 0.0)
+
+    return {
+        "pico": pico,
+        "dia_pico": dia_pico,
+        "S_final": S_final,
+        "total_infectados": N - S_final,
+        "R0": beta * S0 / k,
+    }
+
+# ---------- INTEGRADOR RÁPIDO ----------
+# Coeficientes de Dormand–Prince 5(4), los mismos que usa RK45 de scipy.
+_C2, _C3, _C4, _C5 = 1 / 5, 3 / 10, 4 / 5, 8 / 9
+_A21 = 1 / 5
+_A31, _A32 = 3 / 40, 9 / 40
+_A41, _A42, _A43 = 44 / 45, -56 / 15, 32 / 9
+_A51, _A52, _A53, _A54 = 19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729
+_A61, _A62, _A63, _A64, _A65 = 9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656
+_B1, _B3, _B4, _B5, _B6 = 35 / 384, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84
+_E1, _E3, _E4, _E5, _E6, _E7 = -71 / 57600, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40
+# Polinomio de salida densa de orden 4 (RK45.P en scipy)
+_P = np.array([
+    [1, -8048581381 / 2820520608, 8663915743 / 2820520608, -12715105075 / 11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200 / 32700410799, -68118460800 / 10900136933, 87487479700 / 32700410799],
+    [0, -1754552775 / 470086768, 14199869525 / 1410260304, -10690763975 / 1880347072],
+    [0, 127303824393 / 49829197408, -318862633887 / 49829197408, 701980252875 / 199316789632],
+    [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+    [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423]])
+
+
+def _raiz_en_paso(t, h, y, K, g):
+    """Cero de g(y(t)) dentro de un paso usando el mismo polinomio de salida densa."""
+    Q = K.T @ _P
+    potencias = np.arange(1, 5)
+    def estado(x):
+        return y + h * (Q @ x ** potencias)
+    x = brentq(lambda x: g(estado(x)), 0.0, 1.0, xtol=1e-12)
+    return t + x * h, estado(x)
+
+
+def _dopri_sir(S, I, R, beta, gamma, alpha, t_max, n_t=1000, rtol=1e-3, atol=1e-6, umbral=None,
+               full_output=False, t0=0.0, checkpoint=None):
+    """Dormand–Prince 5(4) escrito a mano para el sistema SIR (α = 0 da el clásico).
+
+    Reproduce el control de paso de `solve_ivp(method="RK45")` con las mismas
+    tolerancias por defecto, pero sin llamadas a Python por etapa ni listas
+    nuevas: cada paso trabaja con floats locales y guarda el estado y sus
+    etapas en buffers preasignados. Al final la malla de salida se rellena de
+    una vez con la misma salida densa de orden 4 que usa scipy.
+
+    Tolerancia documentada: frente a `solve_ivp` con sus valores por defecto
+    la diferencia máxima en S, I o R es menor que 1e-5·N en los rangos de los
+    deslizadores (ver benchmarks/bench_fast.py): los pasos aceptados son los
+    mismos y sólo cambia el redondeo.
+
+    Los eventos (pico y umbral) se detectan por cambio de signo al final de
+    cada paso aceptado y se ubican con Brent sobre la salida densa del paso.
+    Al continuar desde un `checkpoint` se reutiliza su último tamaño de paso
+    en lugar de volver a estimar el inicial.
+    """
+    S, I, R = float(S), float(I), float(R)
+    capacidad = 256
+    ts = np.empty(capacidad)
+    ys = np.empty((capacidad, 3))
+    ks = np.empty((capacidad, 7, 3))
+
+    c = beta * S * I
+    fS, fI, fR = -c - alpha * S, c - gamma * I, gamma * I + alpha * S
+    evaluaciones = 1
+
+    if checkpoint is not None and checkpoint["h"]:
+        h_abs = checkpoint["h"]
+    else:
+        # Paso inicial, igual que scipy.integrate._ivp.common.select_initial_step
+        eS, eI, eR = atol + abs(S) * rtol, atol + abs(I) * rtol, atol + abs(R) * rtol
+        d0 = ((S / eS) ** 2 + (I / eI) ** 2 + (R / eR) ** 2) ** 0.5 / 3 ** 0.5
+        d1 = ((fS / eS) ** 2 + (fI / eI) ** 2 + (fR / eR) ** 2) ** 0.5 / 3 ** 0.5
+        h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+        h0 = min(h0, t_max - t0)
+        S1, I1 = S + h0 * fS, I + h0 * fI
+        c = beta * S1 * I1
+        gS, gI, gR = -c - alpha * S1, c - gamma * I1, gamma * I1 + alpha * S1
+        d2 = (((gS - fS) / eS) ** 2 + ((gI - fI) / eI) ** 2 + ((gR - fR) / eR) ** 2) ** 0.5 / 3 ** 0.5 / h0
+        if d1 <= 1e-15 and d2 <= 1e-15:
+            h1 = max(1e-6, h0 * 1e-3)
+        else:
+            h1 = (0.01 / max(d1, d2)) ** (1 / 5)
+        h_abs = min(100 * h0, h1, t_max - t0)
+        evaluaciones += 1
+
+    t = float(t0)
+    n = 0
+    ts[0] = t
+    ys[0] = S, I, R
+    if checkpoint is not None and checkpoint["eventos"]["pico"] is not None:
+        pico = checkpoint["eventos"]["pico"]
+    else:
+        pico = (t, I) if beta * S <= gamma else None
+    t_fin, t_umbral = t_max, None
+    rechazado = False
+    intentos = 0
+    while t < t_max:
+        h = min(h_abs, t_max - t)
+        t_nuevo = t + h
+        intentos += 1
+
+        # Etapas de Dormand–Prince (la derivada de R no realimenta al sistema)
+        yS, yI = S + h * _A21 * fS, I + h * _A21 * fI
+        c = beta * yS * yI
+        k2S, k2I, k2R = -c - alpha * yS, c - gamma * yI, gamma * yI + alpha * yS
+        yS = S + h * (_A31 * fS + _A32 * k2S)
+        yI = I + h * (_A31 * fI + _A32 * k2I)
+        c = beta * yS * yI
+        k3S, k3I, k3R = -c - alpha * yS, c - gamma * yI, gamma * yI + alpha * yS
+        yS = S + h * (_A41 * fS + _A42 * k2S + _A43 * k3S)
+        yI = I + h * (_A41 * fI + _A42 * k2I + _A43 * k3I)
+        c = beta * yS * yI
+        k4S, k4I, k4R = -c - alpha * yS, c - gamma * yI, gamma * yI + alpha * yS
+        yS = S + h * (_A51 * fS + _A52 * k2S + _A53 * k3S + _A54 * k4S)
+        yI = I + h * (_A51 * fI + _A52 * k2I + _A53 * k3I + _A54 * k4I)
+        c = beta * yS * yI
+        k5S, k5I, k5R = -c - alpha * yS, c - gamma * yI, gamma * yI + alpha * yS
+        yS = S + h * (_A61 * fS + _A62 * k2S + _A63 * k3S + _A64 * k4S + _A65 * k5S)
+        yI = I + h * (_A61 * fI + _A62 * k2I + _A63 * k3I + _A64 * k4I + _A65 * k5I)
+        c = beta * yS * yI
+        k6S, k6I, k6R = -c - alpha * yS, c - gamma * yI, gamma * yI + alpha * yS
+
+        nS = S + h * (_B1 * fS + _B3 * k3S + _B4 * k4S + _B5 * k5S + _B6 * k6S)
+        nI = I + h * (_B1 * fI + _B3 * k3I + _B4 * k4I + _B5 * k5I + _B6 * k6I)
+        nR = R + h * (_B1 * fR + _B3 * k3R + _B4 * k4R + _B5 * k5R + _B6 * k6R)
+        c = beta * nS * nI
+        k7S, k7I, k7R = -c - alpha * nS, c - gamma * nI, gamma * nI + alpha * nS
+
+        errS = h * (_E1 * fS + _E3 * k3S + _E4 * k4S + _E5 * k5S + _E6 * k6S + _E7 * k7S)
+        errI = h * (_E1 * fI + _E3 * k3I + _E4 * k4I + _E5 * k5I + _E6 * k6I + _E7 * k7I)
+        errR = h * (_E1 * fR + _E3 * k3R + _E4 * k4R + _E5 * k5R + _E6 * k6R + _E7 * k7R)
+        eS = atol + max(abs(S), abs(nS)) * rtol
+        eI = atol + max(abs(I), abs(nI)) * rtol
+        eR = atol + max(abs(R), abs(nR)) * rtol
+        error = ((errS / eS) ** 2 + (errI / eI) ** 2 + (errR / eR) ** 2) ** 0.5 / 3 ** 0.5
+
+        if error < 1:
+            factor = 10.0 if error == 0 else min(10.0, 0.9 * error ** -0.2)
+            if rechazado:
+                factor = min(1.0, factor)
+            h_abs *= factor
+            rechazado = False
+            kn = ks[n]
+            kn[0] = fS, fI, fR
+            kn[1] = k2S, k2I, k2R
+            kn[2] = k3S, k3I, k3R
+            kn[3] = k4S, k4I, k4R
+            kn[4] = k5S, k5I, k5R
+            kn[5] = k6S, k6I, k6R
+            kn[6] = k7S, k7I, k7R
+            if pico is None and beta * nS <= gamma:
+                t_p, y_p = _raiz_en_paso(t, h, ys[n], kn, lambda y: beta * y[0] - gamma)
+                pico = (t_p, y_p[1])
+            if umbral is not None and I > umbral >= nI:
+                t_fin, y_fin = _raiz_en_paso(t, h, ys[n], kn, lambda y: y[1] - umbral)
+                t_umbral = t_fin
+            t, S, I, R = t_nuevo, nS, nI, nR
+            fS, fI, fR = k7S, k7I, k7R
+            n += 1
+            if n == capacidad:
+                capacidad *= 2
+                ts.resize(capacidad, refcheck=False)
+                ys.resize((capacidad, 3), refcheck=False)
+                ks.resize((capacidad, 7, 3), refcheck=False)
+            ts[n] = t
+            ys[n] = S, I, R
+            if t_umbral is not None:
+                break
+        else:
+            h_abs *= max(0.2, 0.9 * error ** -0.2)
+            rechazado = True
+
+    # Salida densa de todos los puntos de la malla en bloque
+    t_eval = np.linspace(t0, t_max, n_t)
+    j = np.clip(np.searchsorted(ts[:n + 1], t_eval, side="right") - 1, 0, max(n - 1, 0))
+    h = ts[j + 1] - ts[j]
+    x = (t_eval - ts[j]) / h
+    potencias = x[:, None] ** np.arange(1, 5)
+    Q = np.swapaxes(ks[:max(n, 1)], 1, 2) @ _P
+    y = ys[j] + h[:, None] * (Q[j] @ potencias[:, :, None])[:, :, 0]
+    if t_umbral is None:
+        y_fin = ys[n]
+    # Seis etapas nuevas por intento (la primera es la última del paso anterior)
+    estadisticas = statistics("fast", n, evaluaciones + 6 * intentos)
+    return _salida(t_eval, y.T.copy(), t_fin, y_fin, beta, gamma, alpha, pico, t_umbral, full_output, h_abs,
+                   estadisticas)
+
+# ---------- LOTES DE PARÁMETROS ----------
+# El lado derecho de cada lote lo genera el registro de modelos (sir_registro).
+def solve_sir_batch(N, I0, R0, beta, k, t_max, n_t=1000, rtol=1e-3, atol=1e-6, method="RK45", full_output=False):
+    """SIR clásico para muchas combinaciones (β, k) en una sola integración.
+
+    Los argumentos pueden ser escalares o arreglos que se difunden entre sí.
+    Devuelve (Y, t) con Y de forma (n_params, 3, n_t): S, I, R por miembro.
+    `method` y `full_output` (estadísticas de la integración) son los de
+    solve_model_batch.
+    """
+    return solve_model_batch("sir", _y0(N, I0, R0), t_max, n_t, rtol, atol, method, full_output, beta=beta, k=k)
+
+
+def solve_sir_extended_batch(N, I0, R0, beta, gamma, alpha, t_max, n_t=1000, rtol=1e-3, atol=1e-6, method="RK45",
+                             full_output=False):
+    """SIR extendido para muchas combinaciones (β, γ, α) en una sola integración.
+
+    Devuelve (Y, t) con Y de forma (n_params, 3, n_t), igual que solve_sir_batch.
+    """
+    return solve_model_batch("sir_extended", _y0(N, I0, R0), t_max, n_t, rtol, atol, method, full_output,
+                             beta=beta, gamma=gamma, alpha=alpha)
+
+
+def solve_rumor_batch(N, I0, R0, b, k, t_max, n_t=1000, rtol=1e-3, atol=1e-6, method="RK45", full_output=False):
+    """Modelo de rumor (dI/dt = bSI - kIR) para muchas combinaciones (b, k); misma salida que solve_sir_batch."""
+    return solve_model_batch("rumor", _y0(N, I0, R0), t_max, n_t, rtol, atol, method, full_output, b=b, k=k)
+
+
+def _y0(N, I0, R0):
+    N, I0, R0 = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (N, I0, R0)))
+    return N - I0 - R0, I0, R0
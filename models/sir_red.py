@@ -0,0 +1,161 @@
+import numpy as np
+from scipy import sparse
+
+# ---------- RUMOR SOBRE UNA RED DE CONTACTOS ----------
+# Cada persona es un nodo con estado 0 = S, 1 = I, 2 = R y sólo habla con sus
+# vecinos en el grafo, guardado como matriz de adyacencia CSR (indptr,
+# indices) simétrica y sin pesos. En cada paso dt, con #vecinos I y R los
+# vecinos propagadores y racionales de cada nodo:
+#     S → I con probabilidad 1 - exp(-b·dt·#vecinos I)
+#     I → R con probabilidad 1 - exp(-k·dt·#vecinos R)
+# que es la misma dinámica de la asignación 2 (dI/dt = bSI - kIR) contacto
+# por contacto; en el grafo completo sus promedios tienden a la EDO. Los
+# conteos de vecinos salen de A @ I al inicio y en cada paso sólo se
+# actualizan con las filas CSR de los nodos que cambiaron, con máscaras y
+# bincount de NumPy y sin bucles por nodo. Las réplicas van como columnas de
+# la misma matriz de estados.
+
+# ---------- GRAFOS ----------
+def _simetrica(filas, columnas, n):
+    """Adyacencia CSR simétrica sin lazos ni aristas repetidas."""
+    distinto = filas != columnas
+    filas, columnas = filas[distinto], columnas[distinto]
+    A = sparse.coo_matrix((np.ones(2 * filas.size, dtype=np.float32),
+                           (np.r_[filas, columnas], np.r_[columnas, filas])), shape=(n, n)).tocsr()
+    A.sum_duplicates()
+    A.data[:] = 1
+    return A
+
+
+def classroom_graph(n_alumnos=267, n_docentes=8, tamano_grupo=6, amigos=4, alumnos_por_docente=40,
+                    seed=None):
+    """Aula: grupos de `tamano_grupo` alumnos que se conocen todos (cliques), `amigos`
+    compañeros al azar por alumno y docentes que hablan con `alumnos_por_docente`
+    alumnos al azar cada uno.
+
+    Los docentes son los nodos 0..n_docentes-1 y los alumnos los siguientes
+    (por defecto 266 alumnos más el rumorista, como en la asignación 2).
+    """
+    rng = np.random.default_rng(seed)
+    alumnos = n_docentes + rng.permutation(n_alumnos)
+    grupo = np.arange(n_alumnos) // tamano_grupo
+    # Todos los pares dentro de cada grupo
+    i, j = np.triu_indices(n_alumnos, 1)
+    mismo = grupo[i] == grupo[j]
+    filas, columnas = [alumnos[i[mismo]]], [alumnos[j[mismo]]]
+    filas.append(np.repeat(np.arange(n_docentes, n_docentes + n_alumnos), amigos))
+    columnas.append(n_docentes + rng.integers(0, n_alumnos, n_alumnos * amigos))
+    alumnos_por_docente = min(alumnos_por_docente, n_alumnos)
+    filas.append(np.repeat(np.arange(n_docentes), alumnos_por_docente))
+    columnas.append(np.concatenate([n_docentes + rng.choice(n_alumnos, alumnos_por_docente, replace=False)
+                                    for _ in range(n_docentes)]))
+    return _simetrica(np.concatenate(filas), np.concatenate(columnas), n_alumnos + n_docentes)
+
+
+def small_world_graph(n, vecinos=10, p=0.1, seed=None):
+    """Watts–Strogatz: anillo con `vecinos` vecinos por nodo y cada arista reconectada con probabilidad p."""
+    rng = np.random.default_rng(seed)
+    filas = np.repeat(np.arange(n), vecinos // 2)
+    columnas = (filas + np.tile(np.arange(1, vecinos // 2 + 1), n)) % n
+    reconectar = rng.random(filas.size) < p
+    columnas[reconectar] = rng.integers(0, n, int(reconectar.sum()))
+    return _simetrica(filas, columnas, n)
+
+
+def complete_graph(n):
+    """Todos con todos: el caso en que la simulación promedia a la EDO."""
+    i, j = np.triu_indices(n, 1)
+    return _simetrica(i, j, n)
+
+
+def graph_from_edges(aristas, n=None):
+    """Grafo de una lista de aristas: arreglo (E, 2) o ruta a un archivo con dos columnas de enteros."""
+    if isinstance(aristas, str):
+        aristas = np.loadtxt(aristas, dtype=np.int64, ndmin=2, usecols=(0, 1))
+    aristas = np.asarray(aristas, dtype=np.int64)
+    n = int(aristas.max()) + 1 if n is None else n
+    return _simetrica(aristas[:, 0], aristas[:, 1], n)
+
+# ---------- SIMULACIÓN ----------
+def simulate_rumor_network(A, I0, R0, b, k, t_max, n_rep=1, dt=0.02, n_t=201, racionales=None, seed=None,
+                           full_output=False):
+    """Réplicas del rumor sobre el grafo A (CSR, n × n).
+
+    `b` y `k` son tasas por contacto y por día. Los R0 racionales iniciales
+    son los primeros nodos de `racionales` (p. ej. los docentes de
+    classroom_graph) y, si no alcanzan, nodos al azar; los I0 propagadores
+    se sortean entre el resto, distintos en cada réplica. Devuelve (Y, t)
+    con Y de forma (n_rep, 3, n_t), igual que simulate_rumor; con
+    `full_output=True` agrega un dict con "estados", el estado final de
+    cada nodo (n, n_rep).
+    """
+    A = sparse.csr_matrix(A, dtype=np.float32)
+    A.indptr, A.indices = A.indptr.astype(np.int64), A.indices.astype(np.int64)
+    n = A.shape[0]
+    rng = np.random.default_rng(seed)
+    racionales = np.asarray([] if racionales is None else racionales, dtype=np.int64)[:R0]
+    estados = np.zeros((n, n_rep), dtype=np.int8)
+    estados[racionales] = 2
+    for r in range(n_rep):
+        libres = np.flatnonzero(estados[:, r] == 0)
+        elegidos = rng.choice(libres, R0 - racionales.size + I0, replace=False)
+        estados[elegidos[:R0 - racionales.size], r] = 2
+        estados[elegidos[R0 - racionales.size:], r] = 1
+
+    # Vecinos propagadores y racionales de cada nodo; después sólo se actualizan con los que cambian
+    vecinos_I = np.asarray(A @ (estados == 1).astype(np.float32), dtype=np.int32)
+    vecinos_R = np.asarray(A @ (estados == 2).astype(np.float32), dtype=np.int32)
+    t_eval = np.linspace(0, t_max, n_t)
+    Y = np.empty((n_rep, 3, n_t))
+    Y[:, :, 0] = _conteos(estados)
+    for i in range(1, n_t):
+        pasos = max(int(np.ceil((t_eval[i] - t_eval[i - 1]) / dt)), 1)
+        h = (t_eval[i] - t_eval[i - 1]) / pasos
+        for _ in range(pasos):
+            _paso(A, estados, vecinos_I, vecinos_R, b * h, k * h, rng)
+        Y[:, :, i] = _conteos(estados)
+    if not full_output:
+        return Y, t_eval
+    return Y, t_eval, {"estados": estados}
+
+
+def _conteos(estados):
+    return np.stack([(estados == s).sum(axis=0) for s in range(3)], axis=1)
+
+
+def _vecinos(A, nodo, rep):
+    """Vecinos de los nodos (nodo, rep) con la réplica de cada uno, juntando sus filas CSR de una vez.
+
+    Cuesta lo que suman sus grados y no una pasada por toda la red.
+    """
+    inicio = A.indptr[nodo]
+    grado = A.indptr[nodo + 1] - inicio
+    posicion = np.repeat(inicio - np.cumsum(grado) + grado, grado) + np.arange(grado.sum())
+    return A.indices[posicion], np.repeat(rep, grado)
+
+
+def _sumar(conteo, A, nodo, rep, signo):
+    """Suma `signo` al conteo (n, n_rep) de cada vecino de los nodos que cambiaron (A es simétrica)."""
+    vecino, rep_vecino = _vecinos(A, nodo, rep)
+    if vecino.size:
+        plano = np.bincount(vecino * conteo.shape[1] + rep_vecino, minlength=conteo.size)
+        conteo += signo * plano.reshape(conteo.shape).astype(np.int32)
+
+
+def _paso(A, estados, vecinos_I, vecinos_R, b_h, k_h, rng):
+    """Un paso sincrónico: las probabilidades usan los vecinos del inicio del paso."""
+    # Sólo se sortea donde la transición es posible
+    nodo, rep = np.nonzero((estados == 0) & (vecinos_I > 0))
+    creen = rng.random(nodo.size) < -np.expm1(-b_h * vecinos_I[nodo, rep])
+    nodo_r, rep_r = np.nonzero((estados == 1) & (vecinos_R > 0))
+    desisten = rng.random(nodo_r.size) < -np.expm1(-k_h * vecinos_R[nodo_r, rep_r])
+    nodo, rep, nodo_r, rep_r = nodo[creen], rep[creen], nodo_r[desisten], rep_r[desisten]
+    estados[nodo, rep] = 1
+    estados[nodo_r, rep_r] = 2
+    _sumar(vecinos_I, A, nodo, rep, 1)
+    _sumar(vecinos_I, A, nodo_r, rep_r, -1)
+    _sumar(vecinos_R, A, nodo_r, rep_r, 1)
+
+
+def mean_degree(A):
+    return A.nnz / A.shape[0]
@@ -0,0 +1,395 @@
+"""Tablas precalculadas de las métricas de las tarjetas (superficies de respuesta).
+
+Los deslizadores de las páginas tienen dominios acotados, así que las
+métricas que muestran las tarjetas (pico, día del pico, total alcanzado y
+miembros al final) se calculan una sola vez sobre una malla de esos
+dominios y se guardan en models/tablas/ como `.npy` (abiertos con mmap: sólo
+se leen las esquinas de la celda pedida) con un `.json` que describe los
+ejes. En la página se leen por interpolación multilineal y el ODE sólo se
+resuelve para el gráfico.
+
+Error acotado: al construir, cada celda se compara contra la solución
+exacta (ver `_construir`) y ese error queda guardado por celda y por salida
+(`<tabla>_error.npy`). Si en la celda del punto pedido el error supera la
+tolerancia de quien consulta, o el punto cae fuera del dominio,
+`Tabla.__call__` devuelve None y la página usa el solver.
+
+El SIR clásico de la asignación 1 no necesita tabla: `sir_metrics` ya da
+sus métricas en forma cerrada y sin integrar.
+
+Las tablas no se versionan: se generan en un paso offline, al instalar o
+desplegar (unos 20 minutos con un núcleo). Si falta alguna, `tabla` da
+None y las páginas integran.
+    python -m models.sir_tablas
+"""
+import json
+import os
+
+import numpy as np
+
+from models.sir_model import solve_rumor_batch, solve_sir_extended_batch
+
+DIRECTORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablas")
+
+# Error admitido en las tarjetas: max(1 persona, 0,5 % de N) y 0.1 días (se muestran con un decimal)
+TOLERANCIA_PERSONAS = 1.0
+TOLERANCIA_RELATIVA = 0.005
+TOLERANCIA_DIAS = 0.1
+
+
+def _tolerancia_personas(N):
+    return max(TOLERANCIA_PERSONAS, TOLERANCIA_RELATIVA * N)
+
+
+class Tabla:
+    """Una tabla de models/tablas/ abierta con mmap e interpolada en forma multilineal."""
+
+    def __init__(self, nombre, directorio=DIRECTORIO):
+        with open(os.path.join(directorio, f"{nombre}.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.valores = np.load(os.path.join(directorio, f"{nombre}.npy"), mmap_mode="r")
+        self.error = np.load(os.path.join(directorio, f"{nombre}_error.npy"), mmap_mode="r")
+        self.ejes = [_transformar(np.array(eje["nodos"]), eje["escala"]) for eje in self.meta["ejes"]]
+
+    def __call__(self, tolerancia, **punto):
+        """Dict con las salidas en `punto`, o None si no se puede responder dentro de `tolerancia`.
+
+        `tolerancia` es un dict salida → error máximo admitido, en las
+        unidades de la salida. Da None fuera del dominio o si el error medido
+        en la celda supera la tolerancia de alguna salida.
+        """
+        indices, cortes, pesos = [], [], []
+        for eje, nodos in zip(self.meta["ejes"], self.ejes):
+            x = float(_transformar(np.asarray(punto[eje["nombre"]], dtype=float), eje["escala"]))
+            if eje["exacto"]:
+                # Eje con todos los valores posibles como nodos: no se interpola
+                i = int(np.argmin(np.abs(nodos - x)))
+                if abs(nodos[i] - x) > 1e-9 * max(abs(x), 1.0):
+                    return None
+                indices.append(i)
+                cortes.append(slice(i, i + 1))
+                pesos.append(None)
+                continue
+            if not nodos[0] - 1e-9 <= x <= nodos[-1] + 1e-9:
+                return None
+            i = min(max(int(np.searchsorted(nodos, x)) - 1, 0), len(nodos) - 2)
+            indices.append(i)
+            cortes.append(slice(i, i + 2))
+            pesos.append(min(max((x - nodos[i]) / (nodos[i + 1] - nodos[i]), 0.0), 1.0))
+
+        salidas = [s["nombre"] for s in self.meta["salidas"]]
+        error = self.error[(slice(None),) + tuple(indices)]
+        if any(float(e) > tolerancia[nombre] for nombre, e in zip(salidas, error)):
+            return None
+        v = np.asarray(self.valores[(slice(None),) + tuple(cortes)], dtype=float)
+        for w in pesos:
+            v = v[:, 0] if w is None else v[:, 0] * (1 - w) + v[:, 1] * w
+        return {nombre: float(_destransformar(x, s["escala"]))
+                for nombre, s, x in zip(salidas, self.meta["salidas"], v)}
+
+
+_abiertas = {}
+
+
+def tabla(nombre):
+    """La tabla `nombre`, abierta una vez por proceso; None si no se construyó."""
+    if nombre not in _abiertas:
+        try:
+            _abiertas[nombre] = Tabla(nombre)
+        except (OSError, ValueError, KeyError):
+            _abiertas[nombre] = None
+    return _abiertas[nombre]
+
+
+def _transformar(x, escala):
+    if escala == "log":
+        return np.log(x)
+    if escala == "logit":
+        return np.log(x) - np.log1p(-x)
+    return x
+
+
+def _destransformar(x, escala):
+    if escala == "log":
+        return np.exp(x)
+    if escala == "logit":
+        return 1 / (1 + np.exp(-x))
+    return x
+
+# ---------- MÉTRICAS DE LAS PÁGINAS ----------
+def sectas_metrics(N, I0, beta, gamma, alpha, t_max):
+    """Métricas de la asignación 3 desde las tablas, o None si hay que integrar.
+
+    Devuelve "pico", "dia_pico", "total_reclutados" (N - S) y
+    "final_miembros" (I en t_max) con error de a lo sumo
+    max(TOLERANCIA_PERSONAS, TOLERANCIA_RELATIVA·N) personas y TOLERANCIA_DIAS días. Si el pico cae después de t_max se informa I(t_max)
+    el día t_max, igual que hace la página con la trayectoria.
+    """
+    tablas = tabla("sectas_pico"), tabla("sectas_final")
+    if None in tablas:
+        return None
+    c = gamma + alpha
+    escalado = {"R0": beta * N / c, "a": alpha / c, "i0": I0 / N}
+    fraccion = _tolerancia_personas(N) / N
+    pico = tablas[0]({"pico": fraccion, "tau_pico": TOLERANCIA_DIAS * c}, **escalado)
+    final = tablas[1]({"S": fraccion, "I": fraccion}, **escalado, tau=c * t_max)
+    if pico is None or final is None:
+        return None
+    pico_val, pico_dia = pico["pico"] * N, pico["tau_pico"] / c
+    if pico_dia > t_max:
+        pico_val, pico_dia = final["I"] * N, float(t_max)
+    return {
+        "pico": pico_val,
+        "dia_pico": pico_dia,
+        "total_reclutados": N - final["S"] * N,
+        "final_miembros": final["I"] * N,
+    }
+
+
+def rumor_metrics(I0, R0, b, k):
+    """Pico, día del pico y total que creyó a los 15 días (asignación 2, N = 275), o None."""
+    t = tabla("rumor")
+    if t is None:
+        return None
+    personas = _tolerancia_personas(N_RUMOR)
+    tolerancia = {"pico": personas, "dia_pico": TOLERANCIA_DIAS, "total": personas}
+    return t(tolerancia, I0=I0, R0=R0, b=b, k=k)
+
+# ---------- CONSTRUCCIÓN ----------
+# Cada eje es (nombre, escala, nodos, exacto). Un eje exacto lista todos los
+# valores que puede tomar la página y no se interpola: se verifica en sus nodos.
+def _centros(eje):
+    _, escala, nodos, exacto = eje
+    if exacto:
+        return np.asarray(nodos, dtype=float)
+    x = _transformar(np.asarray(nodos, dtype=float), escala)
+    return _destransformar(0.5 * (x[:-1] + x[1:]), escala)
+
+
+def _en_lotes(evaluar, puntos, chunk=100):
+    """Evalúa `evaluar` sobre la malla de `puntos` por bloques; devuelve (salidas, *forma)."""
+    columnas = [m.ravel() for m in np.meshgrid(*puntos, indexing="ij")]
+    partes = [evaluar(*(c[i:i + chunk] for c in columnas)) for i in range(0, columnas[0].size, chunk)]
+    valores = np.concatenate(partes, axis=-1)
+    return valores.reshape(len(valores), *map(len, puntos))
+
+
+def _pares(V, eje):
+    """Los valores en i e i+1 a lo largo de `eje` (en V el eje 0 son las salidas)."""
+    n = V.shape[eje + 1]
+    return V.take(range(n - 1), axis=eje + 1), V.take(range(1, n), axis=eje + 1)
+
+
+def _guardar(nombre, ejes, salidas, valores, errores, extra, directorio):
+    os.makedirs(directorio, exist_ok=True)
+    np.save(os.path.join(directorio, f"{nombre}.npy"), valores.astype(np.float32))
+    # En float16 redondeado hacia arriba: basta el orden de magnitud y nunca achica el error
+    np.save(os.path.join(directorio, f"{nombre}_error.npy"),
+            np.nextafter(np.minimum(errores, 6e4).astype(np.float16), np.float16(np.inf)))
+    meta = {
+        "ejes": [{"nombre": n, "escala": e, "nodos": [float(x) for x in nodos], "exacto": exacto}
+                 for n, e, nodos, exacto in ejes],
+        "salidas": [{"nombre": n, "escala": e} for n, e in salidas],
+        **extra,
+    }
+    with open(os.path.join(directorio, f"{nombre}.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+
+
+def _construir(nombre, ejes, salidas, evaluar, extra, directorio, chunk=100):
+    """Evalúa en los nodos, mide el error de interpolación por celda y guarda la tabla.
+
+    La interpolación multilineal reproduce los términos cruzados, así que su
+    error es, a segundo orden, la suma de los errores de interpolar a lo
+    largo de cada eje. Para cada eje se evalúa el punto medio de cada arista
+    en esa dirección; el error de una celda es la suma, sobre los ejes, del
+    peor error entre sus aristas. (Medir sólo en el centro no basta: los
+    errores de dos ejes pueden cancelarse ahí y no en el resto de la celda.)
+    """
+    nodos = [np.asarray(eje[2], dtype=float) for eje in ejes]
+    valores = _en_lotes(evaluar, nodos, chunk)
+    interpolados = [d for d, eje in enumerate(ejes) if not eje[3]]
+    error = 0.0
+    for d in interpolados:
+        puntos = nodos[:d] + [_centros(ejes[d])] + nodos[d + 1:]
+        exactos = _en_lotes(evaluar, puntos, chunk)
+        izq, der = _pares(valores, d)
+        medio = np.stack([np.abs(_destransformar(0.5 * (izq[s] + der[s]), escala) - _destransformar(exactos[s], escala))
+                          for s, (_, escala) in enumerate(salidas)])
+        # Peor arista de cada celda en la dirección d
+        for k in interpolados:
+            if k != d:
+                medio = np.maximum(*_pares(medio, k))
+        error = error + medio
+    _guardar(nombre, ejes, salidas, valores, error, extra, directorio)
+
+
+def _hermite(t, y, dy, tiempos, por_fila=False):
+    """Interpolación cúbica de Hermite por filas con las derivadas exactas del modelo en la malla.
+
+    `t` es una malla uniforme desde 0. `tiempos` es común a todas las filas
+    o, con `por_fila=True`, uno por fila.
+    """
+    h = t[1] - t[0]
+    tiempos = np.asarray(tiempos, dtype=float)
+    j = np.clip((tiempos / h).astype(int), 0, len(t) - 2)
+    s = (tiempos - t[j]) / h
+    h00, h10 = 2 * s**3 - 3 * s**2 + 1, s**3 - 2 * s**2 + s
+    h01, h11 = -2 * s**3 + 3 * s**2, s**3 - s**2
+    if por_fila:
+        filas = np.arange(len(y))
+        y0, y1, d0, d1 = y[filas, j], y[filas, j + 1], dy[filas, j], dy[filas, j + 1]
+    else:
+        y0, y1, d0, d1 = y[:, j], y[:, j + 1], dy[:, j], dy[:, j + 1]
+    return h00 * y0 + h10 * h * d0 + h01 * y1 + h11 * h * d1
+
+
+def _pico_refinado(t, I):
+    """Máximo de cada fila con una parábola por los tres puntos alrededor del argmax."""
+    filas = np.arange(len(I))
+    j = np.argmax(I, axis=1)
+    # En un extremo de la malla no hay parábola: queda el punto de la malla
+    extremo = (j == 0) | (j == I.shape[1] - 1)
+    jc = np.clip(j, 1, I.shape[1] - 2)
+    y0, y1, y2 = I[filas, jc - 1], I[filas, jc], I[filas, jc + 1]
+    curvatura = y0 - 2 * y1 + y2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d = np.clip(np.where(curvatura < 0, 0.5 * (y0 - y2) / curvatura, 0.0), -1, 1)
+    pico = np.where(extremo, I[filas, j], y1 - 0.25 * (y0 - y2) * d)
+    dia = np.where(extremo, t[j], t[jc] + d * (t[1] - t[0]))
+    return pico, dia
+
+
+# Asignación 3: con τ = (γ+α)·t y S, I en fracción de N el modelo extendido
+# sólo depende de R0 = βN/(γ+α), a = α/(γ+α) e i0 = I0/N:
+#     dS/dτ = -R0·S·I - a·S,   dI/dτ = R0·S·I - (1 - a)·I
+# El pico es una tabla 3-D y S, I en τ una 4-D. Los dominios salen de los
+# deslizadores: γ + α ∈ [0.1, 1.2], βN ∈ [0.01, 20] y t ∈ [30, 365].
+# τ va en escala lineal: log S y log I son casi lineales en τ y en a.
+# Por debajo del umbral (R0 < 1 - a) el pico es i0 y todo varía poco: nodos
+# ralos; por encima, densos en log R0, que es el eje que más error aporta.
+def _nodos_R0(n_bajo, n_alto):
+    return np.r_[np.geomspace(0.008, 0.8, n_bajo)[:-1], np.geomspace(0.8, 200, n_alto)]
+
+
+EJES_SECTAS_PICO = [
+    ("R0", "log", _nodos_R0(11, 221), False),
+    ("a", "lin", np.linspace(0, 2 / 3, 21), False),
+    ("i0", "log", np.geomspace(1 / 20000, 100 / 1000, 21), False),
+]
+EJES_SECTAS_FINAL = [
+    ("R0", "log", _nodos_R0(6, 61), False),
+    ("a", "lin", np.linspace(0, 2 / 3, 17), False),
+    ("i0", "log", np.geomspace(1 / 20000, 100 / 1000, 11), False),
+    ("tau", "lin", np.r_[np.arange(3, 30, 3), np.arange(30, 100, 14), np.linspace(100, 440, 7)], False),
+]
+PASO_SECTAS = 0.02
+
+
+def _logit(y):
+    y = np.clip(y, 1e-300, 1 - 1e-16)
+    return np.log(y) - np.log1p(-y)
+
+
+def _trayectorias(R0, a, i0, tau_max, paso):
+    """S, I y sus derivadas en la malla 0, paso, ..., tau_max del modelo escalado."""
+    Y, t = solve_sir_extended_batch(1.0, i0, 0.0, R0, 1 - a, a, tau_max, n_t=int(round(tau_max / paso)) + 1,
+                                    rtol=1e-6, atol=1e-10)
+    S, I = Y[:, 0], Y[:, 1]
+    contagio = R0[:, None] * S * I
+    return t, S, I, -contagio - a[:, None] * S, contagio - (1 - a[:, None]) * I
+
+
+def _pico_cruce(t, S, I, dS, dI, s_critico):
+    """Pico de I donde S cruza s_critico = (1 - a)/R0; NaN si no cruza dentro de la malla.
+
+    El cruce se ubica por bisección sobre el Hermite de S en el intervalo donde cambia el signo.
+    """
+    bajo = S <= s_critico[:, None]
+    cruza = bajo.any(axis=1)
+    j = np.maximum(np.argmax(bajo, axis=1), 1)
+    izq, der = t[j - 1], t[j].copy()
+    for _ in range(40):
+        medio = 0.5 * (izq + der)
+        arriba = _hermite(t, S, dS, medio, por_fila=True) > s_critico
+        izq, der = np.where(arriba, medio, izq), np.where(arriba, der, medio)
+    # Si ya empieza por debajo del umbral el pico es el valor inicial
+    tau = np.where(bajo[:, 0], 0.0, 0.5 * (izq + der))
+    pico = _hermite(t, I, dI, tau, por_fila=True)
+    return np.where(cruza, pico, np.nan), np.where(cruza, tau, np.nan)
+
+
+def _evaluar_sectas(tiempos=()):
+    """Logit del pico, τ del pico y log de S e I en `tiempos` (filas) para cada combinación."""
+
+    def evaluar(R0, a, i0):
+        s_critico = (1 - a) / R0
+        # Con R0 grande el pico llega antes de τ = 1: se busca primero en una malla fina
+        pico, tau = _pico_cruce(*_trayectorias(R0, a, i0, 1.0, PASO_SECTAS / 40), s_critico)
+        t, S, I, dS, dI = _trayectorias(R0, a, i0, 440.0, PASO_SECTAS)
+        pico_g, tau_g = _pico_cruce(t, S, I, dS, dI, s_critico)
+        fina = ~np.isnan(pico) & (tau > 0)
+        pico, tau = np.where(fina, pico, pico_g), np.where(fina, tau, tau_g)
+        # Sin cruce en todo el horizonte (no pasa en los dominios de la página): máximo en la malla
+        sin = np.isnan(pico)
+        pico[sin], tau[sin] = I[sin].max(axis=1), t[I[sin].argmax(axis=1)]
+        S_t, I_t = _hermite(t, S, dS, tiempos), _hermite(t, I, dI, tiempos)
+        return np.concatenate([_logit(pico)[None], tau[None], np.log(np.maximum(S_t, 1e-300)).T,
+                               np.log(np.maximum(I_t, 1e-300)).T])
+    return evaluar
+
+
+def _evaluar_sectas_final(R0, a, i0, tau):
+    """log S y log I en cada punto (R0, a, i0, τ); una integración por combinación (R0, a, i0)."""
+    combos, fila = np.unique(np.stack([R0, a, i0]), axis=1, return_inverse=True)
+    tiempos, columna = np.unique(tau, return_inverse=True)
+    filas = _evaluar_sectas(tiempos)(*combos)[2:].reshape(2, len(tiempos), -1)
+    return filas[:, columna, fila.ravel()]
+
+
+def construir_sectas(directorio=DIRECTORIO):
+    evaluar = _evaluar_sectas()
+    _construir("sectas_pico", EJES_SECTAS_PICO, [("pico", "logit"), ("tau_pico", "lin")],
+               lambda R0, a, i0: evaluar(R0, a, i0)[:2], {}, directorio)
+    # τ es el último eje: cada bloque trae filas completas de τ para ~100 combinaciones
+    _construir("sectas_final", EJES_SECTAS_FINAL, [("S", "log"), ("I", "log")], _evaluar_sectas_final, {},
+               directorio, chunk=100 * len(EJES_SECTAS_FINAL[-1][2]))
+
+
+# Asignación 2: N = 275 y 15 días fijos. b es exacto (los valores del
+# deslizador, min + j·paso, y su valor inicial); k cubre también el escenario 2k.
+N_RUMOR, T_RUMOR = 275, 15
+EJES_RUMOR = [
+    ("I0", "log", np.array([1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 18, 20.0]), False),
+    ("R0", "log", np.array([1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 18, 21, 25, 30.0]), False),
+    ("b", "lin", np.unique(np.round(np.r_[np.arange(0.0001, 0.01, 0.0005), 0.004, 0.01], 6)), True),
+    ("k", "log", np.geomspace(0.001, 0.2, 40), False),
+]
+
+
+def _evaluar_rumor(I0, R0, b, k):
+    """Pico, día del pico y total que creyó (N - S a los 15 días) para cada combinación."""
+    Y, t = solve_rumor_batch(N_RUMOR, I0, R0, b, k, T_RUMOR, n_t=3001, rtol=1e-7, atol=1e-7)
+    pico, dia = _pico_refinado(t, Y[:, 1])
+    return np.stack([pico, dia, N_RUMOR - Y[:, 0, -1]])
+
+
+def construir_rumor(directorio=DIRECTORIO):
+    _construir("rumor", EJES_RUMOR, [("pico", "lin"), ("dia_pico", "lin"), ("total", "lin")], _evaluar_rumor,
+               {"N": N_RUMOR, "t_max": T_RUMOR}, directorio)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    directorio = sys.argv[1] if len(sys.argv) > 1 else DIRECTORIO
+    for construir in (construir_rumor, construir_sectas):
+        inicio = time.perf_counter()
+        construir(directorio)
+        print(f"{construir.__name__}: {time.perf_counter() - inicio:.1f} s")
+    for nombre in ("rumor", "sectas_pico", "sectas_final"):
+        t = Tabla(nombre, directorio)
+        error = np.asarray(t.error).reshape(len(t.error), -1)
+        mediana = ", ".join(f"{s['nombre']} {e:.2g}" for s, e in zip(t.meta["salidas"], np.median(error, axis=1)))
+        print(f"{nombre}: {t.valores.nbytes / 1e6:.2f} MB, error mediano por celda: {mediana}")
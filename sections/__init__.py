@@ -1,4 +1,21 @@
-from .inicio import show as inicio
-from .asignacion1 import show as asignacion1
-from .asignacion2 import show as asignacion2
-from .asignacion3 import show as asignacion3
\ No newline at end of file
+import importlib
+
+# Cada página se importa la primera vez que se abre, con sus dependencias
+# (matplotlib, scipy, los modelos): quien sólo ve "Inicio" no las carga.
+PAGINAS = {
+    "Inicio": "inicio",
+    "Asignación 1": "asignacion1",
+    "Asignación 2": "asignacion2",
+    "Asignación 3": "asignacion3",
+    "Facultades": "facultades",
+    "Calibración": "calibracion",
+}
+
+
+def __getattr__(nombre):
+    if nombre not in PAGINAS.values():
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    show = importlib.import_module(f".{nombre}", __name__).show
+    # Importar el submódulo deja el módulo en este atributo; se reemplaza por su show()
+    globals()[nombre] = show
+    return show
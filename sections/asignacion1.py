@@ -1,18 +1,14 @@
+import json
+import time
 import streamlit as st
 import numpy as np
-from models.sir_model import solve_sir
-from utils.plotter import plot_sir
-
-def local_css(file_name):
-    try:
-        with open(file_name, 'r', encoding='utf-8') as f:
-            st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
-    except:
-        pass  
+from models.sir_barrido import sweep_sir
+from models.sir_model import sir_metrics
+from utils.cache import cached_plot_sir, cached_solve_sir, cached_sweep
+from utils.fondo import recalcular
+from utils.plotter import figure_to_png, plot_heatmap
 
 def show():
-    local_css("style_navy.css")
-    
     # Header simple
     st.markdown("""
     <div class="simple-header">
@@ -43,6 +39,20 @@ def show():
     </div>
     """, unsafe_allow_html=True)
 
+    # Sólo esta parte se vuelve a ejecutar al mover un deslizador
+    simulacion()
+
+    mapa_parametros()
+
+    
+    st.markdown("""
+    <div class="simple-footer">
+        <p>Proyecto Pirata • UNMSM • Facultad de Ciencias Matemáticas</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+@st.fragment
+def simulacion():
     st.markdown("""
     <div class="simple-card">
         <h2>🎚️ Parámetros de Simulación</h2>
@@ -78,61 +88,110 @@ def show():
 
     # Simulación
     try:
-        S0 = N - I0
         R0 = 0
         t_max = 40
-        
-        S, I, R, t = solve_sir(N, I0, R0, beta, k, t_max)
-        
-       
-        st.markdown("""
-        <div class="simple-card">
-            <h2>📊 Resultados de la Simulación</h2>
-        """, unsafe_allow_html=True)
-        
-        fig = plot_sir(S, I, R, t)
-        st.pyplot(fig)
-        
-       
-        pico_dia = t[np.argmax(I)]
-        pico_infectados = int(max(I))
-        total_infectados = N - int(S[-1])
-        R0_valor = beta * N / k
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Pico de infectados", f"{pico_infectados}", f"Día {pico_dia:.1f}")
-        with col2:
-            st.metric("Total infectados", f"{total_infectados}")
-        with col3:
-            st.metric("R₀ básico", f"{R0_valor:.2f}")
-        
-        st.markdown("</div>", unsafe_allow_html=True)
-        
-       
-        st.markdown("""
-        <div class="simple-card">
-            <h2>💡 Análisis del Brote</h2>
-            <p><strong>R₀ = {:.2f}</strong> - La epidemia {}se propaga</p>
-            <p><strong>{:.1f}%</strong> de la población se infecta</p>
-            <p>Pico máximo: <strong>{}</strong> infectados simultáneos</p>
-        </div>
-        """.format(
-            R0_valor, 
-            "no " if R0_valor <= 1 else "",
-            (total_infectados/N*100),
-            pico_infectados
-        ), unsafe_allow_html=True)
+        renderer = st.session_state.get("renderer", "matplotlib")
+
+        def calcular(trabajo):
+            S, I, R, t = cached_solve_sir(N, I0, R0, beta, k, t_max, method="fast")
+            trabajo.verificar()
+            grafico = cached_plot_sir(S, I, R, t, clave="asignacion1", renderer=renderer)
+            # Pico en forma cerrada; si cae después de t_max se informa I(t_max) el día
+            # t_max, y el total es N - S(t_max), como en el gráfico
+            metricas = sir_metrics(N, I0, R0, beta, k)
+            pico_dia, pico_infectados = float(metricas["dia_pico"]), float(metricas["pico"])
+            if pico_dia > t_max:
+                pico_dia, pico_infectados = float(t_max), float(I[-1])
+            return {"grafico": grafico, "renderer": renderer, "N": N, "R0_valor": beta * N / k,
+                    "pico_dia": pico_dia, "pico_infectados": int(pico_infectados),
+                    "total_infectados": int(N - S[-1])}
+
+        recalcular("asignacion1", (N, I0, beta, k, renderer), calcular, mostrar_resultados)
         
     except Exception as e:
         st.error(f"Error en la simulación: {e}")
 
+
+def mostrar_resultados(r):
+    st.markdown("""
+    <div class="simple-card">
+        <h2>📊 Resultados de la Simulación</h2>
+    """, unsafe_allow_html=True)
     
+    if r["renderer"] == "vega":
+        st.vega_lite_chart(spec=json.loads(r["grafico"]), width="stretch")
+    else:
+        st.image(r["grafico"], width="stretch")
+    
+    pico_dia = r["pico_dia"]
+    pico_infectados = r["pico_infectados"]
+    total_infectados = r["total_infectados"]
+    R0_valor = r["R0_valor"]
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Pico de infectados", f"{pico_infectados}", f"Día {pico_dia:.1f}")
+    with col2:
+        st.metric("Total infectados", f"{total_infectados}")
+    with col3:
+        st.metric("R₀ básico", f"{R0_valor:.2f}")
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+    
+   
     st.markdown("""
-    <div class="simple-footer">
-        <p>Proyecto Pirata • UNMSM • Facultad de Ciencias Matemáticas</p>
+    <div class="simple-card">
+        <h2>💡 Análisis del Brote</h2>
+        <p><strong>R₀ = {:.2f}</strong> - La epidemia {}se propaga</p>
+        <p><strong>{:.1f}%</strong> de la población se infecta</p>
+        <p>Pico máximo: <strong>{}</strong> infectados simultáneos</p>
     </div>
+    """.format(
+        R0_valor, 
+        "no " if R0_valor <= 1 else "",
+        (total_infectados/r["N"]*100),
+        pico_infectados
+    ), unsafe_allow_html=True)
+
+METRICAS_MAPA = {
+    "pico": "Pico de infectados",
+    "dia_pico": "Día del pico",
+    "tamano_final": "Total infectados (día 40)",
+    "R0": "R₀ básico",
+}
+
+
+@st.fragment
+def mapa_parametros():
+    st.markdown("""
+    <div class="simple-card">
+        <h2>🗺️ Mapa de Parámetros</h2>
     """, unsafe_allow_html=True)
+    st.markdown("β y k recorren todo el rango de los deslizadores (200 × 200 combinaciones, 40 días) "
+                "con la población y los infectados iniciales por defecto.")
+    metrica = st.selectbox("Métrica", list(METRICAS_MAPA), format_func=METRICAS_MAPA.get)
+    if st.button("Calcular mapa"):
+        st.session_state["mapa_asignacion1"] = True
+
+    if st.session_state.get("mapa_asignacion1"):
+        betas = np.linspace(0.000001, 0.0005, 200)
+        ks = np.linspace(0.1, 1.0, 200)
+        progreso = st.progress(0.0)
+        lugar = st.empty()
+        dibujado = 0.0
+        # El mapa se redibuja a medida que llegan los bloques, como mucho ~3 veces por segundo
+        for completados, total, mapas in cached_sweep("sweep_sir", sweep_sir, 7138, 1, 0, betas, ks, 40):
+            if completados == total or time.perf_counter() - dibujado > 0.3:
+                fig = plot_heatmap(mapas[metrica], betas, ks, METRICAS_MAPA[metrica], "Tasa de infección (β)",
+                                   "Tasa de recuperación (k)", METRICAS_MAPA[metrica], clave="mapa_asignacion1")
+                lugar.image(figure_to_png(fig), width="stretch")
+                dibujado = time.perf_counter()
+            progreso.progress(completados / total, text=f"{completados} de {total} combinaciones")
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+
 
 if __name__ == "__main__":
+    from utils.tema import aplicar_tema
+    aplicar_tema()
     show()
\ No newline at end of file
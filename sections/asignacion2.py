@@ -1,18 +1,18 @@
+import json
 import streamlit as st
 import numpy as np
-from models.sir_model import solve_sir
-from utils.plotter import plot_sir_comparison
+from models.sir_model import solve_rumor_batch
+from models.sir_tablas import rumor_metrics
+from utils.cache import cached_plot_sir_comparison, cached_rumor_network
+from utils.fondo import recalcular
 
-def local_css(file_name):
-    try:
-        with open(file_name, 'r', encoding='utf-8') as f:
-            st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
-    except:
-        pass
+REDES = {
+    "Mezcla homogénea (EDO)": None,
+    "Aula: grupos y docentes": "aula",
+    "Mundo pequeño": "mundo_pequeno",
+}
 
 def show():
-    local_css("style_navy.css")
-    
 
     st.markdown("""
     <div class="simple-header">
@@ -44,7 +44,19 @@ def show():
     </div>
     """, unsafe_allow_html=True)
 
+
+    # Sólo esta parte se vuelve a ejecutar al mover un deslizador
+    simulacion()
+
     
+    st.markdown("""
+    <div class="simple-footer">
+        <p>Proyecto Pirata • UNMSM • Facultad de Ciencias Matemáticas</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+@st.fragment
+def simulacion():
     st.markdown("""
     <div class="simple-card">
         <h2>🎚️ Parámetros de Simulación</h2>
@@ -63,12 +75,16 @@ def show():
     with col2:
         b = st.slider("Tasa de propagación (b)", 0.0001, 0.01, 0.004, step=0.0005, format="%.4f")
         k = st.slider("Tasa de desinfección (k)", 0.001, 0.1, 0.01, step=0.001, format="%.3f")
+
+    red = REDES[st.selectbox("Red de contactos", list(REDES))]
+    if red is not None:
+        st.caption("Promedio de 100 simulaciones por persona sobre la red; b y k se escalan para que "
+                   "cada uno reciba la misma presión que en la mezcla homogénea.")
     
     st.markdown("</div>", unsafe_allow_html=True)
 
     
     try:
-        S0 = N - I0 - R0
         t_max = 15
 
         
@@ -76,54 +92,93 @@ def show():
             {"k": k, "label": f"k = {k:.3f} (persuasión actual)"},
             {"k": k * 2, "label": f"k = {k*2:.3f} (doble persuasión)"}
         ]
-        
-        
-        st.markdown("""
-        <div class="simple-card">
-            <h2>📊 Comparación de Escenarios</h2>
-        """, unsafe_allow_html=True)
-        
-        fig, data = plot_sir_comparison(N, I0, R0, b, escenarios, t_max)
-        st.pyplot(fig)
-        
-       
-        st.markdown("""
-        <div class="simple-card">
-            <h2>📈 Resultados a 15 Días</h2>
-        """, unsafe_allow_html=True)
-        
-        for i, d in enumerate(data):
-            pico_dia = d["t"][np.argmax(d["I"])]
-            pico_val = int(max(d["I"]))
-            total_creyentes = int(N - d["S"][-1])
-            porcentaje = (total_creyentes / N) * 100
-            
-            st.markdown(f"""
-            **{d['label']}:**
-            - Pico: **{pico_val}** creyentes (día {pico_dia:.1f})
-            - Total que creyó: **{total_creyentes}** personas ({porcentaje:.1f}%)
-            """)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
-        
-        
-        st.markdown("""
-        <div class="simple-card">
-            <h2>💡 Interpretación</h2>
-            <p><strong>Factor clave:</strong> La velocidad de respuesta racional (k) determina cuántas personas creen el rumor.</p>
-            <p><strong>Conclusión:</strong> En redes cerradas como un aula, la intervención temprana de personas racionales puede reducir drásticamente la propagación de rumores.</p>
-        </div>
-        """, unsafe_allow_html=True)
+        renderer = st.session_state.get("renderer", "matplotlib")
+
+        def calcular(trabajo):
+            if red is None:
+                grafico, _ = cached_plot_sir_comparison(N, I0, R0, b, escenarios, t_max, clave="asignacion2",
+                                                        renderer=renderer)
+                return {"grafico": grafico, "renderer": renderer}
+            Y, t = cached_rumor_network(red, I0, R0, b, [esc["k"] for esc in escenarios], t_max)
+            trabajo.verificar()
+            grafico, _ = cached_plot_sir_comparison(N, I0, R0, b, escenarios, t_max, clave="asignacion2",
+                                                    renderer=renderer, trayectorias=(Y, t))
+            return {"grafico": grafico, "renderer": renderer, "escenarios": escenarios, "N": N,
+                    "resultados": resumen(Y, t, N)}
+
+        # El gráfico se calcula en segundo plano; con mezcla homogénea los
+        # resultados salen al instante de la tabla precalculada y sólo si no
+        # alcanza se integra aquí. Sobre una red salen del promedio simulado.
+        lugar_grafico = st.container()
+        if red is None:
+            resultados = [rumor_metrics(I0, R0, b, esc["k"]) for esc in escenarios]
+            if None in resultados:
+                resultados = resultados_exactos(N, I0, R0, b, escenarios, t_max)
+            mostrar_escenarios(escenarios, resultados, N)
+        with lugar_grafico:
+            recalcular("asignacion2", (I0, R0, b, k, red, renderer), calcular, mostrar_resultados)
         
     except Exception as e:
         st.error(f"Error en la simulación: {e}")
 
+
+def resultados_exactos(N, I0, R0, b, escenarios, t_max):
+    Y, t = solve_rumor_batch(N, I0, R0, b, [esc["k"] for esc in escenarios], t_max)
+    return resumen(Y, t, N)
+
+
+def resumen(Y, t, N):
+    resultados = []
+    for S, I, R in Y:
+        pico_idx = np.argmax(I)
+        resultados.append({"pico": I[pico_idx], "dia_pico": t[pico_idx], "total": N - S[-1]})
+    return resultados
+
+
+def mostrar_resultados(r):
+    st.markdown("""
+    <div class="simple-card">
+        <h2>📊 Comparación de Escenarios</h2>
+    """, unsafe_allow_html=True)
     
+    if r["renderer"] == "vega":
+        st.vega_lite_chart(spec=json.loads(r["grafico"]), width="stretch")
+    else:
+        st.image(r["grafico"], width="stretch")
+
+    if "resultados" in r:
+        mostrar_escenarios(r["escenarios"], r["resultados"], r["N"])
+
+
+def mostrar_escenarios(escenarios, resultados, N):
     st.markdown("""
-    <div class="simple-footer">
-        <p>Proyecto Pirata • UNMSM • Facultad de Ciencias Matemáticas</p>
+    <div class="simple-card">
+        <h2>📈 Resultados a 15 Días</h2>
+    """, unsafe_allow_html=True)
+    
+    for esc, res in zip(escenarios, resultados):
+        pico_val = int(res["pico"])
+        total_creyentes = int(res["total"])
+        porcentaje = (total_creyentes / N) * 100
+        
+        st.markdown(f"""
+        **{esc['label']}:**
+        - Pico: **{pico_val}** creyentes (día {res['dia_pico']:.1f})
+        - Total que creyó: **{total_creyentes}** personas ({porcentaje:.1f}%)
+        """)
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+    
+    
+    st.markdown("""
+    <div class="simple-card">
+        <h2>💡 Interpretación</h2>
+        <p><strong>Factor clave:</strong> La velocidad de respuesta racional (k) determina cuántas personas creen el rumor.</p>
+        <p><strong>Conclusión:</strong> En redes cerradas como un aula, la intervención temprana de personas racionales puede reducir drásticamente la propagación de rumores.</p>
     </div>
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
+    from utils.tema import aplicar_tema
+    aplicar_tema()
     show()
\ No newline at end of file
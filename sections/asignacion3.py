@@ -1,18 +1,19 @@
+import json
 import streamlit as st
 import numpy as np
-from models.sir_model import solve_sir_extended
-from utils.plotter import plot_sir_profesional
+from models.sir_tablas import sectas_metrics
+from utils.cache import (cached_bandas_sir_extended, cached_plot_sir_profesional, cached_propagate_uncertainty,
+                         incremental_solve_sir_extended)
+from utils.fondo import recalcular
 
-def local_css(file_name):
-    try:
-        with open(file_name, 'r', encoding='utf-8') as f:
-            st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
-    except:
-        pass
+BANDAS = {
+    "Ninguna": None,
+    "Variabilidad estocástica (1000 réplicas)": "estocastica",
+    "Incertidumbre en β y γ": "parametros",
+}
+MUESTREOS = {"Hipercubo latino": "lhs", "Sobol": "sobol"}
 
 def show():
-    local_css("style_navy.css")
-    
     
     st.markdown("""
     <div class="simple-header">
@@ -45,7 +46,19 @@ def show():
     </div>
     """, unsafe_allow_html=True)
 
-    
+
+    # Sólo esta parte se vuelve a ejecutar al mover un deslizador
+    simulacion()
+
+   
+    st.markdown("""
+    <div class="simple-footer">
+        <p>Proyecto Pirata • UNMSM • Facultad de Ciencias Matemáticas</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+@st.fragment
+def simulacion():
     st.markdown("""
     <div class="simple-card">
         <h2>🎚️ Parámetros de Simulación</h2>
@@ -63,77 +76,162 @@ def show():
         gamma = st.slider("Tasa de abandono (γ)", 0.1, 1.0, 0.40, step=0.05)
         alpha = st.slider("Tasa de inmunización (α)", 0.0, 0.2, 0.05, step=0.01)
     
+    bandas_tipo = BANDAS[st.radio("Bandas sombreadas", list(BANDAS), horizontal=True)]
+    incertidumbre, muestreo = 20, "lhs"
+    if bandas_tipo == "parametros":
+        col3, col4 = st.columns(2)
+        with col3:
+            incertidumbre = st.slider("Incertidumbre en β y γ (± %)", 5, 50, 20, step=5)
+        with col4:
+            muestreo = MUESTREOS[st.selectbox("Muestreo", list(MUESTREOS))]
+
     st.markdown("</div>", unsafe_allow_html=True)
 
     
     try:
-        S0 = N - I0
         R0 = 0
+        renderer = st.session_state.get("renderer", "matplotlib")
 
-        S, I, R, t = solve_sir_extended(N, I0, R0, beta, gamma, alpha, t_max)
+        def calcular(trabajo):
+            # Se detiene cuando queda menos de medio miembro activo; el resto es analítico.
+            # Al mover los días se recorta o se continúa la trayectoria ya calculada.
+            S, I, R, t, info = incremental_solve_sir_extended(N, I0, R0, beta, gamma, alpha, t_max,
+                                                              method="fast", umbral=0.5)
+            trabajo.verificar()
+            bandas = resumen = incierto = None
+            etiqueta = "Variabilidad estocástica"
+            if bandas_tipo == "estocastica":
+                bandas, resumen = cached_bandas_sir_extended(N, I0, R0, beta, gamma, alpha, t_max)
+                trabajo.verificar()
+            elif bandas_tipo == "parametros":
+                # Priors uniformes de ± incertidumbre % alrededor de los deslizadores
+                f = incertidumbre / 100
+                incierto = cached_propagate_uncertainty("sir_extended", N, I0, R0,
+                                                        {"beta": (beta * (1 - f), beta * (1 + f)),
+                                                         "gamma": (gamma * (1 - f), gamma * (1 + f))},
+                                                        t_max, fijos={"alpha": alpha}, n_muestras=2048,
+                                                        metodo=muestreo)
+                trabajo.verificar()
+                bandas = {clave: incierto[clave] for clave in ("t", "inferior", "superior")}
+                etiqueta = f"Incertidumbre en β y γ (± {incertidumbre} %)"
+            grafico = cached_plot_sir_profesional(S, I, R, t,
+                                                  title="Propagación de sectas en comunidad universitaria",
+                                                  clave="asignacion3", renderer=renderer, bandas=bandas,
+                                                  etiqueta_bandas=etiqueta)
+            return {"grafico": grafico, "renderer": renderer, "eventos": info["eventos"], "resumen": resumen,
+                    "incierto": incierto}
 
-        
-        st.markdown("""
-        <div class="simple-card">
-            <h2>📊 Evolución de la Secta</h2>
-        """, unsafe_allow_html=True)
-        
-        fig = plot_sir_profesional(S, I, R, t, title="Propagación de sectas en comunidad universitaria")
-        st.pyplot(fig)
-        
-        
-        pico_dia = t[np.argmax(I)]
-        pico_val = int(max(I))
-        final_miembros = int(I[-1])
-        total_reclutados = N - int(S[-1])
-        R0_efectivo = beta * N / (gamma + alpha)
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Pico de miembros", f"{pico_val}", f"Día {pico_dia:.1f}")
-        with col2:
-            st.metric("Total reclutados", f"{total_reclutados}")
-        with col3:
-            st.metric("R₀ efectivo", f"{R0_efectivo:.2f}")
-        
-        st.markdown("</div>", unsafe_allow_html=True)
-        
-        
-        st.markdown("""
-        <div class="simple-card">
-            <h2>💡 Análisis del Reclutamiento</h2>
-        """, unsafe_allow_html=True)
-        
-        umbral = gamma / beta
-        st.markdown(f"""
-        **Umbral crítico:** Cuando hay menos de **{umbral:.0f}** estudiantes vulnerables, la secta deja de crecer.
-        
-        **Resultados:**
-        - Miembros al final: **{final_miembros}** (la secta {'desaparece' if final_miembros < 10 else 'persiste'})
-        - R₀ efectivo: **{R0_efectivo:.2f}** ({'crece' if R0_efectivo > 1 else 'decae'})
-        - Efecto de la inmunización: **{alpha/(gamma + alpha)*100:.1f}%** de reducción en el crecimiento
-        """)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
-        
-        
-        st.markdown("""
-        <div class="simple-card">
-            <h2>🎓 Conclusión</h2>
-            <p><strong>La educación crítica (α) es clave:</strong> Invertir en alfabetización ideológica es más efectivo que prohibir la secta.</p>
-            <p><strong>Predicción:</strong> La secta crece rápidamente al inicio pero desaparece gracias a la inmunización social y el abandono espontáneo.</p>
-        </div>
-        """, unsafe_allow_html=True)
+        # El gráfico se calcula en segundo plano; las tarjetas salen al instante
+        # de las tablas precalculadas y sólo si no alcanzan se integra aquí.
+        lugar_grafico = st.container()
+        metricas = sectas_metrics(N, I0, beta, gamma, alpha, t_max)
+        if metricas is None:
+            metricas = metricas_exactas(N, I0, R0, beta, gamma, alpha, t_max)
+        mostrar_metricas(metricas, N, beta, gamma, alpha)
+        with lugar_grafico:
+            recalcular("asignacion3", (N, I0, t_max, beta, gamma, alpha, bandas_tipo, incertidumbre, muestreo,
+                                      renderer), calcular,
+                       mostrar_resultados)
         
     except Exception as e:
         st.error(f"Error en la simulación: {e}")
 
-   
+
+def metricas_exactas(N, I0, R0, beta, gamma, alpha, t_max):
+    # Misma integración que el gráfico: la que corre en segundo plano la encuentra en caché
+    S, I, R, t, info = incremental_solve_sir_extended(N, I0, R0, beta, gamma, alpha, t_max,
+                                                      method="fast", umbral=0.5)
+    pico = info["eventos"]["pico"]
+    if pico is not None:
+        pico_dia, pico_val = pico
+    else:
+        pico_dia, pico_val = t[np.argmax(I)], max(I)
+    return {"pico": pico_val, "dia_pico": pico_dia, "total_reclutados": N - S[-1], "final_miembros": I[-1]}
+
+
+def mostrar_resultados(r):
+    eventos = r["eventos"]
     st.markdown("""
-    <div class="simple-footer">
-        <p>Proyecto Pirata • UNMSM • Facultad de Ciencias Matemáticas</p>
+    <div class="simple-card">
+        <h2>📊 Evolución de la Secta</h2>
+    """, unsafe_allow_html=True)
+    
+    if r["renderer"] == "vega":
+        st.vega_lite_chart(spec=json.loads(r["grafico"]), width="stretch")
+    else:
+        st.image(r["grafico"], width="stretch")
+
+    if eventos["umbral"] is not None:
+        st.markdown(f"- La secta se queda sin miembros activos el **día {eventos['umbral']:.1f}**; "
+                    "desde ahí la simulación no necesita seguir integrando.")
+    resumen = r["resumen"]
+    if resumen is not None:
+        st.markdown(f"""
+    **Variabilidad entre {resumen['replicas']} réplicas estocásticas** (banda sombreada: 5–95 %):
+    - Probabilidad de que la secta se extinga sin un brote: **{resumen['prob_extincion']*100:.1f}%**
+    - Pico de miembros: **{resumen['pico_media']:.0f} ± {resumen['pico_std']:.0f}**
+    - Total reclutados por contacto: **{resumen['tamano_final_media']:.0f} ± {resumen['tamano_final_std']:.0f}**
+    """)
+    incierto = r["incierto"]
+    if incierto is not None:
+        dia, tamano = incierto["dia_pico"]["cuantiles"], incierto["tamano_final"]["cuantiles"]
+        bajo, _, alto = list(dia)
+        st.markdown(f"""
+    **Incertidumbre en β y γ** ({incierto['muestras']} muestras, banda sombreada: {bajo*100:.0f}–{alto*100:.0f} %):
+    - Día del pico: **{dia[0.5]:.1f}** (entre {dia[bajo]:.1f} y {dia[alto]:.1f})
+    - Total reclutados: **{tamano[0.5]:.0f}** (entre {tamano[bajo]:.0f} y {tamano[alto]:.0f})
+    """)
+        with st.expander("Distribución del día del pico y del total reclutado"):
+            col1, col2 = st.columns(2)
+            for columna, nombre, clave in ((col1, "Día del pico", "dia_pico"),
+                                           (col2, "Total reclutados", "tamano_final")):
+                conteos, bordes = incierto[clave]["distribucion"]
+                centros = (bordes[:-1] + bordes[1:]) / 2
+                with columna:
+                    st.bar_chart({nombre: np.round(centros, 1), "Muestras": conteos}, x=nombre, y="Muestras")
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
+def mostrar_metricas(m, N, beta, gamma, alpha):
+    final_miembros = int(m["final_miembros"])
+    R0_efectivo = beta * N / (gamma + alpha)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Pico de miembros", f"{int(m['pico'])}", f"Día {m['dia_pico']:.1f}")
+    with col2:
+        st.metric("Total reclutados", f"{int(m['total_reclutados'])}")
+    with col3:
+        st.metric("R₀ efectivo", f"{R0_efectivo:.2f}")
+    
+    
+    st.markdown("""
+    <div class="simple-card">
+        <h2>💡 Análisis del Reclutamiento</h2>
+    """, unsafe_allow_html=True)
+    
+    st.markdown(f"""
+    **Umbral crítico:** Cuando hay menos de **{gamma / beta:.0f}** estudiantes vulnerables, la secta deja de crecer.
+    
+    **Resultados:**
+    - Miembros al final: **{final_miembros}** (la secta {'desaparece' if final_miembros < 10 else 'persiste'})
+    - R₀ efectivo: **{R0_efectivo:.2f}** ({'crece' if R0_efectivo > 1 else 'decae'})
+    - Efecto de la inmunización: **{alpha / (gamma + alpha)*100:.1f}%** de reducción en el crecimiento
+    """)
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+    
+    
+    st.markdown("""
+    <div class="simple-card">
+        <h2>🎓 Conclusión</h2>
+        <p><strong>La educación crítica (α) es clave:</strong> Invertir en alfabetización ideológica es más efectivo que prohibir la secta.</p>
+        <p><strong>Predicción:</strong> La secta crece rápidamente al inicio pero desaparece gracias a la inmunización social y el abandono espontáneo.</p>
     </div>
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
+    from utils.tema import aplicar_tema
+    aplicar_tema()
     show()
\ No newline at end of file
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import streamlit as st
+from models.sir_calibracion import read_counts, synthetic_counts
+from models.sir_registro import get_model
+from utils.cache import cached_calibrate, cached_plot_calibration
+from utils.fondo import recalcular
+
+MODELOS = {
+    "SIR clásico (β, k)": "sir",
+    "SIR extendido (β, γ, α)": "sir_extended",
+}
+OBSERVABLES = {
+    "Casos activos (I)": "I",
+    "Casos nuevos por día": "incidencia",
+}
+NOMBRES = {"beta": "β", "k": "k", "gamma": "γ", "alpha": "α", "I0": "I₀"}
+
+
+def show():
+    st.markdown("""
+    <div class="simple-header">
+        <h1>🎯 Calibración con Casos Reales</h1>
+        <p>Ajuste de los parámetros del modelo a una serie diaria de casos</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("""
+    <div class="simple-card">
+        <h2>📈 Cómo se ajusta</h2>
+        <p>Se buscan los parámetros que minimizan la diferencia entre el modelo y los casos observados,
+        ponderada como en Poisson (un error de 10 casos pesa más cuando se observaron 20 que cuando se
+        observaron 2000). El gradiente es exacto: junto con el modelo se integran sus ecuaciones de
+        sensibilidad. Se parte de varios puntos al azar para no quedarse en un mínimo local.</p>
+        <p>El CSV necesita una columna de casos (<code>casos</code>) y, opcionalmente, una de días
+        (<code>dia</code>); sin ella cada fila es un día.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    simulacion()
+
+    st.markdown("""
+    <div class="simple-footer">
+        <p>Proyecto Pirata • UNMSM • Facultad de Ciencias Matemáticas</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+@st.fragment
+def simulacion():
+    st.markdown("""
+    <div class="simple-card">
+        <h2>📂 Datos y Modelo</h2>
+    """, unsafe_allow_html=True)
+
+    archivo = st.file_uploader("Casos diarios (CSV)", type=["csv", "txt"])
+    col1, col2 = st.columns(2)
+    with col1:
+        modelo = MODELOS[st.selectbox("Modelo", list(MODELOS))]
+        observable = OBSERVABLES[st.radio("Los datos son", list(OBSERVABLES), horizontal=True)]
+    with col2:
+        N = st.number_input("Población total", min_value=100, max_value=10_000_000, value=7138)
+        n_inicios = st.slider("Puntos de partida", 4, 64, 8, step=4)
+
+    try:
+        if archivo is None:
+            # Brote simulado de gripe porcina (asignación 1) con ruido de Poisson
+            dias, casos = synthetic_counts("sir", 7138, 5, 100, observable=observable, beta=0.00014, k=0.4)
+            st.caption("Sin archivo: datos de ejemplo simulados (SIR con β = 0.00014, k = 0.40 y ruido de Poisson).")
+            origen = f"ejemplo/{observable}"
+        else:
+            contenido = archivo.getvalue()
+            dias, casos = read_counts(contenido)
+            origen = hashlib.blake2b(contenido, digest_size=12).hexdigest()
+    except (ValueError, UnicodeDecodeError) as e:
+        st.error(f"No se pudo leer el archivo: {e}")
+        st.markdown("</div>", unsafe_allow_html=True)
+        return
+
+    if casos.max() >= N:
+        st.error(f"Hay días con {casos.max():.0f} casos, más que la población total ({N}).")
+        st.markdown("</div>", unsafe_allow_html=True)
+        return
+
+    ajustar_I0 = st.checkbox("Ajustar también I₀", value=True,
+                             help="El primer conteo trae ruido; tomarlo como exacto sesga β.")
+    I0 = st.number_input("Infectados iniciales (I₀)" + (", punto de partida" if ajustar_I0 else ""),
+                         min_value=1, max_value=int(N) - 1,
+                         value=min(max(int(casos[0]), 1), int(N) - 1) if observable == "I" else 5)
+    if not ajustar_I0:
+        st.caption("Con I₀ fijo los errores estándar suponen que I₀ es exacto.")
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    try:
+        renderer = st.session_state.get("renderer", "matplotlib")
+
+        def calcular(trabajo):
+            ajustar = (*get_model(modelo).parametros, "I0") if ajustar_I0 else None
+            ajuste = cached_calibrate(modelo, dias, casos, N, I0=I0, observable=observable, ajustar=ajustar,
+                                      n_inicios=n_inicios)
+            trabajo.verificar()
+            etiqueta = "Casos activos" if observable == "I" else "Casos nuevos por día"
+            grafico = cached_plot_calibration(dias, casos, ajuste["t"], ajuste["ajuste"], etiqueta=etiqueta,
+                                              clave="calibracion", renderer=renderer)
+            return {"grafico": grafico, "renderer": renderer, "ajuste": ajuste, "N": N}
+
+        recalcular("calibracion", (origen, modelo, observable, N, I0, ajustar_I0, n_inicios, renderer), calcular,
+                   mostrar_resultados)
+
+    except Exception as e:
+        st.error(f"Error en la calibración: {e}")
+
+
+def mostrar_resultados(r):
+    ajuste = r["ajuste"]
+    parametros, error = ajuste["parametros"], ajuste["error_estandar"]
+    st.markdown("""
+    <div class="simple-card">
+        <h2>📊 Ajuste</h2>
+    """, unsafe_allow_html=True)
+
+    if r["renderer"] == "vega":
+        st.vega_lite_chart(spec=json.loads(r["grafico"]), width="stretch")
+    else:
+        st.image(r["grafico"], width="stretch")
+
+    salida = parametros.get("k", 0.0) + parametros.get("gamma", 0.0) + parametros.get("alpha", 0.0)
+    R0_valor = parametros["beta"] * r["N"] / salida
+    columnas = st.columns(len(parametros) + 1)
+    for columna, (nombre, valor) in zip(columnas, parametros.items()):
+        with columna:
+            st.metric(NOMBRES.get(nombre, nombre), f"{valor:.4g}", f"± {error[nombre]:.2g}", delta_color="off")
+    with columnas[-1]:
+        st.metric("R₀", f"{R0_valor:.2f}")
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    with st.expander("Puntos de partida"):
+        st.markdown(f"{len(ajuste['inicios'])} puntos de partida, {ajuste['evaluaciones']} integraciones "
+                    "del modelo con sus sensibilidades. Los descartados iban a un mínimo mucho peor.")
+        st.dataframe([{**{NOMBRES.get(p, p): f"{v:.4g}" for p, v in inicio["parametros"].items()},
+                       "costo": round(inicio["costo"], 2), "iteraciones": inicio["iteraciones"],
+                       "estado": "convergió" if inicio["convergio"] else
+                                 "descartado" if inicio["descartado"] else "sin converger"}
+                      for inicio in ajuste["inicios"]], hide_index=True)
+
+
+if __name__ == "__main__":
+    from utils.tema import aplicar_tema
+    aplicar_tema()
+    show()
@@ -1,33 +1,8 @@
 import streamlit as st
-from PIL import Image
-import os
-import base64
+from utils.fotos import foto_miniatura, resolver_asset
 
 
-def local_css(file_name):
-    try:
-        with open(file_name, 'r', encoding='utf-8') as f:
-            st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
-    except FileNotFoundError:
-        st.warning(f"⚠️ No se encontró el archivo de estilos: {file_name}")
-    except UnicodeDecodeError:
-        try:
-            with open(file_name, 'r', encoding='latin-1') as f:
-                st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
-        except Exception as e:
-            st.error(f"Error al leer el archivo CSS: {e}")
-
-def get_image_base64(image_path):
-    """Convierte imagen a base64 para mejor rendimiento"""
-    try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except:
-        return None
-
 def show():
-    local_css("style_navy.css")
-
     
     col_text, col_logo = st.columns([3, 1])
     
@@ -47,15 +22,10 @@ def show():
         )
 
     with col_logo:
-        logo_paths = ["assets/sanmarcos.jpg", "assets/sanmarcos.jpg"]
-        logo_found = False
-        for logo_path in logo_paths:
-            if os.path.exists(logo_path):
-                st.image(logo_path, use_container_width=True)
-                logo_found = True
-                break
-        
-        if not logo_found:
+        logo_path = resolver_asset("assets/sanmarcos.jpg")
+        if logo_path:
+            st.image(logo_path, width="stretch")
+        else:
             st.markdown('<div class="logo-placeholder">UNMSM</div>', unsafe_allow_html=True)
 
     
@@ -108,91 +78,91 @@ def show():
     cols = st.columns(2)
     for idx, miembro in enumerate(integrantes):
         with cols[idx % 2]:
-            if os.path.exists(miembro["foto"]):
-                img_base64 = get_image_base64(miembro["foto"])
-                if img_base64:
-                    if miembro["destacado"] and miembro["tipo"] == "gold":
-                        
-                        st.markdown(
-                            f"""
-                            <div class="member-card-gold">
-                                <div class="lava-lamp-animation">
-                                    <div class="lava-bubble bubble-1"></div>
-                                    <div class="lava-bubble bubble-2"></div>
-                                    <div class="lava-bubble bubble-3"></div>
-                                    <div class="lava-bubble bubble-4"></div>
-                                    <div class="gold-sparkle sparkle-1">✨</div>
-                                    <div class="gold-sparkle sparkle-2">✨</div>
-                                    <div class="gold-sparkle sparkle-3">✨</div>
-                                </div>
-                                <div class="member-avatar-gold">
-                                    <img src="data:image/jpeg;base64,{img_base64}" alt="{miembro['nombre']}">
-                                    <div class="crown"></div>
-                                </div>
-                                <div class="member-content-gold">
-                                    <div class="gold-badge">{miembro['badge']}</div>
-                                    <h3 class="member-name-gold">{miembro['nombre']}</h3>
-                                    <p class="member-role-gold">{miembro['rol']}</p>
-                                    <div class="gold-particles">
-                                        <div class="particle"></div>
-                                        <div class="particle"></div>
-                                        <div class="particle"></div>
-                                        <div class="particle"></div>
-                                    </div>
-                                </div>
+            # Miniatura ya recortada y reducida, en caché por el hash del archivo
+            img_src = foto_miniatura(miembro["foto"])
+            if img_src:
+                if miembro["destacado"] and miembro["tipo"] == "gold":
+                    
+                    st.markdown(
+                        f"""
+                        <div class="member-card-gold">
+                            <div class="lava-lamp-animation">
+                                <div class="lava-bubble bubble-1"></div>
+                                <div class="lava-bubble bubble-2"></div>
+                                <div class="lava-bubble bubble-3"></div>
+                                <div class="lava-bubble bubble-4"></div>
+                                <div class="gold-sparkle sparkle-1">✨</div>
+                                <div class="gold-sparkle sparkle-2">✨</div>
+                                <div class="gold-sparkle sparkle-3">✨</div>
                             </div>
-                            """, 
-                            unsafe_allow_html=True
-                        )
-                    elif miembro["destacado"] and miembro["tipo"] == "emerald":
-                        
-                        st.markdown(
-                            f"""
-                            <div class="member-card-emerald">
-                                <div class="emerald-lava-animation">
-                                    <div class="emerald-bubble bubble-1"></div>
-                                    <div class="emerald-bubble bubble-2"></div>
-                                    <div class="emerald-bubble bubble-3"></div>
-                                    <div class="emerald-bubble bubble-4"></div>
-                                    <div class="emerald-sparkle sparkle-1">💚</div>
-                                    <div class="emerald-sparkle sparkle-2">📖</div>
-                                    <div class="emerald-sparkle sparkle-3">✨</div>
-                                </div>
-                                <div class="member-avatar-emerald">
-                                    <img src="data:image/jpeg;base64,{img_base64}" alt="{miembro['nombre']}">
-                                    <div class="latex-symbol">𝜤</div>
-                                </div>
-                                <div class="member-content-emerald">
-                                    <div class="emerald-badge">{miembro['badge']}</div>
-                                    <h3 class="member-name-emerald">{miembro['nombre']}</h3>
-                                    <p class="member-role-emerald">{miembro['rol']}</p>
-                                    <div class="emerald-particles">
-                                        <div class="particle"></div>
-                                        <div class="particle"></div>
-                                        <div class="particle"></div>
-                                        <div class="particle"></div>
-                                    </div>
-                                </div>
+                            <div class="member-avatar-gold">
+                                <img src="{img_src}" alt="{miembro['nombre']}">
+                                <div class="crown"></div>
                             </div>
-                            """, 
-                            unsafe_allow_html=True
-                        )
-                    else:
-                        
-                        st.markdown(
-                            f"""
-                            <div class="member-card-large">
-                                <div class="member-avatar-large">
-                                    <img src="data:image/jpeg;base64,{img_base64}" alt="{miembro['nombre']}">
+                            <div class="member-content-gold">
+                                <div class="gold-badge">{miembro['badge']}</div>
+                                <h3 class="member-name-gold">{miembro['nombre']}</h3>
+                                <p class="member-role-gold">{miembro['rol']}</p>
+                                <div class="gold-particles">
+                                    <div class="particle"></div>
+                                    <div class="particle"></div>
+                                    <div class="particle"></div>
+                                    <div class="particle"></div>
                                 </div>
-                                <div class="member-content-large">
-                                    <h3 class="member-name-large">{miembro['nombre']}</h3>
-                                    <p class="member-role-large">{miembro['rol']}</p>
+                            </div>
+                        </div>
+                        """, 
+                        unsafe_allow_html=True
+                    )
+                elif miembro["destacado"] and miembro["tipo"] == "emerald":
+                    
+                    st.markdown(
+                        f"""
+                        <div class="member-card-emerald">
+                            <div class="emerald-lava-animation">
+                                <div class="emerald-bubble bubble-1"></div>
+                                <div class="emerald-bubble bubble-2"></div>
+                                <div class="emerald-bubble bubble-3"></div>
+                                <div class="emerald-bubble bubble-4"></div>
+                                <div class="emerald-sparkle sparkle-1">💚</div>
+                                <div class="emerald-sparkle sparkle-2">📖</div>
+                                <div class="emerald-sparkle sparkle-3">✨</div>
+                            </div>
+                            <div class="member-avatar-emerald">
+                                <img src="{img_src}" alt="{miembro['nombre']}">
+                                <div class="latex-symbol">𝜤</div>
+                            </div>
+                            <div class="member-content-emerald">
+                                <div class="emerald-badge">{miembro['badge']}</div>
+                                <h3 class="member-name-emerald">{miembro['nombre']}</h3>
+                                <p class="member-role-emerald">{miembro['rol']}</p>
+                                <div class="emerald-particles">
+                                    <div class="particle"></div>
+                                    <div class="particle"></div>
+                                    <div class="particle"></div>
+                                    <div class="particle"></div>
                                 </div>
                             </div>
-                            """, 
-                            unsafe_allow_html=True
-                        )
+                        </div>
+                        """, 
+                        unsafe_allow_html=True
+                    )
+                else:
+                    
+                    st.markdown(
+                        f"""
+                        <div class="member-card-large">
+                            <div class="member-avatar-large">
+                                <img src="{img_src}" alt="{miembro['nombre']}">
+                            </div>
+                            <div class="member-content-large">
+                                <h3 class="member-name-large">{miembro['nombre']}</h3>
+                                <p class="member-role-large">{miembro['rol']}</p>
+                            </div>
+                        </div>
+                        """, 
+                        unsafe_allow_html=True
+                    )
 
    
     st.markdown('<div class="section-title">🔍 ¿Qué podrás explorar?</div>', unsafe_allow_html=True)
@@ -210,7 +180,7 @@ def show():
 
     with col_exp_img:
         st.image("https://upload.wikimedia.org/wikipedia/commons/thumb/3/3d/SIR_Model.svg/1200px-SIR_Model.svg.png", 
-                 use_container_width=True)
+                 width="stretch")
 
    
     st.markdown('<div class="section-title">📚 Modelos en Acción</div>', unsafe_allow_html=True)
@@ -243,4 +213,6 @@ def show():
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
+    from utils.tema import aplicar_tema
+    aplicar_tema()
     show()
\ No newline at end of file
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from models.sir_calibracion import calibrate, read_counts, synthetic_counts
+
+
+# ---------- LECTURA DEL CSV ----------
+def test_read_counts_coma_y_columna_de_dias():
+    dias, casos = read_counts(b"dia,casos\n3,10\n4,12\n5,15\n")
+    assert dias.tolist() == [0, 1, 2]
+    assert casos.tolist() == [10, 12, 15]
+
+
+def test_read_counts_punto_y_coma_y_filas_desordenadas():
+    dias, casos = read_counts(b"day;cases\n2;7\n0;5\n1;6\n")
+    assert dias.tolist() == [0, 1, 2]
+    assert casos.tolist() == [5, 6, 7]
+
+
+def test_read_counts_sin_columna_de_dias():
+    dias, casos = read_counts("﻿fecha,I\n2024-01-01,3\n2024-01-02,4\n".encode())
+    assert dias.tolist() == [0, 1]
+    assert casos.tolist() == [3, 4]
+
+
+def test_read_counts_salta_filas_sin_casos():
+    dias, casos = read_counts(b"dia,casos\n0,1\n1,NA\n2,\n3,nan\n4,-\n5,8\n")
+    assert dias.tolist() == [0, 5]
+    assert casos.tolist() == [1, 8]
+
+
+@pytest.mark.parametrize("contenido, mensaje", [
+    (b"dia,casos\n0,1\n0,2\n", "repetidos"),
+    (b"dia,casos\n0,1\n1.5,2\n", "enteros"),
+    (b"dia,casos\n0,1\n1,muchos\n", "no es un número"),
+    (b"dia,casos\n", "no tiene filas"),
+    (b"dia,casos\n0,NA\n", "no tiene casos"),
+])
+def test_read_counts_errores(contenido, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        read_counts(contenido)
+
+
+# ---------- AJUSTE ----------
+def test_calibrate_recupera_los_parametros_con_I0_ajustado():
+    dias, casos = synthetic_counts("sir", 7138, 5, 100, beta=5e-5, k=0.1)
+    ajuste = calibrate("sir", dias, casos, 7138, n_inicios=8)
+    for nombre, verdadero in (("beta", 5e-5), ("k", 0.1), ("I0", 5)):
+        estimado, error = ajuste["parametros"][nombre], ajuste["error_estandar"][nombre]
+        assert abs(estimado - verdadero) < 4 * error, nombre
+        assert error < 0.1 * verdadero, nombre
+
+
+def test_calibrate_incidencia():
+    dias, casos = synthetic_counts("sir", 7138, 5, 100, observable="incidencia", beta=1.4e-4, k=0.4)
+    ajuste = calibrate("sir", dias, casos, 7138, I0=5, observable="incidencia", n_inicios=8)
+    assert ajuste["parametros"]["beta"] == pytest.approx(1.4e-4, rel=0.05)
+    assert ajuste["parametros"]["k"] == pytest.approx(0.4, rel=0.1)
+    assert "I0" not in ajuste["parametros"]
+    assert np.isnan(ajuste["ajuste"][0]) and len(ajuste["ajuste"]) == 101
+
+
+def test_calibrate_exige_todos_los_parametros():
+    dias, casos = synthetic_counts("sir", 7138, 5, 30, beta=1.4e-4, k=0.4)
+    with pytest.raises(ValueError, match="faltan"):
+        calibrate("sir", dias, casos, 7138, ajustar=("beta",))
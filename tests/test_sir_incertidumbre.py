@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from models.sir_incertidumbre import CLASES, Histogramas, propagate_uncertainty, sample_priors
+from models.sir_registro import solve_model_batch
+
+PRIORS = {"beta": (1.12e-4, 1.68e-4), "gamma": (0.32, 0.48)}
+
+
+# ---------- MUESTREO ----------
+@pytest.mark.parametrize("metodo", ["lhs", "sobol"])
+def test_sample_priors_en_rango(metodo):
+    muestras = sample_priors({**PRIORS, "alpha": (0.01, 0.1, "log")}, 256, metodo, seed=1)
+    for nombre, (bajo, alto, *_) in {**PRIORS, "alpha": (0.01, 0.1)}.items():
+        assert muestras[nombre].shape == (256,)
+        assert np.all((muestras[nombre] >= bajo) & (muestras[nombre] <= alto))
+
+
+def test_sample_priors_hipercubo_latino_estratificado():
+    n = 100
+    muestras = sample_priors(PRIORS, n, "lhs", seed=0)
+    for nombre, (bajo, alto) in PRIORS.items():
+        estratos = np.floor((muestras[nombre] - bajo) / (alto - bajo) * n).astype(int)
+        assert sorted(estratos.tolist()) == list(range(n))
+
+
+def test_sample_priors_metodo_desconocido():
+    with pytest.raises(ValueError, match="metodo"):
+        sample_priors(PRIORS, 10, "montecarlo")
+
+
+# ---------- HISTOGRAMAS ----------
+def test_cuantiles_contra_np_quantile():
+    azar = np.random.default_rng(0)
+    valores = azar.gamma(3.0, 2.0, size=(20_000, 4))
+    histograma = Histogramas(0, 60, (4,))
+    for lote in np.array_split(valores, 7):
+        histograma.agregar(lote)
+    qs = (0.05, 0.5, 0.95)
+    ancho = 60 / CLASES
+    assert np.abs(histograma.cuantiles(qs) - np.quantile(valores, qs, axis=0)).max() < ancho
+
+
+def test_distribucion_cubre_todas_las_muestras():
+    histograma = Histogramas(0, 1)
+    histograma.agregar(np.random.default_rng(0).uniform(0.5, 0.6, 1000))
+    conteos, bordes = histograma.distribucion(clases=40)
+    assert conteos.sum() == 1000
+    assert len(bordes) == len(conteos) + 1
+    # Sólo el rango ocupado, en clases de ancho fijo
+    assert bordes[0] == pytest.approx(0.5)
+    assert 0.6 <= bordes[-1] < 0.6 + (bordes[1] - bordes[0])
+
+
+# ---------- PROPAGACIÓN ----------
+def test_propagate_uncertainty_no_depende_del_lote():
+    # El lote sólo cambia el paso del integrador (el error se mide sobre todo el lote)
+    N = 7138
+    argumentos = ("sir_extended", N, 10, 0, PRIORS, 40)
+    opciones = {"fijos": {"alpha": 0.05}, "n_muestras": 600, "n_t": 41}
+    grande = propagate_uncertainty(*argumentos, chunk=600, **opciones)
+    chico = propagate_uncertainty(*argumentos, chunk=100, **opciones)
+    np.testing.assert_allclose(grande["mediana"], chico["mediana"], atol=N / CLASES)
+    for q, valor in grande["tamano_final"]["cuantiles"].items():
+        assert chico["tamano_final"]["cuantiles"][q] == pytest.approx(valor, abs=N / CLASES)
+
+
+def test_propagate_uncertainty_contra_el_ensamble_completo():
+    N, n = 7138, 4000
+    r = propagate_uncertainty("sir_extended", N, 10, 0, PRIORS, 40, fijos={"alpha": 0.05}, n_muestras=n, n_t=81)
+    muestras = sample_priors(PRIORS, n, "lhs", seed=0)
+    Y, t = solve_model_batch("sir_extended", (N - 10, 10, 0), 40, 81, 1e-3, 1e-6, alpha=0.05, **muestras)
+    exacto = np.quantile(Y, (0.05, 0.5, 0.95), axis=0)
+    error = np.abs(np.stack([r["inferior"], r["mediana"], r["superior"]]) - exacto)
+    # A lo sumo una clase, más el hueco entre muestras vecinas en las colas
+    assert np.quantile(error, 0.95) < N / CLASES
+    assert error.max() < 4 * N / CLASES
+    pico = np.quantile(t[np.argmax(Y[:, 1], axis=1)], 0.5)
+    assert r["dia_pico"]["cuantiles"][0.5] == pytest.approx(pico, abs=0.5)
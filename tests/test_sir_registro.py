@@ -0,0 +1,20 @@
+import pytest
+
+from models.sir_registro import choose_method
+
+
+# ---------- ELECCIÓN DEL MÉTODO ----------
+@pytest.mark.parametrize("N, duracion, parametros, metodo", [
+    # Valores por defecto de la asignación 3: RK45 da menos pasos
+    (7138, 365, {"beta": 1.4e-4, "gamma": 0.4, "alpha": 0.05}, "RK45"),
+    # Cola rígida: γ = 1 durante un año
+    (1000, 365, {"beta": 1e-5, "gamma": 1.0, "alpha": 0.0}, "LSODA"),
+    # Brote rígido: β·N = 20
+    (20000, 40, {"beta": 1e-3, "gamma": 0.1, "alpha": 0.0}, "LSODA"),
+    # Brote rígido en un año: LSODA da más pasos (189 contra 105) pero evalúa la mitad
+    (20000, 365, {"beta": 1e-3, "gamma": 0.1, "alpha": 0.2}, "LSODA"),
+    # Largo y sin rigidez: ni la cola (2·γ·t = 73) ni el brote pasan su umbral
+    (1000, 365, {"beta": 1e-4, "gamma": 0.1, "alpha": 0.0}, "RK45"),
+])
+def test_choose_method(N, duracion, parametros, metodo):
+    assert choose_method("sir_extended", N, duracion, **parametros) == metodo
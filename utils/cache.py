@@ -0,0 +1,407 @@
+"""Caché de resultados compartida por todas las sesiones del proceso.
+
+Streamlit importa este módulo una sola vez por proceso, así que la instancia
+`cache` es común a todas las sesiones. Las claves se arman con los
+argumentos cuantizados (floats a CIFRAS cifras significativas, arreglos por
+el hash de su contenido), la memoria se limita por número de entradas y por
+bytes con política LRU, y opcionalmente cada entrada se guarda en disco para
+que un worker reiniciado arranque con la caché caliente.
+
+Variables de entorno:
+    SIR_CACHE_MB      tope en memoria (MB, por defecto 64)
+    SIR_CACHE_DIR     directorio para persistir en disco (sin definir = sólo memoria)
+    SIR_CACHE_DISK_MB tope en disco (MB, por defecto 256)
+"""
+import functools
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.trazas import medido, tramo
+
+CIFRAS = 8
+
+
+def _cuantizar(valor):
+    if isinstance(valor, (bool, int, np.integer)):
+        return int(valor)
+    if isinstance(valor, (float, np.floating)):
+        return float(f"{float(valor):.{CIFRAS}g}")
+    if isinstance(valor, np.ndarray):
+        contenido = hashlib.blake2b(np.ascontiguousarray(valor).tobytes(), digest_size=16).hexdigest()
+        return ("ndarray", valor.shape, str(valor.dtype), contenido)
+    # Si scipy.sparse no está importado el valor no puede ser dispersa
+    sparse = sys.modules.get("scipy.sparse")
+    if sparse is not None and sparse.issparse(valor):
+        csr = sparse.csr_matrix(valor)
+        return ("sparse", csr.shape, _cuantizar(csr.data), _cuantizar(csr.indices), _cuantizar(csr.indptr))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_cuantizar(v) for v in valor)
+    if isinstance(valor, dict):
+        return tuple(sorted((k, _cuantizar(v)) for k, v in valor.items()))
+    return valor
+
+
+def _tamano(valor):
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (bytes, bytearray)):
+        return len(valor)
+    if isinstance(valor, (list, tuple)):
+        return sum(_tamano(v) for v in valor)
+    if isinstance(valor, dict):
+        return sum(_tamano(v) for v in valor.values())
+    return sys.getsizeof(valor)
+
+
+def _solo_lectura(valor):
+    """Marca los arreglos como no escribibles: la misma entrada la ven todas las sesiones."""
+    if isinstance(valor, np.ndarray):
+        valor.flags.writeable = False
+    elif isinstance(valor, (list, tuple)):
+        for v in valor:
+            _solo_lectura(v)
+    elif isinstance(valor, dict):
+        for v in valor.values():
+            _solo_lectura(v)
+    return valor
+
+
+class ResultCache:
+    def __init__(self, max_bytes=64 * 2**20, max_entradas=1024, directorio=None, max_bytes_disco=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.max_entradas = max_entradas
+        self.directorio = directorio
+        self.max_bytes_disco = max_bytes_disco
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.hits_disco = 0
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+    @staticmethod
+    def clave(nombre, args, kwargs):
+        partes = (nombre, _cuantizar(args), _cuantizar(kwargs))
+        return hashlib.sha256(pickle.dumps(partes)).hexdigest()
+
+    def get(self, clave):
+        """Devuelve (encontrado, valor)."""
+        with self._lock:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.hits += 1
+                return True, self._entradas[clave][0]
+        valor = self._leer_disco(clave)
+        with self._lock:
+            if valor is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self.hits_disco += 1
+        self._guardar_memoria(clave, valor)
+        return True, valor
+
+    def put(self, clave, valor):
+        _solo_lectura(valor)
+        self._guardar_memoria(clave, valor)
+        self._escribir_disco(clave, valor)
+
+    def _guardar_memoria(self, clave, valor):
+        tamano = _tamano(valor)
+        if tamano > self.max_bytes:
+            return
+        with self._lock:
+            if clave in self._entradas:
+                self._bytes -= self._entradas.pop(clave)[1]
+            self._entradas[clave] = (valor, tamano)
+            self._bytes += tamano
+            while self._bytes > self.max_bytes or len(self._entradas) > self.max_entradas:
+                _, (_, liberado) = self._entradas.popitem(last=False)
+                self._bytes -= liberado
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}.pkl")
+
+    def _leer_disco(self, clave):
+        if not self.directorio:
+            return None
+        try:
+            with open(self._ruta(clave), "rb") as f:
+                valor = pickle.load(f)
+            os.utime(self._ruta(clave))
+            return _solo_lectura(valor)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _escribir_disco(self, clave, valor):
+        if not self.directorio:
+            return
+        temporal = f"{self._ruta(clave)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporal, "wb") as f:
+                pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, self._ruta(clave))
+            self._podar_disco()
+        except OSError:
+            pass
+
+    def _podar_disco(self):
+        archivos = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(".pkl"):
+                ruta = os.path.join(self.directorio, nombre)
+                try:
+                    info = os.stat(ruta)
+                except OSError:
+                    continue
+                archivos.append((info.st_mtime, info.st_size, ruta))
+        total = sum(a[1] for a in archivos)
+        for _, tamano, ruta in sorted(archivos):
+            if total <= self.max_bytes_disco:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+            total -= tamano
+
+    def stats(self):
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hits_disco": self.hits_disco,
+                "tasa_aciertos": self.hits / consultas if consultas else 0.0,
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.hits_disco = 0
+
+
+cache = ResultCache(
+    max_bytes=int(float(os.environ.get("SIR_CACHE_MB", 64)) * 2**20),
+    directorio=os.environ.get("SIR_CACHE_DIR") or None,
+    max_bytes_disco=int(float(os.environ.get("SIR_CACHE_DISK_MB", 256)) * 2**20),
+)
+
+
+def cached(nombre, almacen=None):
+    """Decorador: memoriza `fn` en `almacen` (por defecto la caché global)."""
+    def decorador(fn):
+        @functools.wraps(fn)
+        def envoltura(*args, **kwargs):
+            destino = almacen or cache
+            # Con las trazas activas, el tramo incluye armar la clave (hashear los arreglos) y buscarla
+            with tramo(f"cache/{nombre}"):
+                clave = destino.clave(nombre, args, kwargs)
+                encontrado, valor = destino.get(clave)
+                if not encontrado:
+                    valor = fn(*args, **kwargs)
+                    destino.put(clave, valor)
+            return valor
+        return envoltura
+    return decorador
+
+
+# ---------- SOLVERS Y GRÁFICOS CON CACHÉ ----------
+# Cada página importa este módulo, así que los modelos y el graficador se
+# importan dentro de cada envoltura y no arriba: abrir una página sólo carga
+# lo que ella usa (scipy.stats, las redes, la calibración, matplotlib...).
+# Los solvers se miden aquí, donde las páginas los llaman (utils/trazas.py).
+@medido("solve_sir")
+def _solve_sir(*args, **kwargs):
+    from models.sir_model import solve_sir
+    return solve_sir(*args, **kwargs)
+
+
+@medido("solve_sir_extended")
+def _solve_sir_extended(*args, **kwargs):
+    from models.sir_model import solve_sir_extended
+    return solve_sir_extended(*args, **kwargs)
+
+
+@medido("solve_sir_patches")
+def _solve_sir_patches(*args, **kwargs):
+    from models.sir_metapoblacion import solve_sir_patches
+    return solve_sir_patches(*args, **kwargs)
+
+
+@medido("calibrate")
+def _calibrate(*args, **kwargs):
+    from models.sir_calibracion import calibrate
+    return calibrate(*args, **kwargs)
+
+
+@medido("propagate_uncertainty")
+def _propagate_uncertainty(*args, **kwargs):
+    from models.sir_incertidumbre import propagate_uncertainty
+    return propagate_uncertainty(*args, **kwargs)
+
+
+cached_solve_sir = cached("solve_sir")(_solve_sir)
+cached_solve_sir_extended = cached("solve_sir_extended")(_solve_sir_extended)
+cached_solve_sir_patches = cached("solve_sir_patches")(_solve_sir_patches)
+cached_calibrate = cached("calibracion")(_calibrate)
+cached_propagate_uncertainty = cached("incertidumbre")(_propagate_uncertainty)
+
+
+@cached("bandas_sir_extended")
+def cached_bandas_sir_extended(N, I0, R0, beta, gamma, alpha, t_max, n_rep=1000, seed=0):
+    """Bandas 5–95 % y resumen de réplicas por tau-leaping; sólo se guardan éstos, no las réplicas."""
+    from models.sir_estocastico import quantile_bands, simulate_sir_extended, stochastic_summary
+    Y, t, info = simulate_sir_extended(N, I0, R0, beta, gamma, alpha, t_max, n_rep=n_rep,
+                                       n_t=int(t_max) * 5 + 1, seed=seed, full_output=True)
+    return quantile_bands(Y, t), stochastic_summary(Y, info["contagios"], N)
+
+
+@cached("rumor_red")
+def cached_rumor_network(red, I0, R0, b, ks, t_max, n_rep=100, seed=0):
+    """Promedio de `n_rep` réplicas del rumor sobre la red `red` ("aula" o "mundo_pequeno") para cada k.
+
+    La red es la del aula de la asignación 2 (275 personas) y b y k se
+    escalan por (N - 1)/grado medio, para que cada persona reciba la misma
+    presión que en la EDO de mezcla homogénea. Devuelve (Y, t) con Y de
+    forma (len(ks), 3, n_t), lista para plot_sir_comparison.
+    """
+    from models.sir_red import classroom_graph, mean_degree, simulate_rumor_network, small_world_graph
+    if red == "aula":
+        A, racionales = classroom_graph(seed=seed), range(8)
+    else:
+        A, racionales = small_world_graph(275, seed=seed), None
+    escala = (A.shape[0] - 1) / mean_degree(A)
+    medias = []
+    for k in ks:
+        Y, t = simulate_rumor_network(A, I0, R0, b * escala, k * escala, t_max, n_rep=n_rep,
+                                      racionales=racionales, seed=seed)
+        medias.append(Y.mean(axis=0))
+    return np.stack(medias), t
+
+
+def _serializar(grafico, renderer):
+    """PNG para matplotlib, JSON de Vega-Lite para renderer="vega"."""
+    from utils.plotter import figure_to_png
+    return grafico.to_json() if renderer == "vega" else figure_to_png(grafico)
+
+
+@cached("plot_sir")
+def cached_plot_sir(S, I, R, t, title="Dinámica SIR", clave=None, renderer="matplotlib"):
+    """PNG (o JSON de Vega-Lite) de plot_sir; las figuras no se comparten, sólo sus bytes."""
+    from utils.plotter import plot_sir
+    return _serializar(plot_sir(S, I, R, t, title=title, clave=clave, renderer=renderer), renderer)
+
+
+@cached("plot_sir_profesional")
+def cached_plot_sir_profesional(S, I, R, t, title="Dinámica SIR Extendida", clave=None, renderer="matplotlib",
+                                bandas=None, etiqueta_bandas="Variabilidad estocástica"):
+    from utils.plotter import plot_sir_profesional
+    return _serializar(plot_sir_profesional(S, I, R, t, title=title, clave=clave, renderer=renderer, bandas=bandas,
+                                            etiqueta_bandas=etiqueta_bandas), renderer)
+
+
+@cached("plot_rumor_comparison")
+def cached_plot_sir_comparison(N, I0, R0, b, escenarios, t_max, clave=None, renderer="matplotlib",
+                               trayectorias=None):
+    from utils.plotter import plot_sir_comparison
+    grafico, data = plot_sir_comparison(N, I0, R0, b, escenarios, t_max, clave=clave, renderer=renderer,
+                                        trayectorias=trayectorias)
+    return _serializar(grafico, renderer), data
+
+
+@cached("plot_patches")
+def cached_plot_patches(t, totales, curvas, nombres, title="Brote por facultades", clave=None, renderer="matplotlib"):
+    from utils.plotter import plot_patches
+    return _serializar(plot_patches(t, totales, curvas, nombres, title=title, clave=clave, renderer=renderer),
+                       renderer)
+
+
+@cached("plot_calibration")
+def cached_plot_calibration(dias, casos, t, ajuste, title="Ajuste a los casos observados", etiqueta="Casos",
+                            clave=None, renderer="matplotlib"):
+    from utils.plotter import plot_calibration
+    return _serializar(plot_calibration(dias, casos, t, ajuste, title=title, etiqueta=etiqueta, clave=clave,
+                                        renderer=renderer), renderer)
+
+
+# ---------- HORIZONTE INCREMENTAL ----------
+# Por cada combinación de parámetros se guarda la trayectoria más larga
+# calculada, en una malla fija de PUNTOS_POR_DIA puntos por día. Pedir menos
+# días la recorta; pedir más continúa desde su checkpoint, así que mover el
+# deslizador de días sólo integra los días agregados.
+PUNTOS_POR_DIA = 25
+
+
+def _puntos(t0, t_max):
+    return int(round((t_max - t0) * PUNTOS_POR_DIA)) + 1
+
+
+def _recortar(resultado, t_max):
+    S, I, R, t, info = resultado
+    fin = np.searchsorted(t, t_max + 0.5 / PUNTOS_POR_DIA)
+    pico, t_umbral = info["eventos"]["pico"], info["eventos"]["umbral"]
+    eventos = {
+        "pico": pico if pico is not None and pico[0] <= t_max else None,
+        "umbral": t_umbral if t_umbral is not None and t_umbral <= t_max else None,
+    }
+    return S[:fin], I[:fin], R[:fin], t[:fin], {"eventos": eventos, "t_fin": min(info["t_fin"], t_max),
+                                                "estadisticas": info.get("estadisticas")}
+
+
+def _horizonte(nombre, solver, args, t_max, opciones):
+    clave = cache.clave(f"{nombre}/horizonte", args, opciones)
+    encontrado, previo = cache.get(clave)
+    if not encontrado:
+        resultado = solver(*args, t_max, n_t=_puntos(0, t_max), full_output=True, **opciones)
+        cache.put(clave, resultado)
+        return _recortar(resultado, t_max)
+    checkpoint = previo[4]["checkpoint"]
+    if t_max <= checkpoint["t"]:
+        return _recortar(previo, t_max)
+    S, I, R, t, info = solver(*args, t_max, n_t=_puntos(checkpoint["t"], t_max), full_output=True,
+                              checkpoint=checkpoint, **opciones)
+    resultado = (*(np.concatenate([a, b[1:]]) for a, b in zip(previo[:4], (S, I, R, t))), info)
+    cache.put(clave, resultado)
+    return _recortar(resultado, t_max)
+
+
+def incremental_solve_sir(N, I0, R0, beta, k, t_max, **opciones):
+    """Como solve_sir(..., full_output=True), pero reutiliza horizontes ya calculados."""
+    return _horizonte("solve_sir", _solve_sir, (N, I0, R0, beta, k), t_max, opciones)
+
+
+def incremental_solve_sir_extended(N, I0, R0, beta, gamma, alpha, t_max, **opciones):
+    """Como solve_sir_extended(..., full_output=True), pero reutiliza horizontes ya calculados."""
+    return _horizonte("solve_sir_extended", _solve_sir_extended, (N, I0, R0, beta, gamma, alpha), t_max,
+                      opciones)
+
+
+# ---------- BARRIDOS ----------
+def cached_sweep(nombre, barrido, *args, **kwargs):
+    """Itera `barrido(*args, **kwargs)` y guarda los mapas completos al terminar.
+
+    Si ya estaban en la caché los entrega de una sola vez. Un barrido
+    abandonado a la mitad no se guarda.
+    """
+    clave = cache.clave(nombre, args, kwargs)
+    encontrado, mapas = cache.get(clave)
+    if encontrado:
+        total = next(iter(mapas.values())).size
+        yield total, total, mapas
+        return
+    for completados, total, mapas in barrido(*args, **kwargs):
+        yield completados, total, mapas
+    cache.put(clave, {nombre_mapa: mapa.copy() for nombre_mapa, mapa in mapas.items()})
@@ -0,0 +1,146 @@
+"""Recálculo en segundo plano para las páginas con muchos deslizadores.
+
+Cada página aísla sus parámetros, la simulación y el gráfico en un
+`st.fragment`, así que mover un deslizador sólo vuelve a ejecutar esa parte
+y no el CSS, el LaTeX ni las tarjetas fijas. El cálculo pesado (solver y
+gráfico) va a un pool de hilos común a todas las sesiones:
+
+- Debounce: un trabajo que reemplaza a otro espera DEBOUNCE_MS antes de
+  empezar; si en ese lapso llegan parámetros nuevos se descarta sin costo.
+- Cancelación: un trabajo nuevo cancela el anterior de la misma sesión y
+  página. Si el anterior ya estaba corriendo se detiene en su siguiente
+  `trabajo.verificar()` y su resultado se descarta. Los trabajos de una
+  misma página nunca corren a la vez (comparten la figura del pool).
+- Mientras tanto la página sigue mostrando el último resultado completo.
+
+Variables de entorno:
+    SIR_WORKERS      hilos del pool (por defecto 4)
+    SIR_DEBOUNCE_MS  espera antes de empezar un trabajo que reemplaza a otro (por defecto 150)
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from utils.plotter import _sesiones_activas
+from utils.trazas import tramo
+
+DEBOUNCE_MS = float(os.environ.get("SIR_DEBOUNCE_MS", 150))
+SONDEO_S = 0.03
+_pool = ThreadPoolExecutor(max_workers=int(os.environ.get("SIR_WORKERS", 4)), thread_name_prefix="sir-fondo")
+_trabajos = {}
+_lock = threading.Lock()
+
+
+class Cancelado(Exception):
+    """El trabajo fue reemplazado por otro con parámetros más nuevos."""
+
+
+class Trabajo:
+    def __init__(self, parametros, pendientes):
+        self.parametros = parametros
+        self.pendientes = pendientes
+        self.future = None
+        self._cancelado = threading.Event()
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    def cancelar(self):
+        self._cancelado.set()
+        self.future.cancel()
+
+    def verificar(self):
+        """Punto de cancelación: llamarlo entre las etapas del cálculo."""
+        if self._cancelado.is_set():
+            raise Cancelado
+
+
+def _contexto():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    return get_script_run_ctx(suppress_warning=True)
+
+
+def _ejecutar(trabajo, fn, retraso, ctx):
+    if trabajo._cancelado.wait(retraso):
+        raise Cancelado
+    # El anterior de la misma página termina en su próximo verificar()
+    wait(trabajo.pendientes)
+    trabajo.pendientes = []
+    trabajo.verificar()
+    hilo = threading.current_thread()
+    if ctx is not None:
+        # Los gráficos usan el pool de figuras por sesión (utils/plotter.py)
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+        add_script_run_ctx(hilo, ctx)
+    try:
+        return fn(trabajo)
+    finally:
+        if ctx is not None:
+            from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+            setattr(hilo, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+
+
+def enviar(clave, parametros, fn):
+    """Programa `fn(trabajo)` para (sesión actual, clave) y devuelve el Trabajo.
+
+    Si el trabajo vigente ya tiene los mismos parámetros se reutiliza; si no,
+    se cancela y el nuevo espera DEBOUNCE_MS antes de empezar.
+    """
+    ctx = _contexto()
+    llave = (ctx.session_id if ctx else None, clave)
+    with _lock:
+        actual = _trabajos.get(llave)
+        if actual is not None and actual.parametros == parametros and not actual.cancelado:
+            return actual
+        pendientes = []
+        if actual is not None:
+            actual.cancelar()
+            pendientes = [f for f in actual.pendientes + [actual.future] if not f.done()]
+        trabajo = Trabajo(parametros, pendientes)
+        retraso = 0.0 if actual is None else DEBOUNCE_MS / 1000
+        trabajo.future = _pool.submit(_ejecutar, trabajo, fn, retraso, ctx)
+        _trabajos[llave] = trabajo
+        activas = _sesiones_activas({sesion for sesion, _ in _trabajos})
+        for vieja in [ll for ll in _trabajos if ll[0] not in activas]:
+            del _trabajos[vieja]
+    return trabajo
+
+
+def recalcular(clave, parametros, fn, mostrar):
+    """Calcula `fn(trabajo)` en el pool y lo dibuja con `mostrar(resultado)`.
+
+    Pensado para llamarse dentro de un `st.fragment`. Mientras el trabajo no
+    termina se muestra el último resultado completo de la sesión; la espera
+    se puede interrumpir, así que un deslizador que se sigue moviendo corta
+    este rerun y el siguiente cancela el trabajo viejo.
+    """
+    import streamlit as st
+
+    llave = f"_fondo/{clave}"
+    lugar = st.empty()
+    trabajo = enviar(clave, parametros, fn)
+    if not trabajo.future.done():
+        previo = st.session_state.get(llave)
+        with lugar.container():
+            if previo is None:
+                st.caption("⏳ Calculando…")
+            else:
+                st.caption("⏳ Actualizando…")
+                with tramo("mostrar"):
+                    mostrar(previo)
+        while not trabajo.future.done():
+            time.sleep(SONDEO_S)
+            # Leer session_state es un punto de interrupción de Streamlit:
+            # si hay un rerun pendiente, esta espera termina aquí.
+            st.session_state.get(llave)
+    if trabajo.cancelado:
+        return
+    resultado = trabajo.future.result()
+    st.session_state[llave] = resultado
+    with lugar.container(), tramo("mostrar"):
+        mostrar(resultado)
@@ -0,0 +1,123 @@
+"""Fotos del equipo reducidas al tamaño en que se muestran.
+
+Las tarjetas de "Inicio" muestran los avatares en círculos de 140–160 px,
+pero las fotos originales llegan a 1280 px y 244 KB. Aquí cada foto se
+recorta al centro (como `object-fit: cover`), se reduce a LADO px (el doble
+del círculo, para pantallas HiDPI) y se vuelve a codificar como JPEG
+progresivo. El resultado se guarda en memoria por el hash del contenido del
+archivo, así que se procesa una vez por proceso y una foto reemplazada en
+disco se vuelve a procesar sola.
+
+Con `server.enableStaticServing` (ver .streamlit/config.toml) la miniatura
+se escribe en static/fotos/<hash>.jpg y la página la pide como
+app/static/fotos/<hash>.jpg?v=<hash>: el `?v=` hace que el servidor la
+mande con caché de largo plazo y, como el nombre cambia con el contenido,
+nunca queda vieja. Sin servidor estático, o si static/ no se puede escribir
+(un despliegue de sólo lectura), se incrusta como data URI.
+"""
+import base64
+import hashlib
+import io
+import os
+import threading
+
+from utils.trazas import medido
+
+LADO = 320
+CALIDAD = 82
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ESTATICOS = os.path.join(RAIZ, "static", "fotos")
+
+_miniaturas = {}
+_hashes = {}
+_lock = threading.Lock()
+_estaticos_escribibles = True
+
+
+def resolver_asset(ruta):
+    """Ruta existente para `ruta` sin distinguir mayúsculas en el nombre del archivo, o None.
+
+    En Linux "assets/juancook.jpeg" no encuentra "assets/JuanCook.jpeg".
+    """
+    if os.path.exists(ruta):
+        return ruta
+    directorio, nombre = os.path.split(ruta)
+    try:
+        candidatos = os.listdir(directorio or ".")
+    except OSError:
+        return None
+    for candidato in candidatos:
+        if candidato.lower() == nombre.lower():
+            return os.path.join(directorio, candidato)
+    return None
+
+
+def _hash(ruta):
+    """Hash del contenido; se recalcula sólo si cambian el tamaño o la fecha del archivo."""
+    estado = os.stat(ruta)
+    llave = (ruta, estado.st_size, estado.st_mtime_ns)
+    if llave not in _hashes:
+        with open(ruta, "rb") as f:
+            _hashes[llave] = hashlib.blake2b(f.read(), digest_size=12).hexdigest()
+    return _hashes[llave]
+
+
+def _reducir(ruta, lado):
+    from PIL import Image, ImageOps
+
+    with Image.open(ruta) as imagen:
+        imagen = ImageOps.exif_transpose(imagen).convert("RGB")
+        imagen = ImageOps.fit(imagen, (lado, lado), method=Image.Resampling.LANCZOS)
+    salida = io.BytesIO()
+    imagen.save(salida, format="JPEG", quality=CALIDAD, optimize=True, progressive=True)
+    return salida.getvalue()
+
+
+def _servidor_estatico():
+    try:
+        import streamlit as st
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+@medido("fotos")
+def foto_miniatura(ruta, lado=LADO):
+    """`src` para un <img> con la foto recortada a lado × lado px, o None si el archivo no existe."""
+    ruta = resolver_asset(ruta)
+    if ruta is None:
+        return None
+    contenido = _hash(ruta)
+    llave = (contenido, lado)
+    with _lock:
+        if llave not in _miniaturas:
+            _miniaturas[llave] = _reducir(ruta, lado)
+        datos = _miniaturas[llave]
+    nombre = f"{contenido}-{lado}.jpg"
+    if _servidor_estatico() and _escribir_estatico(nombre, datos):
+        return f"app/static/fotos/{nombre}?v={contenido}"
+    return f"data:image/jpeg;base64,{base64.b64encode(datos).decode()}"
+
+
+def _escribir_estatico(nombre, datos):
+    """Deja la miniatura en static/fotos; False si no se puede escribir (y no se vuelve a intentar)."""
+    global _estaticos_escribibles
+    destino = os.path.join(ESTATICOS, nombre)
+    if os.path.exists(destino):
+        return True
+    if not _estaticos_escribibles:
+        return False
+    temporal = f"{destino}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(ESTATICOS, exist_ok=True)
+        with open(temporal, "wb") as f:
+            f.write(datos)
+        os.replace(temporal, destino)
+    except OSError:
+        _estaticos_escribibles = False
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        return False
+    return True
@@ -1,36 +1,303 @@
-import matplotlib.pyplot as plt
+import io
+import threading
+from collections import OrderedDict
+
 import numpy as np
+from matplotlib import colormaps
+from matplotlib.colors import to_hex
+from matplotlib.figure import Figure
+
+from utils.trazas import medido
+
+ESTILO = "seaborn-v0_8-pastel"
+_estilo_listo = False
+_estilo_lock = threading.Lock()
+
+
+def _figura(**kwargs):
+    """Figure con el estilo del proyecto; el estilo se aplica al crear la primera y no al importar."""
+    global _estilo_listo
+    if not _estilo_listo:
+        with _estilo_lock:
+            if not _estilo_listo:
+                import matplotlib.style
+                matplotlib.style.use(ESTILO)
+                _estilo_listo = True
+    return Figure(**kwargs)
+
+# ---------- POOL DE FIGURAS ----------
+# Las figuras se crean con matplotlib.figure.Figure y no con pyplot, así que no
+# quedan registradas en el estado global de pyplot y el recolector las libera.
+# Si se pasa `clave`, la figura y sus artistas se guardan por (sesión, clave)
+# y en cada rerun sólo se actualizan sus datos. Las entradas de sesiones que
+# ya terminaron se liberan en cada acceso y el total está acotado (LRU).
+MAX_FIGURAS = 64
+_pool = OrderedDict()
+_pool_lock = threading.Lock()
+
+
+def _sesion_actual():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+def _sesiones_activas(sesiones):
+    try:
+        from streamlit.runtime import Runtime
+        runtime = Runtime.instance()
+    except (ImportError, RuntimeError):
+        return set(sesiones)
+    return {s for s in sesiones if s is None or runtime.is_active_session(s)}
+
+
+def _pool_get(clave, tipo):
+    if clave is None:
+        return None
+    with _pool_lock:
+        llave = (_sesion_actual(), clave, tipo)
+        entrada = _pool.get(llave)
+        if entrada is not None:
+            _pool.move_to_end(llave)
+        return entrada
+
+
+def _pool_put(clave, tipo, fig, artistas):
+    if clave is None:
+        return
+    with _pool_lock:
+        _pool[(_sesion_actual(), clave, tipo)] = (fig, artistas)
+        activas = _sesiones_activas({llave[0] for llave in _pool})
+        for llave in [llave for llave in _pool if llave[0] not in activas]:
+            del _pool[llave]
+        while len(_pool) > MAX_FIGURAS:
+            _pool.popitem(last=False)
+
+
+def liberar_sesion(sesion):
+    """Suelta todas las figuras de una sesión."""
+    with _pool_lock:
+        for llave in [llave for llave in _pool if llave[0] == sesion]:
+            del _pool[llave]
+
+
+def figuras_en_pool():
+    with _pool_lock:
+        return len(_pool)
+
+
+# ---------- RENDERIZADO VECTORIAL (VEGA-LITE) ----------
+# Con renderer="vega" las funciones de abajo devuelven un alt.Chart en lugar
+# de una figura: el navegador dibuja el gráfico y el servidor no rasteriza.
+# Las curvas se reducen con LTTB a un punto cada PIXELES_POR_PUNTO píxeles
+# del ancho de pantalla, así que el JSON pesa unos pocos KB en lugar de un PNG.
+ANCHO_VEGA = 700
+PIXELES_POR_PUNTO = 5
+
+
+def lttb(x, y, n_salida):
+    """Largest-Triangle-Three-Buckets: índices de `n_salida` puntos que preservan la forma."""
+    n = len(x)
+    if n_salida >= n or n_salida < 3:
+        return np.arange(n)
+    indices = np.empty(n_salida, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    bordes = np.linspace(1, n - 1, n_salida - 1).astype(int)
+    anterior = 0
+    for j in range(n_salida - 2):
+        ini, fin = bordes[j], bordes[j + 1]
+        sig_ini, sig_fin = bordes[j + 1], bordes[j + 2] if j + 2 < len(bordes) else n
+        # Vértice del triángulo: promedio del siguiente cubo
+        cx, cy = x[sig_ini:sig_fin].mean(), y[sig_ini:sig_fin].mean()
+        ax, ay = x[anterior], y[anterior]
+        areas = np.abs((ax - cx) * (y[ini:fin] - ay) - (ax - x[ini:fin]) * (cy - ay))
+        anterior = ini + int(np.argmax(areas))
+        indices[j + 1] = anterior
+    return indices
+
+
+def _capas_vega(t, series, colores, ancho, areas=False, guiones=None, **propiedades):
+    """Curvas reducidas por LTTB en filas compactas {t, v, s}, con `s` el índice de la serie.
+
+    Los nombres de las series van una sola vez en la leyenda (labelExpr) y no
+    repetidos en cada fila; con `areas=True` el relleno comparte los mismos datos.
+    """
+    import altair as alt
+
+    n_salida = max(ancho // PIXELES_POR_PUNTO, 3)
+    nombres = [nombre for nombre, _ in series]
+    filas = []
+    for s, (_, y) in enumerate(series):
+        y = np.asarray(y)
+        idx = lttb(t, y, n_salida)
+        filas.extend({"t": round(float(a), 2), "v": round(float(b), 1), "s": s} for a, b in zip(t[idx], y[idx]))
+
+    etiquetas = "[" + ",".join(f"'{n}'" for n in nombres) + "][datum.value]"
+    codificacion = {
+        "x": alt.X("t:Q", title="Tiempo (días)", scale=alt.Scale(domain=[float(t[0]), float(t[-1])], nice=False)),
+        "y": alt.Y("v:Q", title="Personas", stack=None),
+        "color": alt.Color("s:N", title=None,
+                           scale=alt.Scale(domain=list(range(len(nombres))), range=[colores[n] for n in nombres]),
+                           legend=alt.Legend(labelExpr=etiquetas)),
+    }
+    if guiones:
+        codificacion["strokeDash"] = alt.StrokeDash(
+            "s:N", legend=None,
+            scale=alt.Scale(domain=list(range(len(nombres))), range=[guiones.get(n, [1, 0]) for n in nombres]))
+    base = alt.Chart().encode(**codificacion)
+    marcas = [base.mark_area(opacity=0.3)] if areas else []
+    marcas.append(base.mark_line(**propiedades))
+    return [alt.layer(*marcas, data=alt.Data(values=filas))]
 
-plt.style.use("seaborn-v0_8-pastel")
 
-def plot_sir(S, I, R, t, title="Dinámica SIR"):
-    fig, ax = plt.subplots(figsize=(6, 4))
-    ax.plot(t, S, label="Susceptibles", color="blue")
-    ax.plot(t, I, label="Infectados", color="red")
-    ax.plot(t, R, label="Recuperados", color="green")
+def _grafico_vega(capas, title, ancho, alto):
+    import altair as alt
+
+    return alt.layer(*capas).properties(title=title, width=ancho, height=alto)
+
+
+def _marca_pico(pico_dia, pico_val, texto, color, debajo=False):
+    import altair as alt
+
+    datos = alt.Data(values=[{"t": round(float(pico_dia), 2), "v": round(float(pico_val), 1), "texto": texto}])
+    base = alt.Chart(datos).encode(x="t:Q", y="v:Q")
+    return [base.mark_point(filled=True, size=80, color=color),
+            base.mark_text(align="left", dx=8, dy=14 if debajo else -10, fontWeight="bold", color=color)
+            .encode(text="texto:N")]
+
+
+def _bandas_vega(bandas, nombres, colores, ancho, etiqueta):
+    """Bandas de cuantiles como áreas entre "inferior" y "superior", submuestreadas al ancho.
+
+    `etiqueta` es la única entrada de su leyenda (la opacidad constante de las bandas).
+    """
+    import altair as alt
+
+    t = np.asarray(bandas["t"])
+    idx = np.unique(np.linspace(0, len(t) - 1, max(ancho // PIXELES_POR_PUNTO, 3)).astype(int))
+    filas = [{"t": round(float(t[i]), 2), "lo": round(float(bandas["inferior"][s][i]), 1),
+              "hi": round(float(bandas["superior"][s][i]), 1), "s": s, "banda": etiqueta}
+             for s in range(len(nombres)) for i in idx]
+    return [alt.Chart(alt.Data(values=filas)).mark_area().encode(
+        x="t:Q", y="lo:Q", y2="hi:Q",
+        color=alt.Color("s:N", scale=alt.Scale(domain=list(range(len(nombres))),
+                                               range=[colores[n] for n in nombres]), legend=None),
+        opacity=alt.Opacity("banda:N", scale=alt.Scale(range=[0.18]), legend=alt.Legend(title=None)))]
+
+
+@medido("png")
+def figure_to_png(fig):
+    """Serializa la figura como lo hace st.pyplot (PNG, dpi 200, bbox tight)."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=200, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+@medido("plot_sir")
+def plot_sir(S, I, R, t, title="Dinámica SIR", clave=None, renderer="matplotlib", ancho=ANCHO_VEGA):
+    if renderer == "vega":
+        series = [("Susceptibles", S), ("Infectados", I), ("Recuperados", R)]
+        colores = {"Susceptibles": "blue", "Infectados": "red", "Recuperados": "green"}
+        return _grafico_vega(_capas_vega(t, series, colores, ancho), title, ancho, ancho * 2 // 3)
+
+    entrada = _pool_get(clave, "plot_sir")
+    if entrada is not None:
+        fig, art = entrada
+        for linea, y in zip(art["lineas"], (S, I, R)):
+            linea.set_data(t, y)
+        art["ax"].set_title(title, fontsize=14, weight="bold")
+        art["ax"].relim()
+        art["ax"].autoscale_view()
+        return fig
+
+    fig = _figura(figsize=(6, 4))
+    ax = fig.subplots()
+    lineas = [
+        ax.plot(t, S, label="Susceptibles", color="blue")[0],
+        ax.plot(t, I, label="Infectados", color="red")[0],
+        ax.plot(t, R, label="Recuperados", color="green")[0],
+    ]
     ax.set_title(title, fontsize=14, weight="bold")
     ax.set_xlabel("Tiempo (días)", fontsize=12)
     ax.set_ylabel("Personas", fontsize=12)
     ax.legend()
     ax.grid(alpha=0.3)
+    _pool_put(clave, "plot_sir", fig, {"ax": ax, "lineas": lineas})
     return fig
 
 
-def plot_sir_profesional(S, I, R, t, title="Dinámica SIR Extendida"):
-    fig, ax = plt.subplots(figsize=(7, 4))
-    ax.fill_between(t, 0, S, alpha=0.3, color="#4c72b0", label="Susceptibles")
-    ax.fill_between(t, 0, I, alpha=0.3, color="#c44e52", label="Infectados")
-    ax.fill_between(t, 0, R, alpha=0.3, color="#55a868", label="Inmunes")
-    ax.plot(t, S, color="#4c72b0", linewidth=2.2)
-    ax.plot(t, I, color="#c44e52", linewidth=2.5)
-    ax.plot(t, R, color="#55a868", linewidth=2.2)
+@medido("plot_sir_profesional")
+def plot_sir_profesional(S, I, R, t, title="Dinámica SIR Extendida", clave=None, renderer="matplotlib",
+                         ancho=ANCHO_VEGA, bandas=None, etiqueta_bandas="Variabilidad estocástica"):
+    """Curvas S, I, R con áreas y el pico anotado.
 
+    `bandas` (el dict de models.sir_estocastico.quantile_bands o de
+    models.sir_incertidumbre.propagate_uncertainty) sombrea, en su propia
+    malla, el rango entre los cuantiles; `etiqueta_bandas` es su leyenda.
+    """
     pico_dia = t[np.argmax(I)]
     pico_val = max(I)
-    ax.annotate(f"Pico: {pico_val:.0f}", xy=(pico_dia, pico_val),
-                xytext=(pico_dia + 1, pico_val + 50),
-                arrowprops=dict(arrowstyle="->", color="black"),
-                fontsize=10, weight="bold", color="darkred")
+
+    if renderer == "vega":
+        series = [("Susceptibles", S), ("Infectados", I), ("Inmunes", R)]
+        colores = {"Susceptibles": "#4c72b0", "Infectados": "#c44e52", "Inmunes": "#55a868"}
+        capas = (_capas_vega(t, series, colores, ancho, areas=bandas is None, strokeWidth=2.3)
+                 + _marca_pico(pico_dia, pico_val, f"Pico: {pico_val:.0f}", "darkred"))
+        if bandas is not None:
+            capas = _bandas_vega(bandas, [nombre for nombre, _ in series], colores, ancho, etiqueta_bandas) + capas
+        return _grafico_vega(capas, title, ancho, ancho * 4 // 7)
+
+    # La etiqueta no entra en la clave del pool: cambia con el deslizador y cada valor dejaría su figura
+    tipo = "plot_sir_profesional" if bandas is None else "plot_sir_profesional/bandas"
+    entrada = _pool_get(clave, tipo)
+    if entrada is not None:
+        fig, art = entrada
+        for area, linea, y in zip(art["areas"], art["lineas"], (S, I, R)):
+            area.set_data(t, 0, y)
+            linea.set_data(t, y)
+        if bandas is not None:
+            for banda, inferior, superior in zip(art["bandas"], bandas["inferior"], bandas["superior"]):
+                banda.set_data(bandas["t"], inferior, superior)
+            if art["bandas"][1].get_label() != etiqueta_bandas:
+                art["bandas"][1].set_label(etiqueta_bandas)
+                art["ax"].legend(loc="best", frameon=True, shadow=True)
+        anotacion = art["pico"]
+        anotacion.xy = (pico_dia, pico_val)
+        anotacion.set_position((pico_dia + 1, pico_val + 50))
+        anotacion.set_text(f"Pico: {pico_val:.0f}")
+        art["ax"].set_title(title, fontsize=14, weight="bold")
+        art["ax"].relim()
+        art["ax"].autoscale_view()
+        return fig
+
+    fig = _figura(figsize=(7, 4))
+    ax = fig.subplots()
+    # Con bandas el relleno bajo las curvas se atenúa para que se distingan
+    opacidad = 0.3 if bandas is None else 0.08
+    areas = [
+        ax.fill_between(t, 0, S, alpha=opacidad, color="#4c72b0", label="Susceptibles"),
+        ax.fill_between(t, 0, I, alpha=opacidad, color="#c44e52", label="Infectados"),
+        ax.fill_between(t, 0, R, alpha=opacidad, color="#55a868", label="Inmunes"),
+    ]
+    art_bandas = []
+    if bandas is not None:
+        for j, color in enumerate(("#4c72b0", "#c44e52", "#55a868")):
+            art_bandas.append(ax.fill_between(bandas["t"], bandas["inferior"][j], bandas["superior"][j],
+                                              alpha=0.3, color=color, linewidth=0,
+                                              label=etiqueta_bandas if j == 1 else None))
+    lineas = [
+        ax.plot(t, S, color="#4c72b0", linewidth=2.2)[0],
+        ax.plot(t, I, color="#c44e52", linewidth=2.5)[0],
+        ax.plot(t, R, color="#55a868", linewidth=2.2)[0],
+    ]
+
+    anotacion = ax.annotate(f"Pico: {pico_val:.0f}", xy=(pico_dia, pico_val),
+                            xytext=(pico_dia + 1, pico_val + 50),
+                            arrowprops=dict(arrowstyle="->", color="black"),
+                            fontsize=10, weight="bold", color="darkred")
 
     ax.set_title(title, fontsize=14, weight="bold")
     ax.set_xlabel("Tiempo (días)", fontsize=12)
@@ -39,79 +306,117 @@ def plot_sir_profesional(S, I, R, t, title="Dinámica SIR Extendida"):
     ax.grid(alpha=0.25)
     for spine in ax.spines.values():
         spine.set_visible(False)
+    _pool_put(clave, tipo, fig, {"ax": ax, "areas": areas, "lineas": lineas, "pico": anotacion, "bandas": art_bandas})
     return fig
 
 
-def plot_sir_comparison(N, I0, R0, b, escenarios, t_max):
-    from models.sir_model import solve_sir
-    
-   
-    fig = plt.figure(figsize=(14, 7), dpi=100)
-    fig.patch.set_facecolor('#ffffff')
-    
-   
-    gs = fig.add_gridspec(2, 2, height_ratios=[3, 0.3], width_ratios=[1, 0.05], 
-                          hspace=0.3, wspace=0.3, left=0.08, right=0.95, top=0.92, bottom=0.08)
-    
-    ax_main = fig.add_subplot(gs[0, 0])
-    ax_main.set_facecolor('#f8f9fa')
-    
+def _posicion_anotacion(idx, pico_dia, pico_val, max_i_value):
+    if idx == 0:
+        return pico_dia + 2.0, pico_val + max_i_value * 0.25
+    return pico_dia - 2.5, pico_val - max_i_value * 0.22
+
+
+@medido("plot_sir_comparison")
+def plot_sir_comparison(N, I0, R0, b, escenarios, t_max, clave=None, renderer="matplotlib", ancho=ANCHO_VEGA,
+                        trayectorias=None):
+    """Creyentes y susceptibles de cada escenario; `trayectorias=(Y, t)` dibuja curvas ya calculadas
+    (p. ej. el promedio de simulate_rumor_network) en vez de integrar la EDO."""
+    from models.sir_model import solve_rumor_batch
+
+    if trayectorias is None:
+        # Todos los escenarios se integran juntos en un solo lote
+        Y, t = solve_rumor_batch(N, I0, R0, b, [esc["k"] for esc in escenarios], t_max)
+    else:
+        Y, t = trayectorias
+
     data = []
-    colors_creyentes = ["#e74c3c", "#9b59b6"]  # Rojo y Púrpura para infectados
-    colors_susceptibles = ["#3498db", "#f39c12"]  # Azul y Naranja para susceptibles
-    
-    max_i_value = 0
     picos_info = []
-    
-    for idx, (esc, color_crey, color_susc) in enumerate(zip(escenarios, colors_creyentes, colors_susceptibles)):
-        S, I, R, t = solve_sir(N, I0, R0, b, esc["k"], t_max)
-        
-        
+    max_i_value = 0
+    for idx, esc in enumerate(escenarios):
+        S, I, R = Y[idx]
         pico_idx = np.argmax(I)
         pico_dia = t[pico_idx]
         pico_val = I[pico_idx]
         max_i_value = max(max_i_value, pico_val)
-        picos_info.append((pico_dia, pico_val, color_crey, idx))
-        
-        
-        ax_main.fill_between(t, 0, I, alpha=0.12, color=color_crey)
-        
-        
-        ax_main.plot(t, I, color=color_crey, linewidth=3.5, 
-                    label=f"Creyentes – {esc['label']}", zorder=3)
-        
-        
-        ax_main.plot(t, S, color=color_susc, linewidth=2.2, linestyle="--", 
-                    alpha=0.6, label=f"Susceptibles – {esc['label']}", zorder=2)
-        
-        
-        ax_main.plot(pico_dia, pico_val, 'o', color=color_crey, markersize=9, zorder=4)
-        
+        picos_info.append((pico_dia, pico_val))
         data.append({"t": t, "I": I, "S": S, "label": esc["label"]})
-    
-    
-    offset_y_factor = max_i_value * 0.15  
-    for pico_dia, pico_val, color, idx in picos_info:
-        
-        if idx == 0:
-            offset_x = 2.0
-            offset_y = pico_val + max_i_value * 0.25
-        else:
-            offset_x = -2.5
-            offset_y = pico_val - max_i_value * 0.22
-        
-        ax_main.annotate(f'Pico: {pico_val:.0f}\nDía {pico_dia:.1f}',
+
+    if renderer == "vega":
+        colors_creyentes = ["#e74c3c", "#9b59b6"]
+        colors_susceptibles = ["#3498db", "#f39c12"]
+        series, colores, guiones = [], {}, {}
+        for d, color_crey, color_susc in zip(data, colors_creyentes, colors_susceptibles):
+            crey, susc = f"Creyentes – {d['label']}", f"Susceptibles – {d['label']}"
+            series += [(crey, d["I"]), (susc, d["S"])]
+            colores.update({crey: color_crey, susc: color_susc})
+            guiones[susc] = [6, 4]
+        capas = _capas_vega(t, series, colores, ancho, guiones=guiones, strokeWidth=3)
+        for idx, ((pico_dia, pico_val), color) in enumerate(zip(picos_info, colors_creyentes)):
+            capas += _marca_pico(pico_dia, pico_val, f"Pico: {pico_val:.0f} · Día {pico_dia:.1f}", color, debajo=idx > 0)
+        return _grafico_vega(capas, "Propagación del Rumor: Comparación de Escenarios", ancho, ancho // 2), data
+
+    tipo = f"plot_sir_comparison/{len(escenarios)}"
+    entrada = _pool_get(clave, tipo)
+    if entrada is not None:
+        fig, art = entrada
+        textos = art["leyenda"].get_texts()
+        for idx, (d, (pico_dia, pico_val)) in enumerate(zip(data, picos_info)):
+            art["areas"][idx].set_data(t, 0, d["I"])
+            art["creyentes"][idx].set_data(t, d["I"])
+            art["susceptibles"][idx].set_data(t, d["S"])
+            art["marcas"][idx].set_data([pico_dia], [pico_val])
+            anotacion = art["anotaciones"][idx]
+            anotacion.xy = (pico_dia, pico_val)
+            anotacion.set_position(_posicion_anotacion(idx, pico_dia, pico_val, max_i_value))
+            anotacion.set_text(f'Pico: {pico_val:.0f}\nDía {pico_dia:.1f}')
+            textos[2 * idx].set_text(f"Creyentes – {d['label']}")
+            textos[2 * idx + 1].set_text(f"Susceptibles – {d['label']}")
+        art["ax"].set_ylim(bottom=0, top=max_i_value * 1.25)
+        art["ax"].set_xlim(left=0, right=t_max)
+        return fig, data
+
+    fig = _figura(figsize=(14, 7), dpi=100)
+    fig.patch.set_facecolor('#ffffff')
+
+
+    gs = fig.add_gridspec(2, 2, height_ratios=[3, 0.3], width_ratios=[1, 0.05],
+                          hspace=0.3, wspace=0.3, left=0.08, right=0.95, top=0.92, bottom=0.08)
+
+    ax_main = fig.add_subplot(gs[0, 0])
+    ax_main.set_facecolor('#f8f9fa')
+
+    colors_creyentes = ["#e74c3c", "#9b59b6"]  # Rojo y Púrpura para infectados
+    colors_susceptibles = ["#3498db", "#f39c12"]  # Azul y Naranja para susceptibles
+    art = {"ax": ax_main, "areas": [], "creyentes": [], "susceptibles": [], "marcas": [], "anotaciones": []}
+
+    for idx, (d, color_crey, color_susc) in enumerate(zip(data, colors_creyentes, colors_susceptibles)):
+        pico_dia, pico_val = picos_info[idx]
+
+        art["areas"].append(ax_main.fill_between(t, 0, d["I"], alpha=0.12, color=color_crey))
+
+
+        art["creyentes"].append(ax_main.plot(t, d["I"], color=color_crey, linewidth=3.5,
+                    label=f"Creyentes – {d['label']}", zorder=3)[0])
+
+
+        art["susceptibles"].append(ax_main.plot(t, d["S"], color=color_susc, linewidth=2.2, linestyle="--",
+                    alpha=0.6, label=f"Susceptibles – {d['label']}", zorder=2)[0])
+
+
+        art["marcas"].append(ax_main.plot(pico_dia, pico_val, 'o', color=color_crey, markersize=9, zorder=4)[0])
+
+        art["anotaciones"].append(ax_main.annotate(f'Pico: {pico_val:.0f}\nDía {pico_dia:.1f}',
                         xy=(pico_dia, pico_val),
-                        xytext=(pico_dia + offset_x, offset_y),
+                        xytext=_posicion_anotacion(idx, pico_dia, pico_val, max_i_value),
                         fontsize=11, weight='bold', color='#2c3e50',
-                        bbox=dict(boxstyle='round,pad=0.7', facecolor='#ffffff', 
-                                 edgecolor=color, linewidth=2.5, alpha=0.98),
-                        arrowprops=dict(arrowstyle='->', color=color, lw=2.5, 
+                        bbox=dict(boxstyle='round,pad=0.7', facecolor='#ffffff',
+                                 edgecolor=color_crey, linewidth=2.5, alpha=0.98),
+                        arrowprops=dict(arrowstyle='->', color=color_crey, lw=2.5,
                                        connectionstyle="arc3,rad=0.3"),
-                        zorder=5)
-    
-    
-    ax_main.set_title("Propagación del Rumor: Comparación de Escenarios", 
+                        zorder=5))
+
+
+    ax_main.set_title("Propagación del Rumor: Comparación de Escenarios",
                      fontsize=17, weight="bold", pad=15, color='#2c3e50')
     ax_main.set_xlabel("Tiempo (días)", fontsize=13, weight="bold", color='#2c3e50', labelpad=10)
     ax_main.set_ylabel("Número de Personas", fontsize=13, weight="bold", color='#2c3e50', labelpad=10)
@@ -123,17 +428,154 @@ def plot_sir_comparison(N, I0, R0, b, escenarios, t_max):
     ax_main.spines['bottom'].set_color('#7f8c8d')
     ax_main.spines['left'].set_linewidth(1.5)
     ax_main.spines['bottom'].set_linewidth(1.5)
-    
-    
-    legend = ax_main.legend(loc="upper left", fontsize=11, frameon=True, 
-                           shadow=True, fancybox=True, framealpha=0.97, 
+
+
+    legend = ax_main.legend(loc="upper left", fontsize=11, frameon=True,
+                           shadow=True, fancybox=True, framealpha=0.97,
                            edgecolor='#bdc3c7', title="Escenarios", title_fontsize=12)
     legend.get_frame().set_linewidth(1.5)
-    
+    art["leyenda"] = legend
+
     ax_main.set_ylim(bottom=0, top=max_i_value * 1.25)
     ax_main.set_xlim(left=0, right=t_max)
     ax_main.tick_params(axis='both', which='major', labelsize=11, colors='#2c3e50')
     ax_legend = fig.add_subplot(gs[1, 0])
     ax_legend.axis('off')
-    
-    return fig, data
\ No newline at end of file
+    _pool_put(clave, tipo, fig, art)
+
+    return fig, data
+
+
+@medido("plot_patches")
+def plot_patches(t, totales, curvas, nombres, title="Brote por facultades", clave=None, renderer="matplotlib",
+                 ancho=ANCHO_VEGA):
+    """Agregado (S, I, R sumados) a la izquierda e infectados de cada parche o grupo a la derecha.
+
+    `totales` es (3, n_t) y `curvas` (n_curvas, n_t) con un nombre por curva;
+    la leyenda de la derecha sólo se muestra con 20 curvas o menos.
+    """
+    colores = [to_hex(colormaps["tab20"](j % 20)) for j in range(len(curvas))]
+    if renderer == "vega":
+        import altair as alt
+
+        series = [("Susceptibles", totales[0]), ("Infectados", totales[1]), ("Recuperados", totales[2])]
+        agregado = _grafico_vega(_capas_vega(t, series, {"Susceptibles": "blue", "Infectados": "red",
+                                                         "Recuperados": "green"}, ancho // 2),
+                                 "Total", ancho // 2, ancho // 3)
+        por_parche = _grafico_vega(_capas_vega(t, list(zip(nombres, curvas)), dict(zip(nombres, colores)),
+                                               ancho // 2, strokeWidth=1.2),
+                                   "Infectados por grupo", ancho // 2, ancho // 3)
+        return alt.hconcat(agregado, por_parche).properties(title=title)
+
+    tipo = f"plot_patches/{len(curvas)}"
+    entrada = _pool_get(clave, tipo)
+    if entrada is not None:
+        fig, art = entrada
+        for linea, y in zip(art["totales"], totales):
+            linea.set_data(t, y)
+        for linea, y, nombre in zip(art["curvas"], curvas, nombres):
+            linea.set_data(t, y)
+            linea.set_label(nombre)
+        fig.suptitle(title, fontsize=14, weight="bold")
+        for ax in art["ejes"]:
+            ax.relim()
+            ax.autoscale_view()
+        if art["leyenda"] is not None:
+            for texto, nombre in zip(art["leyenda"].get_texts(), nombres):
+                texto.set_text(nombre)
+        return fig
+
+    fig = _figura(figsize=(11, 4.5))
+    ax_total, ax_parches = fig.subplots(1, 2)
+    lineas_totales = [
+        ax_total.plot(t, totales[0], label="Susceptibles", color="blue")[0],
+        ax_total.plot(t, totales[1], label="Infectados", color="red", linewidth=2.5)[0],
+        ax_total.plot(t, totales[2], label="Recuperados", color="green")[0],
+    ]
+    lineas = [ax_parches.plot(t, y, color=color, linewidth=1.2, label=nombre)[0]
+              for y, color, nombre in zip(curvas, colores, nombres)]
+    ax_total.set_title("Total", fontsize=12)
+    ax_total.legend()
+    ax_parches.set_title("Infectados por grupo", fontsize=12)
+    leyenda = None
+    if len(curvas) <= 20:
+        leyenda = ax_parches.legend(fontsize=6, loc="upper left", bbox_to_anchor=(1.02, 1), frameon=False)
+    for ax in (ax_total, ax_parches):
+        ax.set_xlabel("Tiempo (días)", fontsize=11)
+        ax.set_ylabel("Personas", fontsize=11)
+        ax.grid(alpha=0.3)
+    fig.suptitle(title, fontsize=14, weight="bold")
+    fig.tight_layout()
+    _pool_put(clave, tipo, fig, {"ejes": (ax_total, ax_parches), "totales": lineas_totales, "curvas": lineas,
+                                 "leyenda": leyenda})
+    return fig
+
+
+@medido("plot_calibration")
+def plot_calibration(dias, casos, t, ajuste, title="Ajuste a los casos observados", etiqueta="Casos", clave=None,
+                     renderer="matplotlib", ancho=ANCHO_VEGA):
+    """Casos observados como puntos y la curva ajustada (día a día) como línea."""
+    if renderer == "vega":
+        import altair as alt
+
+        puntos = alt.Chart(alt.Data(values=[{"t": int(d), "v": round(float(c), 1)} for d, c in zip(dias, casos)]))
+        capas = [puntos.mark_circle(size=28, color="#4c72b0", opacity=0.7).encode(
+            x=alt.X("t:Q", title="Tiempo (días)"), y=alt.Y("v:Q", title=etiqueta))]
+        validos = np.isfinite(ajuste)
+        capas += _capas_vega(t[validos], [("Ajuste", ajuste[validos])], {"Ajuste": "#c44e52"}, ancho, strokeWidth=2.3)
+        return _grafico_vega(capas, title, ancho, ancho * 4 // 7)
+
+    entrada = _pool_get(clave, "plot_calibration")
+    if entrada is not None:
+        fig, art = entrada
+        art["puntos"].set_data(dias, casos)
+        art["linea"].set_data(t, ajuste)
+        art["ax"].set_title(title, fontsize=14, weight="bold")
+        art["ax"].set_ylabel(etiqueta, fontsize=12)
+        art["ax"].relim()
+        art["ax"].autoscale_view()
+        return fig
+
+    fig = _figura(figsize=(7, 4))
+    ax = fig.subplots()
+    puntos = ax.plot(dias, casos, "o", color="#4c72b0", markersize=3.5, alpha=0.7, label="Observados")[0]
+    linea = ax.plot(t, ajuste, color="#c44e52", linewidth=2.3, label="Ajuste")[0]
+    ax.set_title(title, fontsize=14, weight="bold")
+    ax.set_xlabel("Tiempo (días)", fontsize=12)
+    ax.set_ylabel(etiqueta, fontsize=12)
+    ax.legend()
+    ax.grid(alpha=0.3)
+    _pool_put(clave, "plot_calibration", fig, {"ax": ax, "puntos": puntos, "linea": linea})
+    return fig
+
+
+@medido("plot_heatmap")
+def plot_heatmap(Z, x, y, title, xlabel, ylabel, etiqueta, clave=None):
+    """Mapa de calor de Z[i, j] sobre x[i] (eje horizontal) × y[j]; los NaN quedan en blanco.
+
+    Con `clave` la imagen se reutiliza y sólo cambian sus datos, así que
+    redibujar un barrido que se va llenando es barato.
+    """
+    extension = (x[0], x[-1], y[0], y[-1])
+    limites = (np.nanmin(Z), np.nanmax(Z)) if np.isfinite(Z).any() else (0, 1)
+    entrada = _pool_get(clave, "plot_heatmap")
+    if entrada is not None:
+        fig, art = entrada
+        art["imagen"].set_data(Z.T)
+        art["imagen"].set_extent(extension)
+        art["imagen"].set_clim(*limites)
+        art["ax"].set_title(title, fontsize=14, weight="bold")
+        art["barra"].set_label(etiqueta)
+        return fig
+
+    fig = _figura(figsize=(7, 5))
+    ax = fig.subplots()
+    imagen = ax.imshow(Z.T, origin="lower", extent=extension, aspect="auto", cmap="viridis",
+                       interpolation="nearest", vmin=limites[0], vmax=limites[1])
+    barra = fig.colorbar(imagen, ax=ax, label=etiqueta)
+    ax.set_title(title, fontsize=14, weight="bold")
+    ax.set_xlabel(xlabel, fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.ticklabel_format(axis="x", style="sci", scilimits=(-3, 3))
+    _pool_put(clave, "plot_heatmap", fig, {"ax": ax, "imagen": imagen, "barra": barra})
+    return fig
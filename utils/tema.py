@@ -0,0 +1,50 @@
+"""Hoja de estilos común a todas las páginas.
+
+style_navy.css se lee y se minifica una vez por proceso; app.py la inyecta
+una sola vez por ejecución del script, antes de la página, y los fragmentos
+de las simulaciones ya no la repiten. Streamlit borra en cada rerun los
+elementos que el script no vuelve a emitir, así que la inyección por
+ejecución es necesaria, pero ahora es un string ya armado y no una lectura
+de disco por página.
+"""
+import functools
+import os
+import re
+
+import streamlit as st
+
+from utils.trazas import medido
+
+HOJA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "style_navy.css")
+
+
+def minificar(css):
+    """Quita comentarios y espacios sobrantes (no toca los que separan selectores ni los `:`)."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+@functools.lru_cache(maxsize=None)
+def _estilo(ruta=HOJA):
+    try:
+        with open(ruta, "rb") as f:
+            crudo = f.read()
+    except FileNotFoundError:
+        return ""
+    try:
+        css = crudo.decode("utf-8")
+    except UnicodeDecodeError:
+        css = crudo.decode("latin-1")
+    return f"<style>{minificar(css)}</style>"
+
+
+@medido("tema")
+def aplicar_tema():
+    """Inyecta la hoja de estilos (cacheada en el proceso) en la ejecución actual."""
+    estilo = _estilo()
+    if estilo:
+        st.markdown(estilo, unsafe_allow_html=True)
+    else:
+        st.warning(f"⚠️ No se encontró el archivo de estilos: {HOJA}")
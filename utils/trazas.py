@@ -0,0 +1,163 @@
+"""Trazas livianas del camino caliente de cada rerun.
+
+Los tramos (`tramo("png")` o el decorador `@medido("plot_sir")`) miden con
+perf_counter y se agregan por (página, tramo): cuántas veces, total, máximo
+y el último. Están puestos en los solvers y los gráficos con caché
+(utils/cache.py), cada función de utils/plotter.py, la serialización a PNG,
+el dibujo del resultado en la página (`mostrar`, que incluye st.image),
+las fotos de "Inicio", la hoja de estilos y la página entera.
+
+Apagadas (lo normal) cada tramo cuesta una lectura de una variable global.
+La página se resuelve con la función que registra app.py, así que también
+los tramos de los hilos de fondo (utils/fondo.py, que les pasa el contexto
+de la sesión) quedan en la página correcta.
+
+Variables de entorno:
+    SIR_TRAZAS          1 para encenderlas al arrancar y mostrar el panel "Trazas" en la barra lateral
+    SIR_TRAZAS_ARCHIVO  exportación: .prom (texto de Prometheus, se reescribe) o .jsonl (se agrega
+                        una línea por tramo); por defecto no se exporta
+    SIR_TRAZAS_CADA_S   segundos mínimos entre exportaciones (por defecto 5)
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+ACTIVAS = PANEL = os.environ.get("SIR_TRAZAS", "") not in ("", "0")
+ARCHIVO = os.environ.get("SIR_TRAZAS_ARCHIVO") or None
+CADA_S = float(os.environ.get("SIR_TRAZAS_CADA_S", 5))
+MAX_PENDIENTES = 100_000
+
+_agregados = {}
+_pendientes = []
+_lock = threading.Lock()
+_ultima_exportacion = 0.0
+_resolver_pagina = None
+
+
+def activar(activas=True):
+    global ACTIVAS
+    ACTIVAS = activas
+
+
+def registrar_pagina(resolver):
+    """`resolver()` devuelve la página de la sesión actual; lo llama cada tramo (sólo con trazas activas)."""
+    global _resolver_pagina
+    _resolver_pagina = resolver
+
+
+def _pagina():
+    try:
+        return _resolver_pagina() if _resolver_pagina else "-"
+    except Exception:
+        return "-"
+
+
+def _registrar(pagina, nombre, segundos):
+    with _lock:
+        agregado = _agregados.get((pagina, nombre))
+        if agregado is None:
+            agregado = _agregados[(pagina, nombre)] = {"n": 0, "total": 0.0, "max": 0.0, "ultimo": 0.0}
+        agregado["n"] += 1
+        agregado["total"] += segundos
+        agregado["max"] = max(agregado["max"], segundos)
+        agregado["ultimo"] = segundos
+        if ARCHIVO and ARCHIVO.endswith(".jsonl") and len(_pendientes) < MAX_PENDIENTES:
+            _pendientes.append({"ts": round(time.time(), 3), "pagina": pagina, "tramo": nombre,
+                                "ms": round(segundos * 1e3, 3)})
+
+
+class tramo:
+    """Context manager que mide su bloque como el tramo `nombre` de la página actual."""
+
+    __slots__ = ("nombre", "_inicio")
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self._inicio = None
+
+    def __enter__(self):
+        if ACTIVAS:
+            self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._inicio is not None:
+            _registrar(_pagina(), self.nombre, time.perf_counter() - self._inicio)
+        return False
+
+
+def medido(nombre):
+    """Decorador: cada llamada es un tramo `nombre`; apagadas, llama a la función sin más."""
+    def decorador(fn):
+        @functools.wraps(fn)
+        def envoltura(*args, **kwargs):
+            if not ACTIVAS:
+                return fn(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _registrar(_pagina(), nombre, time.perf_counter() - inicio)
+        return envoltura
+    return decorador
+
+
+def resumen(pagina=None):
+    """Filas {pagina, tramo, n, total_ms, media_ms, max_ms, ultimo_ms} ordenadas por total, opcionalmente de una página."""
+    with _lock:
+        items = [(llave, dict(a)) for llave, a in _agregados.items() if pagina is None or llave[0] == pagina]
+    filas = [{"pagina": p, "tramo": nombre, "n": a["n"], "total_ms": round(a["total"] * 1e3, 2),
+              "media_ms": round(a["total"] / a["n"] * 1e3, 2), "max_ms": round(a["max"] * 1e3, 2),
+              "ultimo_ms": round(a["ultimo"] * 1e3, 2)}
+             for (p, nombre), a in items]
+    return sorted(filas, key=lambda f: -f["total_ms"])
+
+
+def reiniciar():
+    with _lock:
+        _agregados.clear()
+        _pendientes.clear()
+
+
+def prometheus():
+    """Los agregados en formato de texto de Prometheus (summary: _count y _sum, más el máximo)."""
+    lineas = ["# HELP sir_tramo_segundos Duración de los tramos del camino caliente por página.",
+              "# TYPE sir_tramo_segundos summary"]
+    maximos = ["# HELP sir_tramo_segundos_max Duración máxima observada del tramo.",
+               "# TYPE sir_tramo_segundos_max gauge"]
+    with _lock:
+        items = sorted(_agregados.items())
+    for (pagina, nombre), a in items:
+        etiquetas = f'pagina="{_escapar(pagina)}",tramo="{_escapar(nombre)}"'
+        lineas.append(f"sir_tramo_segundos_count{{{etiquetas}}} {a['n']}")
+        lineas.append(f"sir_tramo_segundos_sum{{{etiquetas}}} {a['total']:.6f}")
+        maximos.append(f"sir_tramo_segundos_max{{{etiquetas}}} {a['max']:.6f}")
+    return "\n".join(lineas + maximos) + "\n"
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def exportar(ruta=None, forzar=False):
+    """Escribe los agregados (.prom) o agrega los tramos nuevos (.jsonl); como mucho una vez cada CADA_S."""
+    global _ultima_exportacion
+    ruta = ruta or ARCHIVO
+    ahora = time.monotonic()
+    if not ruta or (not forzar and ahora - _ultima_exportacion < CADA_S):
+        return
+    _ultima_exportacion = ahora
+    if ruta.endswith(".jsonl"):
+        with _lock:
+            nuevos, _pendientes[:] = list(_pendientes), []
+        if nuevos:
+            with open(ruta, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(t, ensure_ascii=False) + "\n" for t in nuevos)
+        return
+    # Escritura atómica: un colector de archivos de texto nunca ve uno a medias
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(prometheus())
+    os.replace(temporal, ruta)